@@ -7,11 +7,38 @@
 # PyQt documentation links are prefixed with the word 'documentation' in the code below and can be accessed automatically
 #  in PyCharm using the following technique https://www.jetbrains.com/help/pycharm/inline-documentation.html
 
+import time
+startupStart = time.perf_counter()  # --profile-startup times everything from here
 from PyQt6.QtWidgets import QDialog, QApplication, QWidget, QMainWindow, QFileDialog, QDockWidget, QPushButton, QVBoxLayout, QLabel, QMessageBox, QLineEdit, QHBoxLayout, QComboBox
-from PyQt6.QtGui import QCursor, QIcon, QPainter, QPen, QAction, QPixmap
+from PyQt6.QtGui import QPainter, QPen, QAction, QImage, QPainterPath, QColor, QPolygonF
 import sys
-import csv, random
-from PyQt6.QtCore import Qt, QPoint
+import os
+import argparse
+import importlib.util
+from PyQt6.QtCore import Qt, QEvent, QPoint, QPointF, QRect, QRectF, QTimer, QSize, QThreadPool
+from strokes import StrokeLog, fillTolerance
+from history import TileHistory, deviceRect
+from gameengine import GameState, TRIES_PER_TURN, TURN_OVER
+from wordpacks import loadPack, AdaptiveSampler, TARGET_SUCCESS
+from matching import AnswerMatcher
+import assets
+from netprotocol import NET_SCALE
+import rasterizer  # the canvas is first drawn through it before the window is shown
+from viewmodel import ViewModel, STYLE_SHEET, scoreState
+from instrumentation import log, stats, startup
+# the bucket fill, the bot guesser and GIF timelapses need numpy, which takes longer to import than the rest of the
+# game together, so their modules are imported the first time they are used. Without numpy they are turned off
+NUMPY = importlib.util.find_spec("numpy") is not None  # documentation: https://docs.python.org/3/library/importlib.html#importlib.util.find_spec
+
+# text shown instead of the word until the sketcher reveals it
+HIDDEN_WORD = "*******"
+# milliseconds between two pictures of the spectator stream
+SPECTATOR_INTERVAL = 33
+# milliseconds between two checkpoints of the journal, recovery replays at most this much of the journal
+CHECKPOINT_INTERVAL = 10000
+# milliseconds the window has to keep its size before the canvas is drawn again from the stroke log, until then it
+# is only stretched so dragging the edge of the window does not stop at every step to draw a big drawing again
+RENDER_DELAY = 150
 
 # a window that pops when the application starts to setup the game
 class PlayerSetupDialog(QDialog):
@@ -21,7 +48,7 @@ class PlayerSetupDialog(QDialog):
         self.setWindowTitle("New Game Setup")
         # Set icon
         self.setWindowIcon(
-            QIcon("./icons/paint-brush.png"))  # documentation: https://doc.qt.io/qt-6/qwidget.html#windowIcon-prop
+            assets.icon("paint-brush"))  # documentation: https://doc.qt.io/qt-6/qwidget.html#windowIcon-prop
 
         # set the windows dimensions
         top = 200
@@ -106,24 +133,49 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
     Painting Application class
     '''
 
-    def __init__(self):
+    def __init__(self, network=None, setupData=None, gameJournal=None, recovered=None, leaderboard=None):
         super().__init__()
         self.black()
-        self.tries = 3
-        self.player1_score = 0
-        self.player2_score = 0
+        # players, scores and turns are kept by the game engine, this window only shows them
+        self.game = GameState()
+        # one sampler per word list, it keeps how each word went so the words are chosen to suit the players across games
+        self.wordSamplers = {}
+        # word pack and answer matcher of each word list, guesses up to this many typos away from the word are accepted
+        self.answerMatchers = {}
+        self.maxAnswerDistance = 1
+        # words are drawn more often the closer the tries guessers have left on them are to this share of a turn
+        self.targetSuccess = TARGET_SUCCESS
+        # .pict recording of the game, None when not recording
+        self.recorder = None
+        # connection to the server when the players are on separate machines, None when playing on one window
+        self.network = network
+        # history of the games in a local database for the leaderboards, it is written on its own thread. None keeps
+        # no history, so the benchmarks and soak tests do not add their made up games to the players' leaderboards
+        self.leaderboard = leaderboard
+        # crash-safe journal of the game, None when not journaling. It is only started once the game is set up, from
+        # the game recovered from it if there is one, see startJournal
+        self.journal = None
+        # the labels below are updated through the view model, which applies their changes together once per turn
+        # of the event loop. Their looks are classes and states matched by the style sheet of the window
+        self.view = ViewModel(self)
+        self.setStyleSheet(STYLE_SHEET)  # documentation: https://doc.qt.io/qt-6/qwidget.html#styleSheet-prop
         self.difficulty_label = QLabel("Difficulty: -")
+        self.difficulty_label.setProperty("class", "difficulty")
         self.player1_label = QLabel("Player 1")
         self.player2_label = QLabel("Player 2")
+        for label in (self.player1_label, self.player2_label):
+            label.setProperty("class", "score")
         self.sketcher_label = QLabel("Player 1")
         self.guesser_label = QLabel("Player 2")
-        self.currentSketcher = ""
-        self.currentGuesser = ""
-        self.currentWord = None
+        for label in (self.sketcher_label, self.guesser_label):
+            label.setProperty("class", "turn")
 
 
-        # Show the setup dialog at the start
-        if not self.show_setup_dialog():
+        # Show the setup dialog at the start, unless the players and difficulty are already given
+        if setupData is not None:
+            self.setupData = setupData
+            self.update_ui_for_new_game()
+        elif not self.show_setup_dialog():
             sys.exit()  # Exit the application if setup is canceled
         # set window title
         self.setWindowTitle("Pictionary Game")
@@ -138,13 +190,42 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         # set the icon
         # windows version
         self.setWindowIcon(
-            QIcon("./icons/paint-brush.png"))  # documentation: https://doc.qt.io/qt-6/qwidget.html#windowIcon-prop
+            assets.icon("paint-brush"))  # documentation: https://doc.qt.io/qt-6/qwidget.html#windowIcon-prop
         # mac version - not yet working
         # self.setWindowIcon(QIcon(QPixmap("./icons/paint-brush.png")))
 
         # image settings (default)
-        self.image = QPixmap("./icons/canvas.png")  # documentation: https://doc.qt.io/qt-6/qpixmap.html
-        self.image.fill(Qt.GlobalColor.white)  # documentation: https://doc.qt.io/qt-6/qpixmap.html#fill
+        # the canvas is only made when the window gets its size, just before it is first shown, until then it is a
+        # null image that painting and filling leave alone, documentation: https://doc.qt.io/qt-6/qimage.html#isNull
+        self.image = QImage()
+        # vector copy of the drawing, used to re-render the canvas when the window is resized
+        self.strokeLog = StrokeLog(self.canvasWidth(), self.canvasHeight())
+        # image opened from a file that the strokes are drawn on top of
+        self.background = None
+        # strokes of the round before this one, kept for its timelapse after the canvas is cleared
+        self.lastRoundLog = None
+        # statistics overlay
+        self.showStats = False
+        self.statsTimer = QTimer(self)
+        self.statsTimer.setInterval(500)
+        self.statsTimer.timeout.connect(self.refreshStats)
+        # save and open tasks running on worker threads
+        self.imageTasks = set()
+        # undo/redo history of the strokes drawn on the canvas
+        self.history = TileHistory()
+        # id of the stroke being drawn here and of the last stroke received from the room, and strokes undone by the room
+        self.localStrokeId = 0
+        self.remoteStroke = None
+        self.remoteUndone = []
+        if self.network is not None:
+            self.network.strokesReceived.connect(self.drawRemoteStrokes)
+            self.network.guessReceived.connect(self.remoteGuess)
+            self.network.turnReceived.connect(self.remoteTurn)
+            self.network.joinReceived.connect(self.remoteJoin)
+            self.network.clearReceived.connect(self.clearCanvas)
+            self.network.undoReceived.connect(self.remoteUndo)
+            self.network.redoReceived.connect(self.remoteRedo)
+            self.network.fillReceived.connect(self.remoteFill)
         mainWidget = QWidget()
         mainWidget.setMaximumWidth(300)
 
@@ -152,11 +233,58 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         self.drawing = False
         self.brushSize = 3
         self.brushColor = Qt.GlobalColor.black  # documentation: https://doc.qt.io/qt-6/qt.html#GlobalColor-enum
+        # only repaint the area around each new segment instead of the whole window
+        self.incrementalRendering = True
+        # bucket fill tool, the tolerance is how far (0 to 255) each colour channel may be from the clicked pixel
+        self.fillMode = False
+        self.fillTolerance = 32
+        # workshop mode: a tiled canvas much bigger than the window that is panned with the right button and zoomed
+        # with the wheel, None while it is off
+        self.workshop = None
+        self.viewOrigin = QPointF()  # workshop canvas point shown at the top left of the window
+        self.zoom = 1.0
+        self.panFrom = None  # last mouse position while panning
+        # bot guesser: drawings from recorded games and the features of the canvas, both None while a person guesses
+        self.botIndex = None
+        self.botFeatures = None
+        # spectator stream of the canvas, None until a port or a file is given to stream to
+        self.spectator = None
+        self.spectatorServer = None
+        self.spectatorRect = QRect()  # part of the window repainted since the last picture of the stream
+        self.spectatorTimer = QTimer(self)
+        self.spectatorTimer.setInterval(SPECTATOR_INTERVAL)
+        self.spectatorTimer.timeout.connect(self.publishSpectator)
+        self.journalTimer = QTimer(self)
+        self.journalTimer.setInterval(CHECKPOINT_INTERVAL)
+        self.journalTimer.timeout.connect(self.checkpointJournal)
 
         # reference to last point recorded by mouse
         self.lastPoint = QPoint()  # documentation: https://doc.qt.io/qt-6/qpoint.html
 
+        # mouse moves are queued and drawn together once per frame instead of one segment per event
+        self.pendingPoints = []
+        # frame pacing: the areas painted on are collected and repainted together at most once per screen refresh,
+        # without it every mouse move is drawn and repainted on its own
+        self.framePacing = True
+        self.damage = QRect()
+        self.frameTimer = QTimer(self)  # documentation: https://doc.qt.io/qt-6/qtimer.html
+        self.frameTimer.setSingleShot(True)
+        self.frameTimer.setTimerType(Qt.TimerType.PreciseTimer)  # documentation: https://doc.qt.io/qt-6/qt.html#TimerType-enum
+        self.frameTimer.setInterval(self.frameInterval())
+        self.frameTimer.timeout.connect(self.presentFrame)
+        self.renderTimer = QTimer(self)
+        self.renderTimer.setSingleShot(True)
+        self.renderTimer.setInterval(RENDER_DELAY)
+        self.renderTimer.timeout.connect(self.renderResized)
+        # points closer than this (in pixels) to the last kept point are dropped, per brush size, 0 keeps every point
+        self.minPointSpacing = {3: 2, 5: 3, 7: 4, 9: 5}
+
+        startup.mark("window")
+
         # set up menus
+        # the actions are made now so their shortcuts work before any menu is opened, but the icons of the menu items
+        # are only read from disk when a menu is first opened
+        self.menuIcons = []  # (action, icon name) still without their icon
         mainMenu = self.menuBar()  # create a menu bar
         mainMenu.setStyleSheet("background-color:black; color:white;") # changed the background color and text color to force visibility in different window themes
         mainMenu.setNativeMenuBar(False)
@@ -164,6 +292,9 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         fileMenu = mainMenu.addMenu(" File")  # add the file menu to the menu bar, the space is required as "File" is reserved in Mac
         brushSizeMenu = mainMenu.addMenu(" Brush Size")  # add the "Brush Size" menu to the menu bar
         brushColorMenu = mainMenu.addMenu(" Brush Colour")  # add the "Brush Colour" menu to the menu bar
+        fillMenu = mainMenu.addMenu(" Fill")  # bucket fill with the brush colour
+        for menu in (fileMenu, brushSizeMenu, brushColorMenu):
+            menu.aboutToShow.connect(self.loadMenuIcons)  # documentation: https://doc.qt.io/qt-6/qmenu.html#aboutToShow
 
         # set up the eraser menu item
         eraserAction = QAction("Eraser", self)
@@ -176,60 +307,149 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         gameMenu.addAction(newGameAction)  # add the easy action to the difficulty menu, documentation: https://doc.qt.io/qt-6/qwidget.html#addAction
         newGameAction.triggered.connect(self.newGame)
 
+        # record the game to a .pict file
+        recordAction = QAction("Record game...", self)
+        gameMenu.addAction(recordAction)
+        recordAction.triggered.connect(self.startRecording)
+
+        stopRecordAction = QAction("Stop recording", self)
+        gameMenu.addAction(stopRecordAction)
+        stopRecordAction.triggered.connect(self.stopRecording)
+
+        # best players and hardest words of all the games played on this machine
+        leaderboardAction = QAction("Leaderboard", self)
+        gameMenu.addAction(leaderboardAction)
+        leaderboardAction.triggered.connect(self.showLeaderboard)
+
+        # big pan and zoom canvas for drawing together in workshops, not shared with the room
+        self.workshopAction = QAction("Workshop mode", self)
+        self.workshopAction.setCheckable(True)
+        gameMenu.addAction(self.workshopAction)
+        self.workshopAction.toggled.connect(self.setWorkshopMode)
+
+        # the computer guesses instead of the guesser, for practising alone
+        self.botAction = QAction("Bot guesser...", self)
+        self.botAction.setCheckable(True)
+        self.botAction.setEnabled(NUMPY)
+        gameMenu.addAction(self.botAction)
+        self.botAction.toggled.connect(self.setBotGuesser)
+
+        # open menu item
+        openAction = QAction("Open", self)
+        openAction.setShortcut("Ctrl+O")
+        fileMenu.addAction(openAction)
+        openAction.triggered.connect(self.open)
+
         # save menu item
-        saveAction = QAction(QIcon("./icons/save.png"), "Save", self)  # create a save action with a png as an icon, documentation: https://doc.qt.io/qt-6/qaction.html
+        saveAction = QAction("Save", self)  # create a save action, its png icon is added when the menu first opens, documentation: https://doc.qt.io/qt-6/qaction.html
+        self.menuIcons.append((saveAction, "save"))
         saveAction.setShortcut("Ctrl+S")  # connect this save action to a keyboard shortcut, documentation: https://doc.qt.io/qt-6/qaction.html#shortcut-prop
         fileMenu.addAction(saveAction)  # add the save action to the file menu, documentation: https://doc.qt.io/qt-6/qwidget.html#addAction
         saveAction.triggered.connect(self.save)  # when the menu option is selected or the shortcut is used the save slot is triggered, documentation: https://doc.qt.io/qt-6/qaction.html#triggered
 
+        # replay the drawing of this round, or of the last one if nothing is drawn yet, to a GIF or PNG files
+        timelapseAction = QAction("Export timelapse...", self)
+        fileMenu.addAction(timelapseAction)
+        timelapseAction.triggered.connect(self.exportTimelapse)
+
         # clear
-        clearAction = QAction(QIcon("./icons/clear.png"), "Clear", self)  # create a clear action with a png as an icon
+        clearAction = QAction("Clear", self)  # create a clear action
+        self.menuIcons.append((clearAction, "clear"))
         clearAction.setShortcut("Ctrl+C")  # connect this clear action to a keyboard shortcut
         fileMenu.addAction(clearAction)  # add this action to the file menu
         clearAction.triggered.connect(self.clear)  # when the menu option is selected or the shortcut is used the clear slot is triggered
 
+        # statistics of input, painting, dialogs and answer checks
+        debugMenu = mainMenu.addMenu(" Debug")
+        statsAction = QAction("Show stats", self)
+        statsAction.setShortcut("F3")
+        debugMenu.addAction(statsAction)
+        statsAction.triggered.connect(self.toggleStats)
+
+        dumpStatsAction = QAction("Save stats...", self)
+        debugMenu.addAction(dumpStatsAction)
+        dumpStatsAction.triggered.connect(self.dumpStats)
+
+        resetStatsAction = QAction("Reset stats", self)
+        debugMenu.addAction(resetStatsAction)
+        resetStatsAction.triggered.connect(stats.reset)
+
+        # undo and redo
+        undoAction = QAction("Undo", self)
+        undoAction.setShortcut("Ctrl+Z")
+        fileMenu.addAction(undoAction)
+        undoAction.triggered.connect(self.undo)
+
+        redoAction = QAction("Redo", self)
+        redoAction.setShortcut("Ctrl+Shift+Z")  # Ctrl+Y is already used by the yellow brush
+        fileMenu.addAction(redoAction)
+        redoAction.triggered.connect(self.redo)
+
         # brush thickness
-        threepxAction = QAction(QIcon("./icons/threepx.png"), "3px", self)
+        threepxAction = QAction("3px", self)
+        self.menuIcons.append((threepxAction, "threepx"))
         threepxAction.setShortcut("Ctrl+3")
         brushSizeMenu.addAction(threepxAction)  # connect the action to the function below
         threepxAction.triggered.connect(self.threepx)
 
-        fivepxAction = QAction(QIcon("./icons/fivepx.png"), "5px", self)
+        fivepxAction = QAction("5px", self)
+        self.menuIcons.append((fivepxAction, "fivepx"))
         fivepxAction.setShortcut("Ctrl+5")
         brushSizeMenu.addAction(fivepxAction)
         fivepxAction.triggered.connect(self.fivepx)
 
-        sevenpxAction = QAction(QIcon("./icons/sevenpx.png"), "7px", self)
+        sevenpxAction = QAction("7px", self)
+        self.menuIcons.append((sevenpxAction, "sevenpx"))
         sevenpxAction.setShortcut("Ctrl+7")
         brushSizeMenu.addAction(sevenpxAction)
         sevenpxAction.triggered.connect(self.sevenpx)
 
-        ninepxAction = QAction(QIcon("./icons/ninepx.png"), "9px", self)
+        ninepxAction = QAction("9px", self)
+        self.menuIcons.append((ninepxAction, "ninepx"))
         ninepxAction.setShortcut("Ctrl+9")
         brushSizeMenu.addAction(ninepxAction)
         ninepxAction.triggered.connect(self.ninepx)
 
+        # bucket fill and how close a colour has to be to the clicked one to be filled
+        self.fillAction = QAction("Bucket fill", self)
+        self.fillAction.setShortcut("Ctrl+F")
+        self.fillAction.setCheckable(True)  # documentation: https://doc.qt.io/qt-6/qaction.html#checkable-prop
+        fillMenu.addAction(self.fillAction)
+        self.fillAction.toggled.connect(self.setFillMode)
+        fillMenu.addSeparator()
+        for tolerance, text in ((0, "Exact colour"), (32, "Tolerance 32"), (64, "Tolerance 64"), (128, "Tolerance 128")):
+            toleranceAction = QAction(text, self)
+            fillMenu.addAction(toleranceAction)
+            toleranceAction.triggered.connect(lambda checked, tolerance=tolerance: setattr(self, "fillTolerance", tolerance))
+        fillMenu.setEnabled(NUMPY)
+
         # brush colors
-        blackAction = QAction(QIcon("./icons/black.png"), "Black", self)
+        blackAction = QAction("Black", self)
+        self.menuIcons.append((blackAction, "black"))
         blackAction.setShortcut("Ctrl+B")
         brushColorMenu.addAction(blackAction);
         blackAction.triggered.connect(self.black)
 
-        redAction = QAction(QIcon("./icons/red.png"), "Red", self)
+        redAction = QAction("Red", self)
+        self.menuIcons.append((redAction, "red"))
         redAction.setShortcut("Ctrl+R")
         brushColorMenu.addAction(redAction);
         redAction.triggered.connect(self.red)
 
-        greenAction = QAction(QIcon("./icons/green.png"), "Green", self)
+        greenAction = QAction("Green", self)
+        self.menuIcons.append((greenAction, "green"))
         greenAction.setShortcut("Ctrl+G")
         brushColorMenu.addAction(greenAction);
         greenAction.triggered.connect(self.green)
 
-        yellowAction = QAction(QIcon("./icons/yellow.png"), "Yellow", self)
+        yellowAction = QAction("Yellow", self)
+        self.menuIcons.append((yellowAction, "yellow"))
         yellowAction.setShortcut("Ctrl+Y")
         brushColorMenu.addAction(yellowAction);
         yellowAction.triggered.connect(self.yellow)
 
+        startup.mark("menus")
+
         # Side Dock
         self.dockInfo = QDockWidget()
         #removing the title bar so that the dock is always connected to the window
@@ -242,26 +462,19 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         playerInfo.setLayout(self.vbdock)
         playerInfo.setMaximumSize(150, self.height())
         #add controls to custom widget
-        self.difficulty_label = QLabel(f"Difficulty: {self.difficulty}")
-        # set difficulty style
-        if self.difficulty == "Easy":
-            self.difficulty_label.setStyleSheet("color: green; font-weight: bold;font-size : 16px")
-        elif self.difficulty == "Hard":
-            self.difficulty_label.setStyleSheet("color: red; font-weight: bold;font-size : 16px")
-        self.player1_label = QLabel(f"{self.player1Name}: {self.player1_score}")
-        self.player2_label = QLabel(f"{self.player2Name}: {self.player2_score}")
-
         self.vbdock.addWidget(self.difficulty_label)
         # adding spacing
         self.vbdock.addSpacing(50)
-        self.vbdock.addWidget(QLabel("Current Turn:").setStyleSheet("font-size : 15px"))
+        turn_title = QLabel("Current Turn:")
+        turn_title.setProperty("class", "title")
+        self.vbdock.addWidget(turn_title)
         self.vbdock.addWidget(self.sketcher_label)
         self.vbdock.addWidget(self.guesser_label)
         # adding spacing
         self.vbdock.addSpacing(70)
 
         score_title = QLabel("Scores:")
-        score_title.setStyleSheet("font-size:15px")
+        score_title.setProperty("class", "title")
         self.vbdock.addWidget(score_title)
         self.vbdock.addWidget(self.player1_label)
         self.vbdock.addWidget(self.player2_label)
@@ -278,81 +491,84 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
 
         #set widget for dock
         self.dockInfo.setWidget(playerInfo)
-        self.startNewTurn(self.currentSketcher)
+        self.createTurnDialogs()
+        startup.mark("dock and dialogs")
+        if recovered is not None:
+            self.restoreGame(recovered)
+        if gameJournal is not None:
+            self.startJournal(gameJournal)
+        if self.game.currentWord is None:
+            self.startNewTurn(self.game.currentSketcher)
+        else:
+            self.showWordPopup(self.game.currentSketcher)  # the recovered turn starts again with its word
+        self.view.apply()  # the window is first painted with the labels of the game
+        startup.mark("first turn")
+    def loadMenuIcons(self):
+        for action, name in self.menuIcons:
+            action.setIcon(assets.icon(name))
+        self.menuIcons = []
+
     # method to show the game setup dialog
     def show_setup_dialog(self):
         dialog = PlayerSetupDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             # getting the data
             data = dialog.get_data()
-            self.player1Name = data["player1"]
-            self.player2Name = data["player2"]
-            self.difficulty = data["difficulty"]
+            self.setupData = data
             # printing to debug
-            print(f"Player 1: {self.player1Name}, Player 2: {self.player2Name}, Difficulty: {self.difficulty}")
+            log.info("game_setup", player1=data['player1'], player2=data['player2'], difficulty=data['difficulty'])
             # updating the UI with the new data
             self.update_ui_for_new_game()
             return True
         else:
-            print("Game setup was cancelled")
+            log.info("game_setup_cancelled")
             return False
     # method called to start a new game
     def newGame(self):
-        if self.show_setup_dialog():
+        if self.show_setup_dialog():  # the game is set up by the dialog once it is accepted
             self.clear()
-            self.update_ui_for_new_game()
-            self.startNewTurn(self.currentSketcher)
+            self.startNewTurn(self.game.currentSketcher)
     def update_ui_for_new_game(self):
-        # update labels with new player names and difficulty
-        self.difficulty_label.setText(f"Difficulty: {self.difficulty}")
-        self.tries = 3
-        # debugging
-        print("changing the score back to 0 because game was restarted")
-        self.player1_score , self.player2_score = 0 , 0
-        self.updateScoreDisplay()
-        # set difficulty style
-        if self.difficulty == "Easy":
-            self.difficulty_label.setStyleSheet("color: green; font-weight: bold;font-size : 16px")
-        elif self.difficulty == "Hard":
-            self.difficulty_label.setStyleSheet("color: red; font-weight: bold;font-size : 16px")
+        data = self.setupData
         # get list based on the difficulty chosen by the player in the menu
-        self.getList(self.difficulty)
-
-        # randomly select a sketcher and make the other player the guesser
-        self.currentSketcher = random.choice([self.player1Name, self.player2Name])
-        if self.currentSketcher == self.player1Name:
-            self.currentGuesser = self.player2Name
-        else:
-            self.currentGuesser = self.player1Name
+        # the engine resets the scores and randomly selects a sketcher, the other player is the guesser
+        sampler = self.getList(data["difficulty"])
+        if self.leaderboard is not None:
+            self.leaderboard.endGame(self.game.player1_score, self.game.player2_score)  # the game being played is over
+        self.game.newGame(data["player1"], data["player2"], data["difficulty"], sampler, self.getMatcher(sampler.words))
+        if self.recorder is not None:
+            self.recorder.setup(self.game.player1Name, self.game.player2Name, self.game.difficulty)
+        if self.leaderboard is not None:
+            self.leaderboard.newGame(self.game.player1Name, self.game.player2Name, self.game.difficulty)
+        if self.journal is not None:
+            self.journal.setup(self.game)
+        # update labels with new player names and difficulty, the style sheet colours the difficulty by its state
+        self.view.setText(self.difficulty_label, f"Difficulty: {self.game.difficulty}")
+        self.view.setState(self.difficulty_label, self.game.difficulty.lower())
+        log.debug("scores_reset")
+        self.updateScoreDisplay()
         # update the ui with the new data
         self.updateTurnsUi()
     def updateScoreDisplay(self):
-        print("updating score")
+        log.debug("score_display_updated", player1=self.game.player1_score, player2=self.game.player2_score)
         # update score display with color based on value
-        if self.player1_score > 0:
-            self.player1_label.setStyleSheet("font-size:13px; color: green; font-weight: bold;")
-        if self.player1_score < 0:
-            self.player1_label.setStyleSheet(" font-size:13px; color: red; font-weight: bold;")
-
-        if self.player2_score > 0:
-            self.player2_label.setStyleSheet("font-size:13px; color: green; font-weight: bold;")
-        if self.player2_score < 0:
-            self.player2_label.setStyleSheet("font-size:13px; color: red; font-weight: bold;")
-        self.player1_label.setText(f"{self.player1Name}: {self.player1_score}")
-        self.player2_label.setText(f"{self.player2Name}: {self.player2_score}")
-    # method that shopws the hiden word pop up to let the sketcher reveal his word
-    def showWordPopup(self,player):
-        word_dialog = QDialog(self)
-        # setting up the title
-        word_dialog.setWindowTitle(f"{player}, Check Your Word")
-
+        for label, name, score in ((self.player1_label, self.game.player1Name, self.game.player1_score),
+                                   (self.player2_label, self.game.player2Name, self.game.player2_score)):
+            self.view.setText(label, f"{name}: {score}")
+            self.view.setState(label, scoreState(score))
+    # build the dialogs of a turn once, they are shown again every round instead of creating new ones
+    # the dialogs are opened with open() instead of exec() so each one returns straight away and the turn moves on
+    # from their signals, documentation: https://doc.qt.io/qt-6/qdialog.html#open
+    def createTurnDialogs(self):
+        # dialog that lets the sketcher reveal the hidden word
+        self.wordDialog = QDialog(self)
         # creating the labels and buttons
         instruction_label = QLabel("Don't let others see. Press 'Show Word' to reveal it.")
         # making the word hidden at first
-        word_label = QLabel("*******")
+        self.wordLabel = QLabel(HIDDEN_WORD)
         # button to toggle the word between hiden and visible
-        toggle_button = QPushButton("Show Word")
-        toggle_button.setStyleSheet("""
+        self.toggleWordButton = QPushButton("Show Word")
+        self.toggleWordButton.setStyleSheet("""
             QPushButton {
                 background-color: #ee8510;  /* Default background color */
             }
@@ -365,187 +581,735 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
         # Layout setup
         layout = QVBoxLayout()
         layout.addWidget(instruction_label)
-        layout.addWidget(word_label)
-        layout.addWidget(toggle_button)
+        layout.addWidget(self.wordLabel)
+        layout.addWidget(self.toggleWordButton)
         layout.addWidget(ok_button)
-        word_dialog.setLayout(layout)
-
-        # toggle function to show or hide the word
-        def toggle_word_visibility():
-            # check if the word is currently hidden if yest show the word and change the button value
-            if word_label.text() == "*******":
-                word_label.setText(self.currentWord)
-                toggle_button.setText("Hide Word")
-            else:
-                # hide the word
-                word_label.setText("*****")
-                toggle_button.setText("Show Word")
+        self.wordDialog.setLayout(layout)
 
         # connect the buttons
-        toggle_button.clicked.connect(toggle_word_visibility)
-        ok_button.clicked.connect(word_dialog.accept)
-
-        word_dialog.exec()
-    def answer(self):
-        self.showAnswerPopup(self.currentGuesser)
-
-    def showAnswerPopup(self, player):
-        # create a dialog for answering
-        word_dialog = QDialog(self)
-        word_dialog.setWindowTitle(f"{player}, Try to guess the word")
-
-        # create labels and buttons
-        instruction_label = QLabel(f"Enter a word that describes the drawing.\nYou have {self.tries} guesses left.")
-        answer_input = QLineEdit()
+        self.toggleWordButton.clicked.connect(self.toggleWordVisibility)
+        ok_button.clicked.connect(self.wordDialog.accept)
+        self.wordDialog.finished.connect(self.wordSeen)  # documentation: https://doc.qt.io/qt-6/qdialog.html#finished
+
+        # dialog for answering
+        self.answerDialog = QDialog(self)
+        self.answerInstruction = QLabel()
+        self.answerInput = QLineEdit()
         answer_button = QPushButton("Submit Answer")
 
         layout = QVBoxLayout()
-        layout.addWidget(instruction_label)
-        layout.addWidget(answer_input)
+        layout.addWidget(self.answerInstruction)
+        layout.addWidget(self.answerInput)
         layout.addWidget(answer_button)
-        word_dialog.setLayout(layout)
-
-        def submit_answer():
-            answer = answer_input.text()
-            # check if the answer is correct
-            correct = self.checkAnswer(answer, player)
-            if correct or self.tries <= 0:
-                # end turn if correct or out of tries
-                word_dialog.accept()
-                # check if the word is correct or out of tries to print different messages
-                if correct:
-                    self.messageBox("Correct Answer!!!")
-                else:
-                    self.messageBox("Couldn't Figure it out x_x")
-                self.endTurn()
-            else:
-                # update instructions if there are tries left
-                instruction_label.setText(f"Incorrect! Try again. You have {self.tries} guesses left.")
+        self.answerDialog.setLayout(layout)
 
         # connect the button
-        answer_button.clicked.connect(submit_answer)
-        word_dialog.exec()
+        answer_button.clicked.connect(self.submitAnswer)
+        self.answerDialog.rejected.connect(self.answerCancelled)
 
-    def checkAnswer(self, answer, player):
-        #print(f"checking answer '{answer}' against current word '{self.currentWord}'")
-        #if not self.currentWord:
-            #print("current word not set")
-            #return False
-        # make the comparison case-insensitive and check if correct
-        if answer.strip().lower() == self.currentWord.strip().lower():
-            print("Correct answer")
-            # award points
-            if player == self.player1Name:
-                self.player1_score += 5
-                self.player2_score += 10
-            else:
-                self.player2_score += 5
-                self.player1_score += 10
-            print(f"score {self.player1_score} , {self.player2_score}")
-            self.updateScoreDisplay()
-            return True  # return true for correct answer
-        else:
-            # remove one try
-            self.tries -= 1
-            # minus a point for wrong answer
-            if player == self.player1Name:
-                self.player1_score -= 1
-            else:
-                self.player2_score -= 1
-            # check score is chaning
-            print(f"score {self.player1_score} , {self.player2_score}")
-            self.updateScoreDisplay()
-            return False  # return false for wrong answer
-    def messageBox(self , message):
-        # create a dialog for showing a message
-        word_dialog = QDialog(self)
-        word_dialog.setWindowTitle(message)
-        word_dialog.setFixedWidth(200)
-        # create labels and buttons
+        # dialog for showing the result of the turn
+        self.resultDialog = QDialog(self)
+        self.resultDialog.setFixedWidth(200)
         instruction_label = QLabel("Current Score:")
-        instruction_label.setStyleSheet("font-weight:bold ; font-size:18px")
-        score_label1 = QLabel(f"{self.player1Name}: {self.player1_score}")
-        score_label2 = QLabel(f"{self.player2Name}: {self.player2_score}")
-
-        # style the players score based on the value
-        if self.player1_score < 0:
-            score_label1.setStyleSheet("color:red; font-size:15px")
-        if self.player1_score > 0:
-            score_label1.setStyleSheet("color:green; font-size:15px")
-        if self.player2_score < 0:
-            score_label2.setStyleSheet("color:red; font-size:15px")
-        if self.player2_score > 0:
-            score_label2.setStyleSheet("color:green; font-size:15px")
+        instruction_label.setProperty("class", "heading")
+        self.resultScore1 = QLabel()
+        self.resultScore2 = QLabel()
+        for label in (self.resultScore1, self.resultScore2):
+            label.setProperty("class", "result")
         ok_button = QPushButton("Next Round")
+        timelapse_button = QPushButton("Save Timelapse")
 
         # layout setup
         layout = QVBoxLayout()
         layout.addSpacing(10)
         layout.addWidget(instruction_label)
         layout.addSpacing(10)
-        layout.addWidget(score_label1)
-        layout.addWidget(score_label2)
+        layout.addWidget(self.resultScore1)
+        layout.addWidget(self.resultScore2)
         layout.addSpacing(10)
+        layout.addWidget(timelapse_button)
         layout.addWidget(ok_button)
-        word_dialog.setLayout(layout)
+        self.resultDialog.setLayout(layout)
+
+        # connect the button to close the dialog, the next turn starts when it closes
+        ok_button.clicked.connect(self.resultDialog.accept)
+        timelapse_button.clicked.connect(self.exportTimelapse)
+        self.resultDialog.finished.connect(self.endTurn)
+
+    # method that shopws the hiden word pop up to let the sketcher reveal his word
+    def showWordPopup(self, player):
+        # setting up the title
+        start = time.perf_counter()
+        self.wordDialog.setWindowTitle(f"{player}, Check Your Word")
+        self.wordLabel.setText(HIDDEN_WORD)
+        self.toggleWordButton.setText("Show Word")
+        self.wordDialog.open()
+        stats.timeSince("dialog_open", start)
+
+    # toggle function to show or hide the word
+    def toggleWordVisibility(self):
+        # check if the word is currently hidden if yest show the word and change the button value
+        if self.wordLabel.text() == HIDDEN_WORD:
+            self.wordLabel.setText(self.game.currentWord)
+            self.toggleWordButton.setText("Hide Word")
+        else:
+            # hide the word
+            self.wordLabel.setText(HIDDEN_WORD)
+            self.toggleWordButton.setText("Show Word")
 
-        # connect the button to close the dialog
-        ok_button.clicked.connect(word_dialog.accept)
+    # the word dialog was closed, the sketcher can draw
+    def wordSeen(self):
+        self.game.startDrawing()
 
-        word_dialog.exec()
+    def answer(self):
+        if self.game.startGuessing():
+            if self.botIndex is not None:
+                self.botGuess()
+            else:
+                self.showAnswerPopup(self.game.currentGuesser)
+
+    # turn the bot guesser on, it learns from every .pict recording in a folder chosen by the player
+    def setBotGuesser(self, on):
+        if not on:
+            self.botIndex = self.botFeatures = None
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Folder of recorded games for the bot")
+        if folder == "":
+            self.botAction.setChecked(False)
+            return
+        from recognizer import DrawingFeatures, DrawingIndex
+        from recording import Recording
+        index = DrawingIndex()
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".pict"):
+                try:
+                    index.addRecording(Recording(os.path.join(folder, name)))
+                except (OSError, ValueError) as error:
+                    log.warning("bot_recording_skipped", path=name, error=str(error))
+        self.botIndex = index
+        self.botFeatures = DrawingFeatures()
+        self.botFeatures.sync(self.strokeLog)
+        self.statusBar().showMessage(f"The bot learned {len(index)} drawings of {len(index.words)} words", 5000)
+
+    # the bot takes the guesser's turn, guessing the words of the pack whose recorded drawings look the most like the canvas
+    def botGuess(self):
+        start = time.perf_counter()
+        self.botFeatures.sync(self.strokeLog)  # only strokes drawn since the last sync are added
+        ranked = self.botIndex.rank(self.botFeatures, list(self.game.words.words))
+        stats.timeSince("bot_guess", start)
+        guesser = self.game.currentGuesser
+        guesses = []
+        correct = False
+        for word in ranked:
+            guesses.append(word)
+            correct = self.checkAnswer(word, guesser)
+            if self.game.isTurnOver(correct):
+                break
+        self.statusBar().showMessage(f"The bot guessed: {', '.join(guesses)}", 5000)
+        if correct:
+            self.messageBox("Correct Answer!!!")
+        else:
+            self.messageBox("Couldn't Figure it out x_x")
+
+    # the answer dialog was closed without finishing the turn
+    def answerCancelled(self):
+        self.game.stopGuessing()
+
+    def showAnswerPopup(self, player):
+        start = time.perf_counter()
+        self.answerDialog.setWindowTitle(f"{player}, Try to guess the word")
+        self.answerInstruction.setText(f"Enter a word that describes the drawing.\nYou have {self.game.tries} guesses left.")
+        self.answerInput.clear()
+        self.answerDialog.open()
+        stats.timeSince("dialog_open", start)
+
+    def submitAnswer(self):
+        answer = self.answerInput.text()
+        # check if the answer is correct
+        correct = self.checkAnswer(answer, self.game.currentGuesser)
+        if self.game.isTurnOver(correct):
+            # end turn if correct or out of tries
+            self.answerDialog.accept()
+            # check if the word is correct or out of tries to print different messages
+            if correct:
+                self.messageBox("Correct Answer!!!")
+            else:
+                self.messageBox("Couldn't Figure it out x_x")
+        else:
+            # update instructions if there are tries left
+            self.answerInstruction.setText(f"Incorrect! Try again. You have {self.game.tries} guesses left.")
+            self.answerInput.clear()
+
+    def checkAnswer(self, answer, player):
+        # the engine scores the answer, the window only shows the result
+        start = time.perf_counter()
+        scores = self.game.player1_score, self.game.player2_score
+        correct = self.game.checkAnswer(answer, player)
+        stats.timeSince("answer_check", start)
+        if self.recorder is not None:
+            self.recorder.guess(player, answer, correct, self.game.player1_score - scores[0], self.game.player2_score - scores[1])
+        if self.leaderboard is not None:
+            points = self.game.player1_score - scores[0] if player == self.game.player1Name else self.game.player2_score - scores[1]
+            self.leaderboard.guess(player, self.game.currentWord, answer, correct, points)
+        if self.journal is not None:
+            self.journal.guess(player, answer, correct, self.game)
+        if self.network is not None:
+            self.network.sendGuess(player, answer, correct, self.game.player1_score, self.game.player2_score)
+        log.debug("answer_checked", correct=correct, player1=self.game.player1_score, player2=self.game.player2_score)
+        self.updateScoreDisplay()
+        return correct  # return true for correct answer
+    # show the result of the turn and the scores, the next turn starts when it is closed
+    def messageBox(self , message):
+        start = time.perf_counter()
+        self.resultDialog.setWindowTitle(message)
+        # style the players score based on the value
+        for label, name, score in ((self.resultScore1, self.game.player1Name, self.game.player1_score),
+                                   (self.resultScore2, self.game.player2Name, self.game.player2_score)):
+            self.view.setText(label, f"{name}: {score}")
+            self.view.setState(label, scoreState(score))
+        self.view.apply()  # the dialog opens showing the scores
+        self.resultDialog.open()
+        stats.timeSince("dialog_open", start)
 
     def endTurn(self):
-        # adding 3 tries for the next turn
-        self.tries = 3
-        # swapping the players roles
-        self.currentGuesser, self.currentSketcher = self.currentSketcher, self.currentGuesser
+        if self.leaderboard is not None:
+            # the turn was solved if the guesser still had tries left when it ended
+            solved = self.game.tries > 0
+            self.leaderboard.turn(self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord, solved,
+                                  TRIES_PER_TURN - self.game.tries + solved)
+        # the word comes up more or less often depending on how many tries were left
+        self.game.words.recordTurn(self.game.currentWord, self.game.tries)
+        # adding 3 tries for the next turn and swapping the players roles
+        self.game.endTurn()
+        if self.journal is not None:
+            self.journal.endTurn()
         #update labels
         self.updateTurnsUi()
         # starting next turn
-        self.startNewTurn(self.currentSketcher)
+        self.startNewTurn(self.game.currentSketcher)
+
+    # True if this window picks the sketcher and the word of the turns. Over the network only player 1's window does
+    # and sends them in a TURN message, the other windows follow it so every window checks guesses against the same word
+    def picksWords(self):
+        return self.network is None or self.network.name == self.game.player1Name
 
     def startNewTurn(self, player):
-        # clearing the board
-        self.clear()
+        if not self.picksWords():
+            self.game.phase = TURN_OVER  # nothing to draw or guess until the turn comes in, see remoteTurn
+            self.statusBar().showMessage(f"Waiting for {self.game.player1Name} to start the turn")
+            return
+        self.keepLastRound()
+        # clearing the board, over the network the other windows clear theirs when the TURN message comes in
+        if self.network is None:
+            self.clear()
+        else:
+            self.clearCanvas()
         # get a new word
-        self.currentWord = self.getWord()
+        if self.game.startNewTurn() is None:
+            log.error("word_list_empty", difficulty=self.game.difficulty)
+        if self.network is not None:
+            self.network.sendTurn(self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord)
+        self.turnStarted(player)
+
+    def keepLastRound(self):
+        if len(self.strokeLog):
+            self.lastRoundLog = self.strokeLog.copy()
+
+    # the word of the turn is known, keep it and show it to the sketcher
+    def turnStarted(self, player):
+        log.debug("word_chosen", word=self.game.currentWord)
+        if self.recorder is not None:
+            self.recorder.turn(self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord)
+        if self.journal is not None:
+            self.journal.turn(self.game.currentWord)
         # show the word popup for the sketcher
         self.showWordPopup(player)
     # method to update the roles
     def updateTurnsUi(self):
-        self.sketcher_label.setText(f"Sketcher: {self.currentSketcher}")
-        self.sketcher_label.setStyleSheet("font-size:13px; font-weight: bold;")  # Set color for sketcher
-        self.guesser_label.setText(f"Guesser: {self.currentGuesser}")
-        self.guesser_label.setStyleSheet("font-size:13px; font-weight: bold;")
+        self.view.setText(self.sketcher_label, f"Sketcher: {self.game.currentSketcher}")
+        self.view.setText(self.guesser_label, f"Guesser: {self.game.currentGuesser}")
     # event handlers
     def mousePressEvent(self, event):  # when the mouse is pressed, documentation: https://doc.qt.io/qt-6/qwidget.html#mousePressEvent
-        if event.button() == Qt.MouseButton.LeftButton:  # if the pressed button is the left button
+        if self.workshop is not None:
+            self.workshopPress(event)
+        elif event.button() == Qt.MouseButton.LeftButton and self.fillMode:
+            self.bucketFill(event.pos())
+        elif event.button() == Qt.MouseButton.LeftButton:  # if the pressed button is the left button
             self.drawing = True  # enter drawing mode
             self.lastPoint = event.pos()  # save the location of the mouse press as the lastPoint
-            print(self.lastPoint)  # print the lastPoint for debugging purposes
+            x, y = self.toLogPoint(self.lastPoint)
+            self.strokeLog.beginStroke(x, y, self.brushColor, self.brushSize * self.strokeLog.width / self.canvasWidth())
+            self.history.beginStroke()
+            self.localStrokeId += 1
 
     def mouseMoveEvent(self, event):  # when the mouse is moved, documenation: documentation: https://doc.qt.io/qt-6/qwidget.html#mouseMoveEvent
-        if self.drawing:
-            painter = QPainter(self.image)  # object which allows drawing to take place on an image
-            # allows the selection of brush colour, brish size, line type, cap type, join type. Images available here http://doc.qt.io/qt-6/qpen.html
-            painter.setPen(QPen(self.brushColor, self.brushSize, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
-            painter.drawLine(self.lastPoint, event.pos())  # draw a line from the point of the orginal press to the point to where the mouse was dragged to
-            self.lastPoint = event.pos()  # set the last point to refer to the point we have just moved to, this helps when drawing the next line segment
-            self.update()  # call the update method of the widget which calls the paintEvent of this class
+        stats.count("mouse_move_events")
+        if self.panFrom is not None:
+            self.pan(event.position())
+        elif self.drawing:
+            # queue the point, all the points queued during a frame are drawn at once by flushStroke
+            self.pendingPoints.append(event.pos() if self.workshop is None else self.toWorkshopPoint(event.position()))
+            if self.framePacing:
+                self.requestFrame()
+            else:
+                self.flushStroke()
+
+    # milliseconds between two refreshes of the screen the window is on, documentation: https://doc.qt.io/qt-6/qscreen.html#refreshRate-prop
+    def frameInterval(self):
+        rate = self.screen().refreshRate() or 60
+        return max(1, round(1000 / rate))
+
+    def requestFrame(self):
+        if not self.frameTimer.isActive():
+            self.frameTimer.start()
+
+    # mark an area of the window as changed, it is repainted with the next frame
+    def addDamage(self, rect):
+        if not self.incrementalRendering:
+            rect = self.rect()
+        if not self.framePacing:
+            self.update(rect)  # documentation: https://doc.qt.io/qt-6/qwidget.html#update-1
+            return
+        self.damage = self.damage.united(rect)  # documentation: https://doc.qt.io/qt-6/qrect.html#united
+        self.requestFrame()
+
+    # draw the points queued since the last frame and repaint everything that changed in one paint event
+    def presentFrame(self):
+        if self.pendingPoints:
+            self.flushStroke()
+        self.frameTimer.stop()  # the damage of this frame is handled here, no need for another one
+        if not self.damage.isEmpty():
+            self.update(self.damage)
+            self.damage = QRect()
+            stats.count("frames")
+
+    # draw the queued mouse points as one path, final is set when the stroke ends so its last point is always kept
+    def flushStroke(self, final=False):
+        start = time.perf_counter()
+        points, self.pendingPoints = self.pendingPoints, []
+        spacing = self.minPointSpacing.get(self.brushSize, 0)
+        path = QPainterPath(QPointF(self.lastPoint))  # documentation: https://doc.qt.io/qt-6/qpainterpath.html
+        lastKept = self.lastPoint
+        kept = [self.lastPoint]
+        for i, point in enumerate(points):
+            # drop repeated points and points too close to the last kept one, they add nothing visible at this brush size
+            distance = (point - lastKept).manhattanLength()  # documentation: https://doc.qt.io/qt-6/qpoint.html#manhattanLength
+            if distance == 0 or (distance < spacing and not (final and i == len(points) - 1)):
+                continue
+            path.lineTo(QPointF(point))
+            kept.append(point)
+            lastKept = point
+        stats.count("stroke_points_received", len(points))
+        stats.count("stroke_points_kept", len(kept) - 1)
+        if lastKept == self.lastPoint:
+            return  # every point was dropped so there is nothing to draw
+        # allows the selection of brush colour, brish size, line type, cap type, join type. Images available here http://doc.qt.io/qt-6/qpen.html
+        pen = QPen(self.brushColor, self.brushSize, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+        if self.workshop is not None:
+            # the points are on the workshop canvas, only the tiles under the new lines are painted
+            self.addDamage(self.toViewRect(self.workshop.drawPath(path, pen)))
+            self.lastPoint = lastKept
+            stats.timeSince("stroke_flush", start)
+            return
+        for point in kept[1:]:
+            self.strokeLog.addPoint(*self.toLogPoint(point))
+        # the new lines and their round caps all fit in the bounding rect of the path padded by the brush size
+        dirtyRect = self.paddedRect(path.boundingRect().toAlignedRect())
+        # keep a copy of the tiles about to be painted on for undo
+        self.history.touch(self.image, dirtyRect)
+        painter = QPainter(self.image)  # object which allows drawing to take place on an image
+        painter.setPen(pen)
+        painter.drawPath(path)  # draw the lines from the last drawn point through every kept point
+        painter.end()
+        self.addDamage(dirtyRect)  # only repaint the area of the new lines
+        self.lastPoint = lastKept  # the next path starts from the last point we have drawn to
+        if self.network is not None:
+            # the room gets the same lines, starting from the previous point so they join up
+            sx = NET_SCALE / self.canvasWidth()
+            sy = NET_SCALE / self.canvasHeight()
+            netPoints = [value for point in kept for value in (round(point.x() * sx), round(point.y() * sy))]
+            self.network.sendStroke(self.localStrokeId, QColor(self.brushColor).rgba(), self.brushSize * sx, netPoints)
+        stats.timeSince("stroke_flush", start)
+
+    # fill the area around a point of the canvas with the brush colour
+    def bucketFill(self, point):
+        from floodfill import fillRuns, paintRuns, runsRect
+        start = time.perf_counter()
+        ratio = self.image.devicePixelRatio()
+        runs = fillRuns(self.image, int(point.x() * ratio), int(point.y() * ratio), self.brushColor, self.fillTolerance)
+        if runs is None:
+            return  # clicked outside the canvas or on the same colour
+        dirtyRect = self.logicalRect(runsRect(runs))
+        # saved like a stroke so it can be undone
+        self.history.beginStroke()
+        self.history.touch(self.image, dirtyRect)
+        paintRuns(self.image, runs, self.brushColor)
+        self.history.endStroke(self.image)
+        x, y = self.toLogPoint(point)
+        self.strokeLog.addFill(x, y, self.brushColor, self.fillTolerance)
+        if self.recorder is not None:
+            self.recordStroke(len(self.strokeLog) - 1)
+        if self.journal is not None:
+            self.journal.stroke(self.strokeLog, len(self.strokeLog) - 1)
+        if self.network is not None:
+            self.network.sendFill(QColor(self.brushColor).rgba(), self.fillTolerance,
+                                  round(point.x() * NET_SCALE / self.canvasWidth()), round(point.y() * NET_SCALE / self.canvasHeight()))
+        self.addDamage(dirtyRect)
+        stats.timeSince("bucket_fill", start)
+
+    # the room filled an area
+    def remoteFill(self, color, tolerance, x, y):
+        point = QPointF(x * self.canvasWidth() / NET_SCALE, y * self.canvasHeight() / NET_SCALE)
+        self.strokeLog.addFill(*self.toLogPoint(point), QColor.fromRgba(color), tolerance)
+        if not NUMPY:
+            return
+        from floodfill import floodFill
+        ratio = self.image.devicePixelRatio()
+        changed = floodFill(self.image, int(point.x() * ratio), int(point.y() * ratio), QColor.fromRgba(color), tolerance)
+        # the saved tiles would paint over the fill, so local undo starts again from here
+        self.history.clear()
+        if changed is not None:
+            self.addDamage(self.logicalRect(changed))
+
+    # turn the bucket fill on or off, drawing goes back to the brush when it is turned off
+    def setFillMode(self, on):
+        self.fillMode = on
+        if on:
+            self.setCursor(Qt.CursorShape.CrossCursor)  # documentation: https://doc.qt.io/qt-6/qt.html#CursorShape-enum
+        else:
+            self.defaultBrush()
+
+    # draw the stroke points received from the room
+    def drawRemoteStrokes(self, chunks):
+        sx = self.canvasWidth() / NET_SCALE
+        sy = self.canvasHeight() / NET_SCALE
+        dirtyRect = None
+        painter = QPainter(self.image)
+        for strokeId, color, width, points in chunks:
+            points = [QPointF(x * sx, y * sy) for x, y in points]
+            painter.setPen(QPen(QColor.fromRgba(color), width * sx, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+            polyline = QPolygonF(points)
+            painter.drawPolyline(polyline)
+            rect = polyline.boundingRect().toAlignedRect().adjusted(-round(width * sx), -round(width * sy), round(width * sx), round(width * sy))
+            dirtyRect = rect if dirtyRect is None else dirtyRect.united(rect)
+            # continue the stroke in the log if it is still the last one, otherwise it starts a new one
+            if self.remoteStroke != (strokeId, len(self.strokeLog) - 1):
+                x, y = self.toLogPoint(points[0])
+                self.strokeLog.beginStroke(x, y, QColor.fromRgba(color), width * sx * self.strokeLog.width / self.canvasWidth())
+                self.remoteStroke = (strokeId, len(self.strokeLog) - 1)
+            for point in points[1:]:
+                self.strokeLog.addPoint(*self.toLogPoint(point))
+        painter.end()
+        # the saved tiles would paint over the received lines, so local undo starts again from here
+        self.history.clear()
+        if dirtyRect is not None:
+            self.addDamage(dirtyRect)
+
+    # the guesser on another machine answered, its window checked the answer against the word of the turn
+    def remoteGuess(self, player, answer, correct, score1, score2):
+        over = self.game.phase == TURN_OVER
+        self.game.applyAnswer(correct, score1, score2)
+        self.updateScoreDisplay()
+        self.statusBar().showMessage(f"{player} guessed '{answer}': {'correct' if correct else 'wrong'}", 5000)
+        if not over and self.game.phase == TURN_OVER:
+            # the turn is over here too, closing the result starts the next one
+            self.messageBox("Correct Answer!!!" if correct else "Couldn't Figure it out x_x")
+
+    # the window picking the words started a turn, this one takes its roles and word
+    def remoteTurn(self, sketcher, guesser, word):
+        turn = (sketcher, guesser, word or None)
+        if self.picksWords() or (turn == (self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord)
+                                 and self.game.phase != TURN_OVER):
+            return  # sent again for a window that joined the room, this one is in the turn already
+        if self.resultDialog.isVisible():
+            self.resultDialog.accept()  # the last turn is over here too, endTurn keeps its result before the new one starts
+        self.statusBar().clearMessage()
+        self.keepLastRound()
+        self.clearCanvas()
+        self.game.startTurn(*turn)
+        self.updateTurnsUi()
+        self.turnStarted(sketcher)
+        if self.journal is not None:
+            self.journal.checkpoint(self.game, self.strokeLog)  # the roles were picked on another machine, keep them too
+
+    # a window joined the room, it needs the turn being played to follow it
+    def remoteJoin(self, name):
+        if self.picksWords() and self.game.phase != TURN_OVER:
+            self.network.sendTurn(self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord)
+
+    # the room took back its last stroke, there are no saved tiles for it so the canvas is drawn again from the log
+    def remoteUndo(self):
+        if len(self.strokeLog):
+            self.remoteUndone.append(self.strokeLog.popStroke())
+            self.renderCanvas(self.canvasWidth(), self.canvasHeight())
+
+    def remoteRedo(self):
+        if self.remoteUndone:
+            self.strokeLog.pushStroke(self.remoteUndone.pop())
+            self.renderCanvas(self.canvasWidth(), self.canvasHeight())
+
+    # rect grown on every side by the brush size
+    def paddedRect(self, rect):
+        pad = self.brushSize
+        return rect.adjusted(-pad, -pad, pad, pad)  # documentation: https://doc.qt.io/qt-6/qrect.html#adjusted
+
+    # rect in logical pixels covering a rect of device pixels of the canvas
+    def logicalRect(self, rect):
+        ratio = self.image.devicePixelRatio()
+        return QRectF(rect.x() / ratio, rect.y() / ratio, rect.width() / ratio, rect.height() / ratio).toAlignedRect()
+
+    # map a point on the canvas to the coordinates the stroke log is stored against
+    def toLogPoint(self, point):
+        return point.x() * self.strokeLog.width / self.canvasWidth(), point.y() * self.strokeLog.height / self.canvasHeight()
 
     def mouseReleaseEvent(self, event):  # when the mouse is released, documentation: https://doc.qt.io/qt-6/qwidget.html#mouseReleaseEvent
-        if event.button() == Qt.MouseButton.LeftButton:  # if the released button is the left button, documentation: https://doc.qt.io/qt-6/qt.html#MouseButton-enum ,
+        if self.workshop is not None:
+            self.workshopRelease(event)
+        elif event.button() == Qt.MouseButton.LeftButton and self.drawing:  # if the released button is the left button, documentation: https://doc.qt.io/qt-6/qt.html#MouseButton-enum ,
             self.drawing = False  # exit drawing mode
+            # draw whatever is still queued, ending exactly where the mouse was released
+            self.pendingPoints.append(event.pos())
+            self.flushStroke(final=True)
+            if self.strokeLog.endStroke():
+                self.history.endStroke(self.image)
+                if self.recorder is not None:
+                    self.recordStroke(len(self.strokeLog) - 1)
+                if self.journal is not None:
+                    self.journal.stroke(self.strokeLog, len(self.strokeLog) - 1)
+                if self.botFeatures is not None:
+                    self.botFeatures.sync(self.strokeLog)  # keep the bot's view of the canvas up to date stroke by stroke
+            else:
+                self.history.cancelStroke()
+
+    # workshop mode
+    def setWorkshopMode(self, on, width=20000, height=20000):
+        if on and self.workshop is None:
+            from tiledcanvas import TiledCanvas  # only needed in workshop mode, it pulls in tempfile
+            self.workshop = TiledCanvas(width, height)
+            self.viewOrigin = QPointF((width - self.width()) / 2, (height - self.height()) / 2)  # start in the middle
+            self.zoom = 1.0
+            self.fitWorkshopMemory()
+        elif not on and self.workshop is not None:
+            self.workshop.close()
+            self.workshop = None
+        self.update()
+
+    # keep about twice the tiles that fit in the window, so memory follows the window size and not the canvas size
+    def fitWorkshopMemory(self):
+        t = self.workshop.tileSize * self.zoom
+        visible = (int(self.width() / t) + 2) * (int(self.height() / t) + 2)
+        self.workshop.setMaxResident(2 * visible)
+
+    # map a window position to a pixel of the workshop canvas
+    def toWorkshopPoint(self, position):
+        return QPoint(round(position.x() / self.zoom + self.viewOrigin.x()), round(position.y() / self.zoom + self.viewOrigin.y()))
+
+    # area of the window showing a rect of the workshop canvas
+    def toViewRect(self, rect):
+        x = (rect.x() - self.viewOrigin.x()) * self.zoom
+        y = (rect.y() - self.viewOrigin.y()) * self.zoom
+        return QRectF(x, y, rect.width() * self.zoom, rect.height() * self.zoom).toAlignedRect().adjusted(-1, -1, 1, 1)
+
+    def workshopPress(self, event):
+        if event.button() == Qt.MouseButton.RightButton:
+            self.panFrom = event.position()
+        elif event.button() == Qt.MouseButton.LeftButton:
+            self.drawing = True
+            self.lastPoint = self.toWorkshopPoint(event.position())
+
+    def workshopRelease(self, event):
+        if event.button() == Qt.MouseButton.RightButton:
+            self.panFrom = None
+        elif event.button() == Qt.MouseButton.LeftButton and self.drawing:
+            self.drawing = False
+            self.pendingPoints.append(self.toWorkshopPoint(event.position()))
+            self.flushStroke(final=True)
+
+    # move the view with the mouse
+    def pan(self, position):
+        delta = position - self.panFrom
+        self.panFrom = position
+        self.viewOrigin -= delta / self.zoom
+        self.update()
+
+    # zoom the workshop canvas around the mouse, documentation: https://doc.qt.io/qt-6/qwheelevent.html
+    def wheelEvent(self, event):
+        if self.workshop is None:
+            return
+        position = event.position()
+        anchor = QPointF(position.x() / self.zoom, position.y() / self.zoom) + self.viewOrigin  # canvas point under the mouse
+        # zooming out is limited so the tiles in view, and so the memory used, stay bounded
+        self.zoom = min(max(self.zoom * 1.25 ** (event.angleDelta().y() / 120), 0.25), 8.0)
+        self.viewOrigin = anchor - QPointF(position.x() / self.zoom, position.y() / self.zoom)
+        self.fitWorkshopMemory()
+        self.update()
+
+    # draw the part of the workshop canvas in view, only the tiles inside the repainted area are looked at
+    def paintWorkshop(self, painter, rect):
+        painter.fillRect(rect, Qt.GlobalColor.darkGray)  # around the edges of the canvas
+        painter.save()
+        painter.scale(self.zoom, self.zoom)
+        painter.translate(-self.viewOrigin)
+        canvasRect = QRectF(rect.x() / self.zoom + self.viewOrigin.x(), rect.y() / self.zoom + self.viewOrigin.y(),
+                            rect.width() / self.zoom, rect.height() / self.zoom).toAlignedRect()
+        self.workshop.render(painter, canvasRect)
+        painter.restore()
 
     # paint events
     def paintEvent(self, event):
+        start = time.perf_counter()
         # you should only create and use the QPainter object in this method, it should be a local variable
         canvasPainter = QPainter(self)  # create a new QPainter object, documentation: https://doc.qt.io/qt-6/qpainter.html
-        canvasPainter.drawPixmap(QPoint(), self.image)  # draw the image , documentation: https://doc.qt.io/qt-6/qpainter.html#drawImage-1
+        if self.workshop is not None:
+            self.paintWorkshop(canvasPainter, event.rect())
+        else:
+            # only blit the region that needs repainting, documentation: https://doc.qt.io/qt-6/qpaintevent.html#rect
+            dirtyRect = QRectF(event.rect())
+            ratio = self.image.devicePixelRatio()
+            # the source rect is in the device pixels of the canvas, so nothing is scaled on a high dpi screen
+            sourceRect = QRectF(dirtyRect.x() * ratio, dirtyRect.y() * ratio, dirtyRect.width() * ratio, dirtyRect.height() * ratio)
+            canvasPainter.drawImage(dirtyRect, self.image, sourceRect)  # draw the image , documentation: https://doc.qt.io/qt-6/qpainter.html#drawImage
+            if self.spectator is not None:
+                self.spectatorRect = self.spectatorRect.united(event.rect())  # what was repainted may have changed
+        if self.showStats:
+            self.paintStats(canvasPainter)
+        canvasPainter.end()
+        stats.count("paint_events")
+        stats.timeSince("paint", start)
+        if startup.enabled:
+            self.startupPainted()
+
+    # --profile-startup: the window has been painted for the first time, print how long each phase took and quit
+    def startupPainted(self):
+        startup.mark("first paint")
+        startup.enabled = False
+        startup.report()
+        QTimer.singleShot(0, QApplication.quit)  # documentation: https://doc.qt.io/qt-6/qtimer.html#singleShot
+
+    # stream the canvas to spectators connecting to a port and/or to a file
+    def startSpectator(self, port=None, path=None):
+        from spectator import SpectatorStream, SpectatorServer, FileSink  # only needed when streaming
+        if self.spectator is None:
+            self.spectator = SpectatorStream()
+        if port is not None:
+            self.spectatorServer = SpectatorServer(self.spectator, port, self)
+        if path is not None:
+            self.spectator.subscribe(FileSink(path))
+        self.spectatorRect = self.rect()
+        self.spectatorTimer.start()
+
+    # send the tiles that changed under the area repainted since the last picture
+    def publishSpectator(self):
+        if self.workshop is not None:
+            return  # the workshop canvas is not streamed
+        rect = deviceRect(self.image, self.spectatorRect)
+        self.spectatorRect = QRect()
+        self.spectator.publish(self.image, rect)
+
+    def stopSpectator(self):
+        self.spectatorTimer.stop()
+        if self.spectatorServer is not None:
+            self.spectatorServer.close()
+            self.spectatorServer = None
+        if self.spectator is not None:
+            self.spectator.close()
+            self.spectator = None
+
+    # area of the window the statistics overlay is drawn in
+    def statsRect(self):
+        return QRect(self.width() - 430, self.menuBar().height() + 10, 420, 16 * max(len(stats.lines()), 1) + 10)
+
+    # draw the counters and timings over the top right corner of the canvas
+    def paintStats(self, painter):
+        rect = self.statsRect()
+        painter.fillRect(rect, QColor(0, 0, 0, 170))
+        painter.setPen(Qt.GlobalColor.white)
+        for i, line in enumerate(stats.lines()):
+            painter.drawText(rect.left() + 6, rect.top() + 18 + 16 * i, line)
+
+    # show or hide the statistics overlay, it is refreshed twice a second while shown
+    def toggleStats(self):
+        self.showStats = not self.showStats
+        if self.showStats:
+            self.statsTimer.start()
+        else:
+            self.statsTimer.stop()
+        self.update()
+
+    def refreshStats(self):
+        self.update(self.statsRect().adjusted(0, 0, 0, 32))  # a little extra in case new lines were added
+
+    # write the statistics to a JSON file
+    def dumpStats(self):
+        filePath, _ = QFileDialog.getSaveFileName(self, "Save Statistics", "", "JSON(*.json)")
+        if filePath == "":
+            return
+        stats.dump(filePath)
 
     # resize event - this function is called
     def resizeEvent(self, event):
-        self.image = self.image.scaled(self.width(), self.height())
+        if self.image.isNull():
+            self.renderCanvas(self.width(), self.height())  # the first size of the window, there is nothing to stretch
+        else:
+            # stretch the pixels for now and re-render the drawing from the stroke log once the size settles
+            ratio = self.image.devicePixelRatio()
+            self.image = self.image.scaled(round(self.width() * ratio), round(self.height() * ratio))  # documentation: https://doc.qt.io/qt-6/qimage.html#scaled
+            self.image.setDevicePixelRatio(ratio)
+            self.history.dropTiles()
+            self.renderTimer.start()  # restarted by every resize, documentation: https://doc.qt.io/qt-6/qtimer.html#start
+            self.update()
+        if self.workshop is not None:
+            self.fitWorkshopMemory()
+
+    # the size of the window settled, draw the stretched canvas again from the stroke log
+    def renderResized(self):
+        self.renderCanvas(self.canvasWidth(), self.canvasHeight(), keepHistory=True)
+
+    # the window moved to a screen with a different scale, draw the canvas again at its resolution
+    def event(self, event):  # documentation: https://doc.qt.io/qt-6/qevent.html#Type-enum
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self.renderCanvas(self.canvasWidth(), self.canvasHeight(), keepHistory=True)
+            self.frameTimer.setInterval(self.frameInterval())
+        return super().event(event)
+
+    # new white canvas of the given size in logical pixels, backed by one pixel per device pixel so strokes stay sharp on
+    # high dpi screens, documentation: https://doc.qt.io/qt-6/highdpi.html
+    def newCanvas(self, width, height):
+        ratio = self.devicePixelRatioF()
+        image = QImage(round(width * ratio), round(height * ratio), QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)  # painters on the image keep working in logical pixels
+        image.fill(Qt.GlobalColor.white)  # documentation: https://doc.qt.io/qt-6/qimage.html#fill-2
+        return image
+
+    # size of the canvas in logical pixels, the pixels the mouse positions are in
+    def canvasWidth(self):
+        return round(self.image.deviceIndependentSize().width())  # documentation: https://doc.qt.io/qt-6/qimage.html#deviceIndependentSize
+
+    def canvasHeight(self):
+        return round(self.image.deviceIndependentSize().height())
+
+    # rebuild the canvas at the given size from the opened image and the stroke log, the undo history is cleared unless
+    # it is kept, then only its saved tiles are dropped as they no longer match the canvas
+    def renderCanvas(self, width, height, keepHistory=False):
+        self.renderTimer.stop()  # a render waiting for the size to settle would draw the same again
+        self.image = self.newCanvas(width, height)
+        if self.background is not None:
+            painter = QPainter(self.image)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(QRectF(0, 0, width, height), self.background)
+            painter.end()
+        if not len(self.strokeLog) and not keepHistory:
+            # nothing drawn yet so store the next strokes against the new size, undone strokes that can be redone keep
+            # the size they were stored against
+            self.strokeLog.clear(width, height)
+        # big drawings are drawn in tiles by a pool of processes when there are cores to spare
+        rasterizer.rasterize(self.image, self.strokeLog, width, height)
+        # the saved tiles no longer match the canvas
+        if keepHistory:
+            self.history.dropTiles()
+        else:
+            self.history.clear()
+        self.update()
 
     # slots
     def save(self):
@@ -553,76 +1317,221 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
                                                   "PNG(*.png);;JPG(*.jpg *.jpeg);;All Files (*.*)")
         if filePath == "":  # if the file path is empty
             return  # do nothing and return
-        self.image.save(filePath)  # save file image to the file path
+        # encode and write the image on a worker thread, documentation: https://doc.qt.io/qt-6/qthreadpool.html
+        from imagetasks import SaveImageTask  # the image tasks are only loaded the first time one is used
+        # the canvas is saved at its full device resolution, from a copy as strokes keep being painted while it is written
+        task = SaveImageTask(self.image.copy(), filePath)
+        task.signals.finished.connect(lambda path: self.statusBar().showMessage(f"Saved {path}", 3000))
+        self.startImageTask(task, "Saving")
 
     def clear(self):
+        if self.workshop is not None:
+            self.workshop.clear()
+            self.update()
+            return
+        self.clearCanvas()
+        if self.network is not None:
+            self.network.sendClear()
+
+    # clear the canvas without telling the room, used when the room cleared it
+    def clearCanvas(self):
         self.image.fill(
             Qt.GlobalColor.white)  # fill the image with white, documentation: https://doc.qt.io/qt-6/qimage.html#fill-2
+        self.strokeLog.clear(self.canvasWidth(), self.canvasHeight())
+        self.background = None
+        self.history.clear()
+        if self.recorder is not None:
+            self.recorder.clear()
+        if self.journal is not None:
+            self.journal.clear(self.strokeLog.width, self.strokeLog.height)
         self.update()  # call the update method of the widget which calls the paintEvent of this class
 
+    # take back the last stroke
+    def undo(self):
+        if self.workshop is not None:
+            return  # the workshop canvas has no history
+        if self.drawing:
+            return  # the stroke being drawn is not in the history yet, it can be taken back once the button is released
+        entry = self.history.undo(self.image)
+        if entry is not None:
+            entry.stroke = self.strokeLog.popStroke()  # keep the stroke so redo can put it back in the log
+            if entry.before is None:
+                # its tiles were dropped when the canvas was resized or drawn again, so it is drawn again without the stroke
+                self.renderCanvas(self.canvasWidth(), self.canvasHeight(), keepHistory=True)
+            if self.recorder is not None:
+                self.recorder.undo()
+            if self.journal is not None:
+                self.journal.undo()
+            if self.network is not None:
+                self.network.sendUndo()
+            self.update()
+
+    # put back the last stroke taken back by undo
+    def redo(self):
+        if self.workshop is not None or self.drawing:
+            return
+        entry = self.history.redo(self.image)
+        if entry is not None:
+            self.strokeLog.pushStroke(entry.stroke)
+            if entry.after is None:
+                self.renderCanvas(self.canvasWidth(), self.canvasHeight(), keepHistory=True)
+            if self.recorder is not None:
+                self.recorder.redo()
+            if self.journal is not None:
+                self.journal.redo()
+            if self.network is not None:
+                self.network.sendRedo()
+            self.update()
+
+    # start writing the game to a .pict recording, beginning with the game and turn already in progress
+    def startRecording(self):
+        filePath, _ = QFileDialog.getSaveFileName(self, "Record Game", "", "Pictionary recording(*.pict)")
+        if filePath == "":
+            return
+        self.stopRecording()
+        from recording import RecordingWriter  # only loaded when a game is recorded
+        self.recorder = RecordingWriter(filePath)
+        self.recorder.setup(self.game.player1Name, self.game.player2Name, self.game.difficulty)
+        if self.game.currentWord is not None:
+            self.recorder.turn(self.game.currentSketcher, self.game.currentGuesser, self.game.currentWord)
+        for i in range(len(self.strokeLog)):
+            self.recordStroke(i)
+
+    def stopRecording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    # start journaling the game with a checkpoint of the game and canvas as they are, it replaces whatever journal
+    # was there before
+    def startJournal(self, gameJournal):
+        self.journal = gameJournal
+        self.journal.checkpoint(self.game, self.strokeLog)
+        self.journalTimer.start()
+
+    # write the whole game and canvas to the journal, so recovering does not need the records before it. Strokes
+    # received from the room are not journaled one by one and only reach the journal this way
+    def checkpointJournal(self):
+        if self.journal is not None and self.journal.sinceCheckpoint:
+            self.journal.checkpoint(self.game, self.strokeLog)
+
+    # carry on with a game recovered from the journal after the game did not close normally
+    def restoreGame(self, state):
+        state.applyTo(self.game)
+        self.strokeLog = state.strokeLog
+        if not self.image.isNull():
+            self.renderCanvas(self.canvasWidth(), self.canvasHeight())
+        self.updateScoreDisplay()
+        self.updateTurnsUi()
+        self.statusBar().showMessage("The last game did not close normally, it has been restored", 5000)
+        log.info("game_restored", player1=self.game.player1_score, player2=self.game.player2_score, strokes=len(self.strokeLog))
+
+    # the leaderboards read from the database, games still being written may be missing for a moment
+    def showLeaderboard(self):
+        if self.leaderboard is None:
+            self.statusBar().showMessage("The leaderboard is turned off", 5000)
+            return
+        from leaderboard import LeaderboardError
+        try:
+            players = self.leaderboard.leaderboard(10)
+            winners = self.leaderboard.winRates(10, minGames=3)
+            words = self.leaderboard.wordDifficulty(10, minTurns=3)
+        except LeaderboardError as error:
+            self.statusBar().showMessage(f"The leaderboard cannot be read: {error}", 5000)
+            return
+        lines = ["Most points:"]
+        lines += [f"  {name}: {points} points in {games} games" for name, points, games, _ in players]
+        lines.append("\nMost wins (3 games or more):")
+        lines += [f"  {name}: {rate:.0%} of {games} games" for name, rate, games in winners]
+        lines.append("\nHardest words (drawn 3 times or more):")
+        lines += [f"  {word}: solved {rate:.0%} of {turns} turns" for word, rate, turns, _ in words]
+        QMessageBox.information(self, "Leaderboard", "\n".join(lines))  # documentation: https://doc.qt.io/qt-6/qmessagebox.html#information
+
+    # write stroke i of the stroke log to the recording
+    def recordStroke(self, i):
+        self.recorder.canvas(self.strokeLog.width, self.strokeLog.height)
+        color, width, points = self.strokeLog.stroke(i)
+        if self.strokeLog.isFill(i):
+            self.recorder.fill(color, fillTolerance(width), points[0], points[1])
+        else:
+            self.recorder.stroke(color, width, points)
+
+    def closeEvent(self, event):  # documentation: https://doc.qt.io/qt-6/qwidget.html#closeEvent
+        self.stopRecording()
+        self.saveWordStats()
+        self.stopSpectator()
+        if self.journal is not None:
+            self.journalTimer.stop()
+            self.journal.close(discard=True)  # the game closed normally, there is nothing to recover
+            self.journal = None
+        if self.leaderboard is not None:
+            self.leaderboard.endGame(self.game.player1_score, self.game.player2_score)
+            self.leaderboard.close()  # waits for the writer to finish what is queued
+            self.leaderboard = None
+        rasterizer.shutdown()
+        super().closeEvent(event)
+
     def threepx(self):  # the brush size is set to 3
         self.brushSize = 3
+        self.fillAction.setChecked(False)  # picking a brush size goes back to the brush
 
     def fivepx(self):
         self.brushSize = 5
+        self.fillAction.setChecked(False)
 
     def sevenpx(self):
         self.brushSize = 7
+        self.fillAction.setChecked(False)
 
     def ninepx(self):
         self.brushSize = 9
+        self.fillAction.setChecked(False)
 
     def black(self):  # the brush color is set to black
         self.brushColor = Qt.GlobalColor.black
-        brushIcon = QPixmap("./icons/paint-brush.png")  # Path to your eraser icon
-        customCursor = QCursor(brushIcon.scaled(25, 25), 0, 23)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
+        self.setCursor(assets.cursor("paint-brush", 0, 23))  # the cursor is loaded and scaled the first time only, adjust hot spot if needed
 
     def red(self):
         self.brushColor = Qt.GlobalColor.red
-        brushIcon = QPixmap("./icons/red-brush.png")  # Path to your eraser icon
-        customCursor = QCursor(brushIcon.scaled(25, 25), 0, 23)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
+        self.setCursor(assets.cursor("red-brush", 0, 23))
 
     def green(self):
         self.brushColor = Qt.GlobalColor.green
-        brushIcon = QPixmap("./icons/green-brush.png")  # Path to your eraser icon
-        customCursor = QCursor(brushIcon.scaled(25, 25), 0, 23)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
+        self.setCursor(assets.cursor("green-brush", 0, 23))
 
     def yellow(self):
         self.brushColor = Qt.GlobalColor.yellow
-        brushIcon = QPixmap("./icons/yellow-brush.png")  # Path to your eraser icon
-        customCursor = QCursor(brushIcon.scaled(25, 25), 0, 23)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
+        self.setCursor(assets.cursor("yellow-brush", 0, 23))
     def erase(self):
         self.brushColor = Qt.GlobalColor.white
-        eraserIcon = QPixmap("./icons/eraser.png")  # Path to your eraser icon
-        customCursor = QCursor(eraserIcon.scaled(25, 25), 3, 20)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
+        self.fillAction.setChecked(False)
+        self.setCursor(assets.cursor("eraser", 3, 20))
     def defaultBrush(self):
-        brushIcon = QPixmap("./icons/paint-brush.png")  # Path to your eraser icon
-        customCursor = QCursor(brushIcon.scaled(25, 25), 0, 23)  # Adjust size and hot spot if needed
-        self.setCursor(customCursor)
-    #Get a random word from the list read from file
-    def getWord(self):
-        if not self.wordList:
-            print("Error: Word list is empty!")
-            return None
-        randomWord = random.choice(self.wordList)
-        print(f"Debug: Word chosen from list is '{randomWord}'")
-        return randomWord
-
-    #read word list from file
+        self.setCursor(assets.cursor("paint-brush", 0, 23))
+    # return the word sampler of the word list of a difficulty, the list is only read again if the file changed
     def getList(self, mode):
-        with open(mode + 'mode.txt') as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
-            line_count = 0
-            for row in csv_reader:
-                #print(row)
-                self.wordList = row
-                line_count += 1
-            #print(f'Processed {line_count} lines.')
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), mode.lower() + 'mode.txt')
+        pack = loadPack(path)
+        sampler = self.wordSamplers.get(mode)
+        if sampler is None or sampler.words is not pack:
+            sampler = self.wordSamplers[mode] = AdaptiveSampler(pack, target=self.targetSuccess, tries=TRIES_PER_TURN)
+            sampler.load(pack.statsPath())  # how the words went in earlier games
+        return sampler
+
+    # keep how the words went for the next games
+    def saveWordStats(self):
+        for sampler in self.wordSamplers.values():
+            try:
+                sampler.save(sampler.words.statsPath())
+            except OSError as error:
+                log.warning("word_stats_not_saved", path=sampler.words.path, error=str(error))
+
+    # return the answer matcher of a word pack, only built the first time the pack is used
+    def getMatcher(self, pack):
+        cached = self.answerMatchers.get(pack.path)
+        if cached is None or cached[0] is not pack:
+            cached = self.answerMatchers[pack.path] = (pack, AnswerMatcher(pack, self.maxAnswerDistance))
+        return cached[1]
 
     # open a file
     def open(self):
@@ -637,19 +1546,84 @@ class PictionaryGame(QMainWindow):  # documentation https://doc.qt.io/qt-6/qwidg
                                                   "PNG(*.png);;JPG(*.jpg *.jpeg);;All Files (*.*)")
         if filePath == "":  # if not file is selected exit
             return
-        with open(filePath, 'rb') as f:  # open the file in binary mode for reading
-            content = f.read()  # read the file
-        self.image.loadFromData(content)  # load the data into the file
-        width = self.width()  # get the width of the current QImage in your application
-        height = self.height()  # get the height of the current QImage in your application
-        self.image = self.image.scaled(width, height)  # scale the image from file and put it in your QImage
-        self.update()  # call the update method of the widget which calls the paintEvent of this class
+        # read and decode the image on a worker thread, decoded straight at the size of the window in device pixels
+        from imagetasks import OpenImageTask
+        ratio = self.devicePixelRatioF()
+        task = OpenImageTask(filePath, QSize(round(self.width() * ratio), round(self.height() * ratio)))
+        task.signals.finished.connect(self.imageOpened)
+        self.startImageTask(task, "Opening")
+
+    # write a timelapse of the drawing at the resolution of the canvas, on a worker thread
+    def exportTimelapse(self):
+        strokes = self.strokeLog if len(self.strokeLog) else self.lastRoundLog
+        if strokes is None or not len(strokes):
+            self.statusBar().showMessage("Nothing has been drawn yet", 3000)
+            return
+        filters = "GIF(*.gif);;PNG sequence(*.png)" if NUMPY else "PNG sequence(*.png)"
+        filePath, _ = QFileDialog.getSaveFileName(self, "Export Timelapse", "", filters)
+        if filePath == "":
+            return
+        from imagetasks import TimelapseTask
+        ratio = self.devicePixelRatioF()
+        workers = min(os.cpu_count() or 1, 4)
+        task = TimelapseTask(strokes.copy(), filePath, round(strokes.width * ratio), round(strokes.height * ratio), workers)
+        task.signals.finished.connect(lambda path: self.statusBar().showMessage(f"Saved timelapse {path}", 3000))
+        self.startImageTask(task, "Exporting timelapse")
+
+    # run a save or open task on the thread pool and show its progress in the status bar
+    def startImageTask(self, task, action):
+        self.imageTasks.add(task)  # keep the task and its signals alive until it is done
+        task.setAutoDelete(False)
+        self.statusBar().showMessage(f"{action}...")  # saving and opening send no progress, only timelapses do
+        task.signals.progress.connect(lambda percent: self.statusBar().showMessage(f"{action}... {percent}%"))
+        task.signals.failed.connect(lambda error: self.statusBar().showMessage(f"{action} failed: {error}", 5000))
+        task.signals.finished.connect(lambda _: self.imageTasks.discard(task))
+        task.signals.failed.connect(lambda _: self.imageTasks.discard(task))
+        QThreadPool.globalInstance().start(task)
+
+    # put the image read by an open task on the canvas
+    def imageOpened(self, image):
+        self.statusBar().clearMessage()
+        # the opened image replaces the drawing, keep it so it can be redrawn under new strokes on resize
+        self.background = image
+        self.strokeLog.clear(self.width(), self.height())
+        # the strokes are gone from the canvas, so they must not come back in a replay or a recovery either
+        if self.recorder is not None:
+            self.recorder.clear()
+        if self.journal is not None:
+            self.journal.clear(self.strokeLog.width, self.strokeLog.height)
+        self.renderCanvas(self.width(), self.height())  # the window may have been resized while it was read
 
 
 # this code will be executed if it is the main module but not if the module is imported
 #  https://stackoverflow.com/questions/419163/what-does-if-name-main-do
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # the journal and the leaderboard are only needed by the game started here, not by windows made by the benchmarks
+    import journal
+    from leaderboard import Leaderboard, DEFAULT_PATH as DEFAULT_LEADERBOARD
+    # --connect host:port --room name plays through server.py with the other players on their own machines
+    parser = argparse.ArgumentParser(description="Pictionary Game")
+    parser.add_argument("--connect", help="host:port of a server started with server.py")
+    parser.add_argument("--room", default="default", help="room to join on the server")
+    parser.add_argument("--name", default="player", help="player this window plays over the network, player 1's window picks the words")
+    parser.add_argument("--workshop", metavar="WIDTHxHEIGHT", help="start in workshop mode on a canvas of this size, e.g. 20000x20000")
+    parser.add_argument("--spectator-port", type=int, help="stream the canvas to spectators connecting to this port")
+    parser.add_argument("--spectator-file", help="write the spectator stream of the canvas to this file")
+    parser.add_argument("--players", nargs=2, metavar="NAME", help="names of the two players, the setup dialog is skipped")
+    parser.add_argument("--difficulty", choices=["Easy", "Hard"], default="Easy", help="difficulty when --players is given")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each phase of starting took up to the first paint, then quit")
+    parser.add_argument("--journal", default=journal.DEFAULT_PATH, help="crash-safe journal of the game, a game left in it is restored")
+    parser.add_argument("--no-journal", action="store_true", help="do not journal the game")
+    parser.add_argument("--sync-interval", type=float, default=journal.SYNC_INTERVAL * 1000,
+                        help="milliseconds between two syncs of the journal to disk")
+    parser.add_argument("--leaderboard", default=DEFAULT_LEADERBOARD, help="SQLite database the games are kept in for the leaderboards")
+    parser.add_argument("--no-leaderboard", action="store_true", help="do not keep the games for the leaderboards")
+    args, qtArgs = parser.parse_known_args()
+    if args.profile_startup:
+        startup.begin(startupStart)
+    startup.mark("imports")
+    app = QApplication(sys.argv[:1] + qtArgs)
+    startup.mark("application")
 
     # adding style
     app.setStyleSheet("""
@@ -691,6 +1665,36 @@ if __name__ == "__main__":
                 border: none; 
             }
         """)
-    window = PictionaryGame()
+    startup.mark("stylesheet")
+    # a game the journal still holds did not close normally and carries on, otherwise the players are asked for before
+    # the window is built, so the dialog is up as soon as possible
+    recovered = None if args.no_journal or args.profile_startup else journal.recover(args.journal)
+    if recovered is not None:
+        setupData = recovered.setupData()
+    elif args.players:
+        setupData = {"player1": args.players[0], "player2": args.players[1], "difficulty": args.difficulty}
+    else:
+        dialog = PlayerSetupDialog()
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            log.info("game_setup_cancelled")
+            sys.exit()  # Exit the application if setup is canceled
+        setupData = dialog.get_data()
+        log.info("game_setup", player1=setupData['player1'], player2=setupData['player2'], difficulty=setupData['difficulty'])
+    startup.mark("setup dialog")
+    network = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        from netclient import NetworkClient  # only needed when playing over the network
+        network = NetworkClient(host, int(port), args.room, args.name)
+    gameJournal = None if args.no_journal or args.profile_startup else journal.Journal(args.journal, args.sync_interval / 1000)
+    leaderboard = None if args.no_leaderboard else Leaderboard(args.leaderboard)
+    window = PictionaryGame(network, setupData, gameJournal, recovered, leaderboard)
+    if args.workshop:
+        width, height = (int(n) for n in args.workshop.lower().split("x"))
+        window.setWorkshopMode(True, width, height)
+        window.workshopAction.setChecked(True)
+    if args.spectator_port is not None or args.spectator_file:
+        window.startSpectator(args.spectator_port, args.spectator_file)
     window.show()
+    startup.mark("show")
     app.exec()  # start the event loop running
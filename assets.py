@@ -0,0 +1,40 @@
+# Icons and cursors of the game, each one is read from disk and scaled only once and then reused
+# the icons folder is found next to this file so the game can be started from any working directory
+
+import os
+from PyQt6.QtGui import QCursor, QIcon, QPixmap
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+CURSOR_SIZE = 25
+
+_pixmaps = {}
+_icons = {}
+_cursors = {}
+
+
+# path of icons/<name>.png
+def iconPath(name):
+    return os.path.join(ICON_DIR, name + ".png")
+
+
+def pixmap(name):
+    image = _pixmaps.get(name)
+    if image is None:
+        image = _pixmaps[name] = QPixmap(iconPath(name))  # a missing file gives a null pixmap, which is cached too
+    return image
+
+
+def icon(name):
+    result = _icons.get(name)
+    if result is None:
+        result = _icons[name] = QIcon(pixmap(name))  # documentation: https://doc.qt.io/qt-6/qicon.html
+    return result
+
+
+# cursor made from an icon scaled to the cursor size, hotX and hotY are the point of the cursor that clicks
+def cursor(name, hotX, hotY):
+    key = (name, hotX, hotY)
+    result = _cursors.get(key)
+    if result is None:
+        result = _cursors[key] = QCursor(pixmap(name).scaled(CURSOR_SIZE, CURSOR_SIZE), hotX, hotY)  # documentation: https://doc.qt.io/qt-6/qcursor.html
+    return result
@@ -0,0 +1,14 @@
+# Helpers shared by the benchmarks
+#  from benchtools import peakMemory
+
+import sys
+
+
+# peak resident memory of this process in bytes, None where it cannot be read
+def peakMemory():
+    try:
+        import resource  # not on windows, documentation: https://docs.python.org/3/library/resource.html
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on mac, KiB elsewhere
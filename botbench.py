@@ -0,0 +1,105 @@
+# Benchmark of the bot guesser's drawing index as the library of recorded drawings grows
+# every word of a pack gets a made up shape, noisy copies of the shapes are written to a .pict recording, the index is
+# built from it and then asked to recognise new copies drawn one stroke at a time
+#  python botbench.py --sizes 1000 5000 20000 --queries 200
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from recognizer import DrawingFeatures, DrawingIndex
+from recording import RecordingWriter
+from wordpacks import loadPack
+
+CANVAS_WIDTH, CANVAS_HEIGHT = 800, 600
+
+
+# a few strokes of made up shapes for a word, in 0 to 1 coordinates, always the same for the same word
+def prototype(word):
+    rng = random.Random(word)
+    strokes = []
+    for _ in range(rng.randint(2, 5)):
+        kind = rng.choice(("line", "circle", "zigzag", "arc"))
+        cx, cy, r = rng.uniform(0.2, 0.8), rng.uniform(0.2, 0.8), rng.uniform(0.1, 0.3)
+        if kind == "line":
+            stroke = [(rng.random(), rng.random()) for _ in range(2)]
+        elif kind == "circle":
+            stroke = [(cx + r * math.cos(a / 10), cy + r * math.sin(a / 10)) for a in range(64)]
+        elif kind == "zigzag":
+            stroke = [(cx - r + i * r / 3, cy + (r / 2 if i % 2 else -r / 2)) for i in range(7)]
+        else:
+            start = rng.uniform(0, math.pi)
+            stroke = [(cx + r * math.cos(start + a / 10), cy + r * math.sin(start + a / 10)) for a in range(32)]
+        strokes.append(stroke)
+    return strokes
+
+
+# the shape drawn somewhere on the canvas at some size with shaky hands, as flat x, y values per stroke
+def drawInstance(shape, rng, noise=0.02):
+    size = rng.uniform(0.4, 0.9) * min(CANVAS_WIDTH, CANVAS_HEIGHT)
+    left, top = rng.uniform(0, CANVAS_WIDTH - size), rng.uniform(0, CANVAS_HEIGHT - size)
+    strokes = []
+    for stroke in shape:
+        points = []
+        for x, y in stroke:
+            points += (left + (x + rng.gauss(0, noise)) * size, top + (y + rng.gauss(0, noise)) * size)
+        strokes.append(points)
+    return strokes
+
+
+def writeLibrary(path, words, shapes, count, rng):
+    writer = RecordingWriter(path)
+    writer.setup("Alice", "Bob", "Easy")
+    writer.canvas(CANVAS_WIDTH, CANVAS_HEIGHT)
+    for i in range(count):
+        word = words[i % len(words)]
+        writer.turn("Alice", "Bob", word)
+        for points in drawInstance(shapes[word], rng):
+            writer.stroke(0xff000000, 3, points)
+        writer.clear()
+    writer.close()
+
+
+def bench(words, sizes, queries):
+    shapes = {word: prototype(word) for word in words}
+    rng = random.Random(0)
+    # the drawings to recognise, the same for every library size
+    tests = [(word, drawInstance(shapes[word], rng)) for word in rng.choices(words, k=queries)]
+    print(f"{len(words)} words, {queries} drawings to recognise")
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, f"library{size}.pict")
+            writeLibrary(path, words, shapes, size, random.Random(size))
+            start = time.perf_counter()
+            index = DrawingIndex.fromRecordings([path])
+            buildTime = time.perf_counter() - start
+            strokeTimes = []
+            guessTimes = []
+            top1 = top3 = 0
+            for word, strokes in tests:
+                features = DrawingFeatures(CANVAS_WIDTH, CANVAS_HEIGHT)
+                for points in strokes:
+                    start = time.perf_counter()
+                    features.addStroke(points)
+                    strokeTimes.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                ranked = index.rank(features, words)
+                guessTimes.append(time.perf_counter() - start)
+                top1 += ranked[0] == word
+                top3 += word in ranked[:3]
+            guessTimes.sort()
+            print(f"{size:7} drawings: build {buildTime * 1000:8.1f}ms ({buildTime / size * 1e6:.0f}us per drawing), "
+                  f"add stroke {np.mean(strokeTimes) * 1000:.3f}ms, guess p50 {guessTimes[len(guessTimes) // 2] * 1000:.2f}ms "
+                  f"p99 {guessTimes[int(len(guessTimes) * 0.99)] * 1000:.2f}ms, top 1 {top1 / queries:.0%}, top 3 {top3 / queries:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bot guesser's drawing index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000], help="drawings in the library")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--words", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "easymode.txt"))
+    args = parser.parse_args()
+    bench(list(loadPack(args.words)), args.sizes, args.queries)
@@ -0,0 +1,93 @@
+# Compares the paint events, frame time and processor time of continuous drawing, without a display
+# the mouse is moved in circles at a steady rate for a few seconds. --compare pacing draws once with every mouse move
+# repainted on its own and once with the repaints collected into one per screen refresh, --compare dirty draws once
+# repainting the whole window for every new segment and once repainting only the rect around it
+#  python drawbench.py --seconds 5 --rate 500
+#  python drawbench.py --compare dirty --size 3840x2160
+#  python drawbench.py --scale 2   (pretend to be a high dpi screen)
+
+import argparse
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QEvent, QPointF
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+from instrumentation import stats
+
+
+def mouseEvent(kind, x, y):
+    button = Qt.MouseButton.LeftButton
+    buttons = Qt.MouseButton.NoButton if kind == QEvent.Type.MouseButtonRelease else button
+    return QMouseEvent(kind, QPointF(x, y), QPointF(x, y), button, buttons, Qt.KeyboardModifier.NoModifier)
+
+
+# move the mouse around a circle at rate events per second for the given seconds, returns the wall and processor time
+def draw(app, window, seconds, rate):
+    cx, cy = window.width() / 2, window.height() / 2
+    radius = min(cx, cy) / 2
+    app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonPress, cx + radius, cy))
+    start = time.perf_counter()
+    cpuStart = time.process_time()
+    moves = 0
+    nextMove = start
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter()
+        if now >= nextMove:
+            angle = moves * 0.02
+            x, y = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+            app.sendEvent(window, mouseEvent(QEvent.Type.MouseMove, x, y))
+            moves += 1
+            nextMove += 1 / rate
+        app.processEvents()
+        time.sleep(max(nextMove - time.perf_counter(), 0))
+    app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonRelease, x, y))
+    app.processEvents()
+    return time.perf_counter() - start, time.process_time() - cpuStart
+
+
+# settings of the window drawn with for each comparison
+COMPARISONS = {
+    "pacing": (("per event", {"framePacing": False}), ("frame paced", {"framePacing": True})),
+    "dirty": (("full window", {"incrementalRendering": False}), ("dirty rect", {"incrementalRendering": True})),
+}
+
+
+def bench(seconds, rate, compare, size):
+    from PictionaryGame import PictionaryGame
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    print(f"device pixel ratio {app.primaryScreen().devicePixelRatio()}, {rate} mouse moves/s for {seconds}s")
+    for name, settings in COMPARISONS[compare]:
+        window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+        for setting, value in settings.items():
+            setattr(window, setting, value)
+        if size:
+            window.resize(*size)
+        window.show()
+        app.processEvents()
+        stats.reset()
+        elapsed, cpu = draw(app, window, seconds, rate)
+        paint = stats.histograms.get("paint")
+        paintMs = paint.total / paint.count * 1000 if paint else 0.0
+        print(f"{name:>12}: {stats.counters.get('paint_events', 0) / elapsed:7.1f} paint events/s, "
+              f"cpu {cpu / elapsed * 100:5.1f}%, mean paint {paintMs:.2f}ms, {window.width()}x{window.height()} window")
+        window.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark repainting while drawing")
+    parser.add_argument("--compare", choices=sorted(COMPARISONS), default="pacing",
+                        help="frame pacing against repainting every event, or dirty rects against repainting the whole window")
+    parser.add_argument("--size", metavar="WIDTHxHEIGHT", help="size of the window, e.g. 3840x2160")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--rate", type=float, default=500, help="mouse move events per second")
+    parser.add_argument("--scale", default=None, help="device pixel ratio to pretend the screen has")
+    args = parser.parse_args()
+    if args.scale:
+        os.environ["QT_SCALE_FACTOR"] = args.scale  # read when the application starts, documentation: https://doc.qt.io/qt-6/highdpi.html
+    size = tuple(int(n) for n in args.size.lower().split("x")) if args.size else None
+    bench(args.seconds, args.rate, args.compare, size)
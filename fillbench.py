@@ -0,0 +1,135 @@
+# Checks the bucket fill of floodfill.py against a plain pixel by pixel fill on synthetic shapes, then times
+# fills of a full canvas
+#  python fillbench.py --width 1920 --height 1080 --repeat 20
+
+import argparse
+import time
+from collections import deque
+from PyQt6.QtCore import Qt, QPointF, QRect
+from PyQt6.QtGui import QImage, QPainter, QPen, QColor, QPolygonF
+from floodfill import floodFill, pixelArray, pixelValue
+
+
+def newImage(width, height):
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    return image
+
+
+# the obvious fill, one pixel at a time, only fast enough for small images
+def referenceFill(image, x, y, color, tolerance):
+    width, height = image.width(), image.height()
+    target = QColor.fromRgba(image.pixel(x, y))
+    value = pixelValue(color)
+    if image.pixel(x, y) == value and tolerance <= 0:
+        return image
+    result = image.copy()
+
+    def close(px, py):
+        other = QColor.fromRgba(image.pixel(px, py))
+        return all(abs(a - b) <= tolerance for a, b in zip(other.getRgb(), target.getRgb()))
+    seen = {(x, y)}
+    queue = deque([(x, y)])
+    while queue:
+        px, py = queue.popleft()
+        result.setPixel(px, py, value)
+        for nx, ny in ((px + 1, py), (px - 1, py), (px, py + 1), (px, py - 1)):
+            if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in seen and close(nx, ny):
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+    return result
+
+
+# small images with the shapes a fill has to get right, and where to click on each
+def shapes():
+    pen = QPen(Qt.GlobalColor.black, 3)
+    # closed ring: the fill must stay inside
+    image = newImage(120, 90)
+    painter = QPainter(image)
+    painter.setPen(pen)
+    painter.drawEllipse(20, 10, 80, 70)
+    painter.end()
+    yield "ring inside", image, 60, 45
+    yield "ring outside", image, 2, 2
+    # comb open at the bottom: the fill has to go down and back up between the teeth
+    image = newImage(120, 90)
+    painter = QPainter(image)
+    painter.setPen(pen)
+    for x in range(10, 110, 12):
+        painter.drawLine(x, 0, x, 70)
+    painter.end()
+    yield "comb", image, 15, 5
+    # spiral: runs that only connect through a long winding path
+    image = newImage(100, 100)
+    painter = QPainter(image)
+    painter.setPen(pen)
+    points = []
+    for i in range(12):
+        r = 45 - i * 4
+        points += [QPointF(50 - r, 50 - r), QPointF(50 + r, 50 - r), QPointF(50 + r, 50 + r), QPointF(50 - r + 4, 50 + r)]
+    painter.drawPolyline(QPolygonF(points))
+    painter.end()
+    yield "spiral", image, 2, 50
+    # checkerboard: diagonal neighbours are not connected
+    image = newImage(64, 64)
+    painter = QPainter(image)
+    for y in range(0, 64, 8):
+        for x in range(0, 64, 8):
+            if (x + y) // 8 % 2:
+                painter.fillRect(QRect(x, y, 8, 8), Qt.GlobalColor.black)
+    painter.end()
+    yield "checkerboard", image, 1, 1
+    # gradient: only the tolerance decides how far the fill goes
+    image = newImage(128, 32)
+    pixels = pixelArray(image)
+    for x in range(128):
+        pixels[:, x] = QColor(255 - x, 255 - x, 255).rgba()
+    yield "gradient", image, 0, 0
+
+
+def check(tolerances):
+    failures = 0
+    for name, image, x, y in shapes():
+        for tolerance in tolerances:
+            expected = referenceFill(image, x, y, Qt.GlobalColor.red, tolerance)
+            filled = image.copy()
+            floodFill(filled, x, y, Qt.GlobalColor.red, tolerance)
+            ok = filled == expected
+            failures += not ok
+            print(f"{name:>14} tolerance {tolerance:3}: {'ok' if ok else 'DIFFERENT'}")
+    return failures
+
+
+def bench(width, height, repeat):
+    image = newImage(width, height)
+    for tolerance in (0, 32):
+        times = []
+        for i in range(repeat):
+            color = Qt.GlobalColor.red if i % 2 == 0 else Qt.GlobalColor.white  # every fill changes the whole canvas
+            start = time.perf_counter()
+            floodFill(image, width // 2, height // 2, color, tolerance)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        print(f"full {width}x{height} fill, tolerance {tolerance}: median {times[len(times) // 2] * 1000:.1f}ms, "
+              f"best {times[0] * 1000:.1f}ms")
+    # a canvas covered in scribbles, many short runs
+    image = newImage(width, height)
+    painter = QPainter(image)
+    painter.setPen(QPen(Qt.GlobalColor.black, 2))
+    for i in range(0, width, 7):
+        painter.drawLine(i, 0, width - i, height)
+    painter.end()
+    start = time.perf_counter()
+    changed = floodFill(image, 0, height // 2, Qt.GlobalColor.red, 0)
+    print(f"fill between {width // 7} crossing lines: {(time.perf_counter() - start) * 1000:.1f}ms, changed {changed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time the bucket fill")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if check((0, 40, 100)):
+        raise SystemExit("the fill does not match the reference fill")
+    bench(args.width, args.height, args.repeat)
@@ -0,0 +1,114 @@
+# Bucket fill for the canvas
+# the pixels of the QImage are looked at through a numpy array that shares its memory, nothing is copied. The
+# pixels close enough to the clicked one are found for the whole image at once, split into horizontal runs per
+# scanline, and only the runs are walked in Python: a run is filled when it touches a filled run on the row
+# above or below. A full 1920x1080 fill is a few thousand runs instead of two million pixels
+#  https://en.wikipedia.org/wiki/Flood_fill#Span_filling
+#  https://numpy.org/doc/stable/reference/generated/numpy.frombuffer.html
+
+from bisect import bisect_right
+import numpy as np
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QColor, qPremultiply
+
+
+# numpy view of the 32 bit pixels of an image as rows x columns, writing to it changes the image
+def pixelArray(image):
+    bits = image.bits()  # documentation: https://doc.qt.io/qt-6/qimage.html#bits
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint32).reshape(image.height(), image.bytesPerLine() // 4)
+    return rows[:, :image.width()]
+
+
+# the pixel value a colour has in an image of the ARGB32_Premultiplied format used by the canvas
+def pixelValue(color):
+    return qPremultiply(QColor(color).rgba())  # documentation: https://doc.qt.io/qt-6/qcolor.html#qPremultiply
+
+
+# True for every pixel within tolerance of the target pixel on each of its four channels, written into out
+def matchMask(pixels, target, tolerance, out):
+    if tolerance <= 0:
+        return np.equal(pixels, target, out=out)
+    height, width = pixels.shape
+    channels = pixels.view(np.uint8).reshape(height, width * 4)
+    low = np.array([max(value - tolerance, 0) for value in int(target).to_bytes(4, "little")], dtype=np.uint8)
+    span = np.array([min(value + tolerance, 255) for value in int(target).to_bytes(4, "little")], dtype=np.uint8) - low
+    # uint8 subtraction wraps around, so a channel below low ends up bigger than span, one compare checks both ends
+    inRange = np.less_equal(channels - np.tile(low, width), np.tile(span, width))
+    # the four channel results of a pixel are four bytes of 0 or 1, read them as one 32 bit number
+    return np.equal(inRange.view(np.uint32), 0x01010101, out=out)
+
+
+# first and end (exclusive) flat indexes of the runs of True in a mask with a False column at the end of every row,
+# the runs are in scanline order
+def maskRuns(padded):
+    flat = padded.ravel()
+    # a change between neighbours is the start of a run or the pixel after its end, they come in pairs
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    if flat[0]:
+        changes = np.concatenate(([0], changes))
+    return changes[0::2], changes[1::2]
+
+
+# runs of the area around (x, y) that a fill with the given colour and tolerance would paint, as a list of
+# (row, start, end), None if the fill would not change anything
+def fillRuns(image, x, y, color, tolerance=0):
+    if not (0 <= x < image.width() and 0 <= y < image.height()):
+        return None
+    pixels = pixelArray(image)
+    target = int(pixels[y, x])
+    if target == pixelValue(color) and tolerance <= 0:
+        return None
+    height, width = pixels.shape
+    padded = np.zeros((height, width + 1), dtype=bool)  # the extra column stops runs from carrying on to the next row
+    matchMask(pixels, target, tolerance, padded[:, :width])
+    first, last = maskRuns(padded)
+    rows = first // (width + 1)
+    rowFirst = np.searchsorted(rows, np.arange(height + 1)).tolist()  # the runs of row r are rowFirst[r]:rowFirst[r + 1]
+    starts = (first - rows * (width + 1)).tolist()
+    ends = (last - rows * (width + 1)).tolist()
+    rows = rows.tolist()
+    seed = bisect_right(starts, x, rowFirst[y], rowFirst[y + 1]) - 1  # the run containing the clicked pixel
+    seen = bytearray(len(starts))
+    seen[seed] = 1
+    stack = [seed]
+    filled = []
+    while stack:
+        i = stack.pop()
+        filled.append(i)
+        start, end, row = starts[i], ends[i], rows[i]
+        for other in (row - 1, row + 1):
+            if 0 <= other < image.height():
+                rowEnd = rowFirst[other + 1]
+                j = bisect_right(ends, start, rowFirst[other], rowEnd)  # first run of that row ending after this one starts
+                while j < rowEnd and starts[j] < end:
+                    if not seen[j]:
+                        seen[j] = 1
+                        stack.append(j)
+                    j += 1
+    return [(rows[i], starts[i], ends[i]) for i in filled]
+
+
+# pixels covered by a list of runs
+def runsRect(runs):
+    top = min(run[0] for run in runs)
+    bottom = max(run[0] for run in runs)
+    left = min(run[1] for run in runs)
+    right = max(run[2] for run in runs)
+    return QRect(left, top, right - left, bottom - top + 1)
+
+
+def paintRuns(image, runs, color):
+    pixels = pixelArray(image)
+    value = pixelValue(color)
+    for row, start, end in runs:
+        pixels[row, start:end] = value
+
+
+# fill the area around pixel (x, y) of the image, returns the rect of the changed pixels or None if nothing changed
+def floodFill(image, x, y, color, tolerance=0):
+    runs = fillRuns(image, x, y, color, tolerance)
+    if runs is None:
+        return None
+    paintRuns(image, runs, color)
+    return runsRect(runs)
@@ -0,0 +1,136 @@
+# Rules of the Pictionary game without any user interface
+# PictionaryGame drives a GameState for the real game and simulate.py plays thousands of games with it,
+# so nothing in this module may import Qt
+
+import random
+
+# points given when the guesser finds the word, and taken away for a wrong guess
+GUESSER_POINTS = 5
+SKETCHER_POINTS = 10
+WRONG_GUESS_POINTS = -1
+TRIES_PER_TURN = 3
+
+# phases of a turn, each turn goes through them in this order
+WORD_REVEAL = "word"  # the sketcher is being shown the word
+DRAWING = "drawing"
+GUESSING = "guessing"  # the guesser is typing answers
+TURN_OVER = "over"  # the result is shown and the next turn has not started yet
+
+
+class GameState:
+    '''
+    Players, scores and the current turn of one game
+    '''
+    __slots__ = ("player1Name", "player2Name", "difficulty", "player1_score", "player2_score", "tries",
+                 "currentSketcher", "currentGuesser", "currentWord", "words", "matcher", "phase", "rng")
+
+    def __init__(self, rng=None):
+        self.player1Name = ""
+        self.player2Name = ""
+        self.difficulty = ""
+        self.player1_score = 0
+        self.player2_score = 0
+        self.tries = TRIES_PER_TURN
+        self.currentSketcher = ""
+        self.currentGuesser = ""
+        self.currentWord = None
+        self.words = None  # word sampler of the game, anything with a draw() method like wordpacks.WordSampler
+        self.phase = TURN_OVER
+        self.matcher = None  # checks guesses, anything with an isCorrect(answer, word) method like matching.AnswerMatcher
+        self.rng = rng or random.Random()
+
+    # reset the scores and randomly pick who sketches first
+    def newGame(self, player1, player2, difficulty, words, matcher=None):
+        self.player1Name = player1
+        self.player2Name = player2
+        self.difficulty = difficulty
+        self.words = words
+        self.matcher = matcher
+        self.player1_score, self.player2_score = 0, 0
+        self.tries = TRIES_PER_TURN
+        self.currentWord = None
+        self.phase = TURN_OVER
+        self.currentSketcher = self.rng.choice([player1, player2])
+        self.currentGuesser = player2 if self.currentSketcher == player1 else player1
+
+    # draw the next word, None if there are no words
+    def getWord(self):
+        if self.words is None:
+            return None
+        return self.words.draw()
+
+    # pick the word for the turn that starts
+    def startNewTurn(self):
+        self.currentWord = self.getWord()
+        self.phase = WORD_REVEAL
+        return self.currentWord
+
+    # start a turn picked somewhere else, over the network player 1's window picks the roles and the word for both
+    def startTurn(self, sketcher, guesser, word):
+        self.currentSketcher, self.currentGuesser = sketcher, guesser
+        self.currentWord = word
+        self.tries = TRIES_PER_TURN
+        self.phase = WORD_REVEAL
+
+    # the sketcher has seen the word
+    def startDrawing(self):
+        self.phase = DRAWING
+
+    # the sketcher has finished drawing, returns False if it is not the time to guess
+    def startGuessing(self):
+        if self.phase not in (DRAWING, GUESSING):
+            return False
+        self.phase = GUESSING
+        return True
+
+    # the guesser went back to watching the drawing without finishing the turn
+    def stopGuessing(self):
+        if self.phase == GUESSING:
+            self.phase = DRAWING
+
+    # True if answer counts as the current word, without a matcher the comparison is only case-insensitive
+    def isCorrect(self, answer):
+        if self.matcher is not None:
+            return self.matcher.isCorrect(answer, self.currentWord)
+        return answer.strip().lower() == self.currentWord.strip().lower()
+
+    # score a guess from player, returns True if it is the current word
+    def checkAnswer(self, answer, player):
+        if self.isCorrect(answer):
+            # the guesser and the sketcher both get points
+            if player == self.player1Name:
+                self.player1_score += GUESSER_POINTS
+                self.player2_score += SKETCHER_POINTS
+            else:
+                self.player2_score += GUESSER_POINTS
+                self.player1_score += SKETCHER_POINTS
+            self.phase = TURN_OVER
+            return True
+        # remove one try and a point for the wrong answer
+        self.tries -= 1
+        if player == self.player1Name:
+            self.player1_score += WRONG_GUESS_POINTS
+        else:
+            self.player2_score += WRONG_GUESS_POINTS
+        if self.tries <= 0:
+            self.phase = TURN_OVER
+        return False
+
+    # a guess scored by the guesser's window on another machine, with the scores it came to
+    def applyAnswer(self, correct, score1, score2):
+        self.player1_score, self.player2_score = score1, score2
+        if self.phase == TURN_OVER:
+            return  # the turn is already over here, only the scores are kept
+        if not correct:
+            self.tries -= 1
+        if self.isTurnOver(correct):
+            self.phase = TURN_OVER
+
+    # the turn ends on a correct answer or when the guesser runs out of tries
+    def isTurnOver(self, correct):
+        return correct or self.tries <= 0
+
+    # give the next turn 3 tries and swap the players roles
+    def endTurn(self):
+        self.tries = TRIES_PER_TURN
+        self.currentGuesser, self.currentSketcher = self.currentSketcher, self.currentGuesser
@@ -0,0 +1,135 @@
+# Undo/redo for the canvas in PictionaryGame
+# the canvas is split into fixed size tiles and a stroke only keeps copies of the tiles it painted on,
+# so the cost of an undo depends on the size of the stroke and not on the size of the window.
+# The tiles are in the device pixels of the canvas image, the rects given by the window are in logical pixels
+
+from collections import deque
+from PyQt6.QtCore import QRect, QRectF
+from PyQt6.QtGui import QPainter
+
+
+class HistoryEntry:
+    '''
+    Tiles of one stroke before and after it was drawn
+    '''
+    __slots__ = ("before", "after", "size", "stroke")
+
+    def __init__(self, before, after, size):
+        self.before = before  # list of (rect, image) copied before the stroke, None once the canvas was resized
+        self.after = after  # list of (rect, image) copied after the stroke, None once the canvas was resized
+        self.size = size  # bytes used by the copies
+        self.stroke = None  # stroke log record taken out when the entry is undone
+
+
+class TileHistory:
+    '''
+    Undo/redo stack of tile snapshots limited to a byte budget, the oldest history is dropped first
+    '''
+
+    def __init__(self, tileSize=64, budget=64 * 1024 * 1024):
+        self.tileSize = tileSize
+        self.budget = budget  # the most bytes the tile copies can use together
+        self.undoStack = deque()  # oldest entry on the left
+        self.redoStack = []
+        self.size = 0  # bytes used by both stacks
+        self.current = None  # tiles copied by the stroke being drawn, keyed by tile position
+
+    # forget all the history, used when the canvas is cleared, resized or replaced
+    def clear(self):
+        self.undoStack.clear()
+        self.redoStack.clear()
+        self.size = 0
+        self.current = None
+
+    # the canvas was resized so the tiles no longer match it, the strokes can still be undone and redone but the window
+    # has to draw the canvas again from the stroke log for the entries without tiles
+    def dropTiles(self):
+        for entry in self.undoStack:
+            entry.before = entry.after = None
+            entry.size = 0
+        for entry in self.redoStack:
+            entry.before = entry.after = None
+            entry.size = 0
+        self.size = 0
+        self.current = None
+
+    def beginStroke(self):
+        self.current = {}
+
+    # copy the tiles under rect before they are painted on, each tile is only copied once per stroke
+    def touch(self, image, rect):
+        if self.current is None:
+            return
+        t = self.tileSize
+        rect = deviceRect(image, rect).intersected(image.rect())  # documentation: https://doc.qt.io/qt-6/qrect.html#intersected
+        if rect.isEmpty():
+            return
+        for ty in range(rect.top() // t, rect.bottom() // t + 1):
+            for tx in range(rect.left() // t, rect.right() // t + 1):
+                if (tx, ty) not in self.current:
+                    tileRect = QRect(tx * t, ty * t, t, t).intersected(image.rect())
+                    self.current[(tx, ty)] = (tileRect, image.copy(tileRect))  # documentation: https://doc.qt.io/qt-6/qimage.html#copy
+
+    # the stroke was dropped without painting anything
+    def cancelStroke(self):
+        self.current = None
+
+    # copy the same tiles again now that the stroke is drawn and push the stroke on the undo stack
+    def endStroke(self, image):
+        if not self.current:
+            self.current = None
+            return
+        before = list(self.current.values())
+        after = [(rect, image.copy(rect)) for rect, _ in before]
+        size = sum(2 * rect.width() * rect.height() * image.depth() // 8 for rect, _ in before)
+        self.current = None
+        # a new stroke makes the redo history unreachable
+        for entry in self.redoStack:
+            self.size -= entry.size
+        self.redoStack.clear()
+        self.undoStack.append(HistoryEntry(before, after, size))
+        self.size += size
+        self.evict()
+
+    # drop the oldest entries until the copies fit in the budget
+    def evict(self):
+        while self.size > self.budget and self.undoStack:
+            self.size -= self.undoStack.popleft().size
+
+    # put the tiles from before the last stroke back on the image and return its entry, None if there is nothing to undo
+    def undo(self, image):
+        if not self.undoStack:
+            return None
+        entry = self.undoStack.pop()
+        if entry.before is not None:
+            self.paintTiles(image, entry.before)
+        self.redoStack.append(entry)
+        return entry
+
+    # put the tiles from after the last undone stroke back on the image and return its entry, None if there is nothing to redo
+    def redo(self, image):
+        if not self.redoStack:
+            return None
+        entry = self.redoStack.pop()
+        if entry.after is not None:
+            self.paintTiles(image, entry.after)
+        self.undoStack.append(entry)
+        return entry
+
+    def paintTiles(self, image, tiles):
+        ratio = image.devicePixelRatio()
+        image.setDevicePixelRatio(1)  # the tile rects are in device pixels, so paint without the high dpi scaling
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)  # replace the pixels instead of blending
+        for rect, tile in tiles:
+            painter.drawImage(rect, tile, tile.rect())
+        painter.end()
+        image.setDevicePixelRatio(ratio)
+
+
+# the device pixels of an image covered by a rect in its logical pixels
+def deviceRect(image, rect):
+    ratio = image.devicePixelRatio()
+    if ratio == 1:
+        return rect
+    return QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio).toAlignedRect()
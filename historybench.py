@@ -0,0 +1,151 @@
+# Checks and benchmark of the tiled undo/redo history
+# thousands of random strokes, undos and redos are drawn through a history with a small budget and the bytes held
+# by the tile copies (counted from the images themselves) are checked never to go over the budget, then the time of
+# an undo and a redo is measured on canvases of growing size, and the window is checked to leave the stroke being
+# drawn alone when undo is pressed in the middle of it and to keep its strokes to undo when it is resized
+#  python historybench.py --strokes 5000 --budget 4
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QEvent, QPointF
+from PyQt6.QtGui import QImage, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QApplication
+from history import TileHistory
+from drawbench import mouseEvent
+
+
+# draw a random scribble on the image through the history, the way flushStroke does
+def drawStroke(history, image, rng, length):
+    x, y = rng.uniform(0, image.width()), rng.uniform(0, image.height())
+    path = QPainterPath(QPointF(x, y))
+    for _ in range(rng.randint(2, 20)):
+        x, y = x + rng.uniform(-length, length), y + rng.uniform(-length, length)
+        path.lineTo(x, y)
+    width = rng.choice((3, 5, 7, 9))
+    history.beginStroke()
+    history.touch(image, path.boundingRect().toAlignedRect().adjusted(-width, -width, width, width))
+    painter = QPainter(image)
+    painter.setPen(QPen(Qt.GlobalColor.black, width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+    painter.drawPath(path)
+    painter.end()
+    history.endStroke(image)
+
+
+# bytes of the tile copies both stacks hold, counted from the images and not from the history's own total
+def heldBytes(history):
+    entries = list(history.undoStack) + history.redoStack
+    return sum(tile.sizeInBytes() for entry in entries for tiles in (entry.before, entry.after) for _, tile in tiles)
+
+
+def checkBudget(strokes, budget, width, height, rng):
+    history = TileHistory(budget=budget)
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    peak = 0
+    for _ in range(strokes):
+        choice = rng.random()
+        if choice < 0.15:
+            history.undo(image)
+        elif choice < 0.2:
+            history.redo(image)
+        else:
+            drawStroke(history, image, rng, rng.choice((10, 50, 200)))
+        held = heldBytes(history)
+        peak = max(peak, held)
+        if held != history.size:
+            raise SystemExit(f"the history counts {history.size} bytes but holds {held}")
+        if held > budget:
+            raise SystemExit(f"the history holds {held} bytes, over its budget of {budget}")
+    print(f"{strokes} strokes, undos and redos on {width}x{height}: peak {peak / 2 ** 20:.2f} MiB held of a "
+          f"{budget / 2 ** 20:.2f} MiB budget, {len(history.undoStack)} strokes left to undo")
+
+
+# median time of an undo and a redo of strokes of the same size on a canvas of the given size
+def undoTime(width, height, rng):
+    history = TileHistory()
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    for _ in range(200):
+        drawStroke(history, image, rng, 20)
+    times = []
+    for _ in range(100):
+        start = time.perf_counter()
+        history.undo(image)
+        history.redo(image)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"{width:>5}x{height:<5} canvas: undo and redo median {times[len(times) // 2] * 1e6:.0f}us")
+
+
+# undo pressed while the button is still down must not take the stroke out of the log while it is being drawn
+def checkUndoWhileDrawing(app):
+    from PictionaryGame import PictionaryGame
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    window.framePacing = False
+    window.show()
+    app.processEvents()
+    for kind, x, y in ((QEvent.Type.MouseButtonPress, 100, 100), (QEvent.Type.MouseMove, 200, 100), (QEvent.Type.MouseButtonRelease, 200, 100),
+                       (QEvent.Type.MouseButtonPress, 300, 100), (QEvent.Type.MouseMove, 400, 100)):
+        app.sendEvent(window, mouseEvent(kind, x, y))
+    window.undo()
+    for kind, x, y in ((QEvent.Type.MouseMove, 500, 100), (QEvent.Type.MouseButtonRelease, 500, 300)):
+        app.sendEvent(window, mouseEvent(kind, x, y))
+    strokes = [[round(value) for value in points] for _, _, points in window.strokeLog]
+    window.close()
+    if strokes != [[100, 100, 200, 100], [300, 100, 400, 100, 500, 100, 500, 300]]:
+        raise SystemExit(f"undo in the middle of a stroke changed the log: {strokes}")
+    print("undo while drawing leaves the stroke being drawn alone")
+
+
+# strokes drawn before a resize can still be undone and redone after it, and put back where they were drawn
+def checkUndoAcrossResize(app):
+    from PictionaryGame import PictionaryGame
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    window.framePacing = False
+    window.show()
+    app.processEvents()
+    for y in (100, 200):
+        for kind, x in ((QEvent.Type.MouseButtonPress, 100), (QEvent.Type.MouseMove, 200), (QEvent.Type.MouseButtonRelease, 200)):
+            app.sendEvent(window, mouseEvent(kind, x, y))
+    for width in range(820, 1020, 20):
+        window.resize(width, 700)  # dragged, the canvas is only stretched
+        app.processEvents()
+    window.renderResized()  # the size settled
+    app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonPress, 300, 300))
+    app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonRelease, 400, 300))
+    drawn = ([list(points) for _, _, points in window.strokeLog], window.strokeLog.width, window.strokeLog.height)
+    for _ in range(3):
+        window.undo()
+    blank = window.newCanvas(window.canvasWidth(), window.canvasHeight())
+    undone = len(window.strokeLog) == 0 and window.image == blank
+    for _ in range(3):
+        window.redo()
+    redone = ([list(points) for _, _, points in window.strokeLog], window.strokeLog.width, window.strokeLog.height)
+    expected = window.image.copy()
+    window.renderCanvas(window.canvasWidth(), window.canvasHeight())
+    window.close()
+    if not undone:
+        raise SystemExit("undo after a resize did not take back the strokes drawn before it")
+    if redone != drawn or window.image != expected:
+        raise SystemExit("redo after a resize did not put the strokes back where they were drawn")
+    print("strokes drawn before a resize are undone and redone after it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the undo/redo history")
+    parser.add_argument("--strokes", type=int, default=5000, help="strokes, undos and redos of the budget check")
+    parser.add_argument("--budget", type=float, default=4, help="MiB of tile copies the history may keep in the budget check")
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    rng = random.Random(0)
+    checkBudget(args.strokes, int(args.budget * 2 ** 20), 1920, 1080, rng)
+    for width, height in ((800, 600), (1920, 1080), (3840, 2160), (7680, 4320)):
+        undoTime(width, height, rng)
+    checkUndoWhileDrawing(app)
+    checkUndoAcrossResize(app)
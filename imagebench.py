@@ -0,0 +1,120 @@
+# Benchmark of saving and opening a very big image on the thread pool
+# a 50 megapixel drawing is saved the way SaveImageTask used to do it (encoded into memory, then copied out to the
+# file), saved by SaveImageTask as it is now (encoded straight into the file) and opened back by OpenImageTask at a
+# window size. While a task runs, a timer ticks on the GUI thread and the longest wait between two ticks tells how
+# long the window would have stopped responding. The time, the longest wait and how much the peak memory of the
+# process grew during the task are reported. Each one runs in its own process so the peak memory of one does not
+# hide the next
+#  python imagebench.py --megapixels 50
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice, QPointF, QRunnable, QSize, QThreadPool, QTimer, QEventLoop
+from PyQt6.QtGui import QGuiApplication, QImage, QImageWriter, QPainter, QPainterPath, QPen
+from imagetasks import ImageTaskSignals, SaveImageTask, OpenImageTask
+from benchtools import peakMemory
+
+MODES = ("save in memory", "save", "open")
+
+
+class InMemorySaveTask(QRunnable):
+    '''
+    What SaveImageTask did before it wrote straight into the file, kept here to compare against
+    '''
+
+    def __init__(self, image, path):
+        super().__init__()
+        self.image = image
+        self.path = path
+        self.signals = ImageTaskSignals()
+
+    def run(self):
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        QImageWriter(buffer, QByteArray(b"png")).write(self.image)
+        buffer.close()
+        with open(self.path, "wb") as f:
+            f.write(data.data())
+        self.signals.finished.emit(self.path)
+
+
+# scribbles over a white image of about the given number of pixels, 3:2 like a camera picture
+def drawing(megapixels, rng):
+    height = round((megapixels * 1e6 / 1.5) ** 0.5)
+    image = QImage(round(height * 1.5), height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    painter = QPainter(image)
+    for _ in range(2000):
+        x, y = rng.uniform(0, image.width()), rng.uniform(0, image.height())
+        path = QPainterPath(QPointF(x, y))
+        for _ in range(rng.randint(2, 20)):
+            x, y = x + rng.uniform(-300, 300), y + rng.uniform(-300, 300)
+            path.lineTo(x, y)
+        painter.setPen(QPen(Qt.GlobalColor(rng.randrange(2, 19)), rng.choice((3, 5, 7, 9)) * 4, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
+        painter.drawPath(path)
+    painter.end()
+    return image
+
+
+# run a task on the thread pool and tick a timer on this thread until it is done
+def run(app, task):
+    done = QEventLoop()
+    outcome = []
+    task.signals.finished.connect(lambda result: (outcome.append(result), done.quit()))
+    task.signals.failed.connect(lambda error: (outcome.append(error), done.quit()))
+    ticks = [time.perf_counter()]
+    timer = QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start()
+    start = time.perf_counter()
+    QThreadPool.globalInstance().start(task)
+    done.exec()
+    elapsed = time.perf_counter() - start
+    timer.stop()
+    ticks.append(time.perf_counter())
+    longest = max(b - a for a, b in zip(ticks, ticks[1:]))
+    return outcome[0], elapsed, longest
+
+
+# one task, run in a process of its own by main
+def bench(mode, path, megapixels):
+    app = QGuiApplication(sys.argv[:1])
+    if mode == "open":
+        task = OpenImageTask(path, QSize(1280, 800))
+    else:
+        image = drawing(megapixels, random.Random(0))
+        task = InMemorySaveTask(image, path) if mode == "save in memory" else SaveImageTask(image, path)
+    before = peakMemory()
+    result, elapsed, longest = run(app, task)
+    if isinstance(result, str) and result != path:
+        raise SystemExit(f"{mode} failed: {result}")
+    peak = peakMemory()
+    grew = f"peak memory grew {(peak - before) / 2 ** 20:.0f} MiB" if peak else "no peak memory on this platform"
+    print(f"{mode:>14}: {elapsed:6.2f}s, window waited at most {longest * 1000:5.0f}ms, {grew}, "
+          f"file {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark saving and opening a very big image on the thread pool")
+    parser.add_argument("--megapixels", type=float, default=50)
+    parser.add_argument("--mode", choices=MODES, help="run only one task, in this process")
+    parser.add_argument("--path", help="file the image is saved to and opened from")
+    args = parser.parse_args()
+    if args.mode:
+        bench(args.mode, args.path, args.megapixels)
+    else:
+        print(f"{args.megapixels:g} megapixel drawing saved as png and opened at 1280x800")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "drawing.png")
+            for mode in MODES:
+                subprocess.run([sys.executable, __file__, "--mode", mode, "--path", path, "--megapixels", str(args.megapixels)], check=True)
@@ -0,0 +1,95 @@
+# Saving and opening images on a worker thread so big files do not freeze the window
+# the tasks run on the global QThreadPool and report back to the GUI thread through signals
+#  documentation: https://doc.qt.io/qt-6/qthreadpool.html
+
+from PyQt6.QtCore import QObject, QRunnable, QByteArray, QIODevice, QSaveFile, pyqtSignal
+from PyQt6.QtGui import QImageReader, QImageWriter
+import os
+
+
+class ImageTaskSignals(QObject):
+    '''
+    Signals of an image task, a QRunnable is not a QObject so it cannot have its own
+    '''
+    progress = pyqtSignal(int)  # percent done, only sent by tasks that can tell how far they are
+    finished = pyqtSignal(object)  # the opened QImage, or the path the image was saved to
+    failed = pyqtSignal(str)  # error message
+
+
+class SaveImageTask(QRunnable):
+    '''
+    Encode an image and write it to a file
+    '''
+
+    def __init__(self, image, path):
+        super().__init__()
+        self.image = image  # a copy of the canvas QImage, the window keeps painting into its own
+        self.path = path
+        self.signals = ImageTaskSignals()
+
+    def run(self):
+        # the encoder writes straight into the file, so no second copy of the encoded image is held in memory. QSaveFile
+        # writes to a temporary name next to the target and only renames it over the target once everything is written,
+        # so a failed save does not leave half a file behind. documentation: https://doc.qt.io/qt-6/qsavefile.html
+        file = QSaveFile(self.path)
+        if not file.open(QIODevice.OpenModeFlag.WriteOnly):
+            self.signals.failed.emit(file.errorString())
+            return
+        # no progress is sent, QImageWriter encodes the whole image in one call and tells nothing until it is done
+        # the format is picked from the file extension like QPixmap.save does, png if there is none
+        imageFormat = os.path.splitext(self.path)[1][1:].lower() or "png"
+        writer = QImageWriter(file, QByteArray(imageFormat.encode()))  # documentation: https://doc.qt.io/qt-6/qimagewriter.html
+        if not writer.write(self.image):
+            file.cancelWriting()
+            self.signals.failed.emit(writer.errorString())
+            return
+        if not file.commit():
+            self.signals.failed.emit(file.errorString())
+            return
+        self.signals.finished.emit(self.path)
+
+
+class OpenImageTask(QRunnable):
+    '''
+    Read an image from a file, decoded straight at the given size
+    '''
+
+    def __init__(self, path, size):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.signals = ImageTaskSignals()
+
+    def run(self):
+        reader = QImageReader(self.path)  # documentation: https://doc.qt.io/qt-6/qimagereader.html
+        reader.setAutoTransform(True)
+        # let the decoder scale while decoding, so the full resolution image is never held in memory
+        reader.setScaledSize(self.size)  # documentation: https://doc.qt.io/qt-6/qimagereader.html#setScaledSize
+        image = reader.read()  # like the writer, the reader decodes in one call so there is no progress to send
+        if image.isNull():
+            self.signals.failed.emit(reader.errorString())
+            return
+        self.signals.finished.emit(image)
+
+
+class TimelapseTask(QRunnable):
+    '''
+    Replay a drawing and write it as an animated GIF or a PNG sequence
+    '''
+
+    def __init__(self, log, path, width, height, workers=0):
+        super().__init__()
+        self.log = log  # a copy of the stroke log, the window keeps changing its own
+        self.path = path
+        self.size = (width, height)
+        self.workers = workers
+        self.signals = ImageTaskSignals()
+
+    def run(self):
+        import timelapse  # only loaded when a timelapse is exported, it pulls in numpy
+        try:
+            timelapse.export(self.log, self.path, *self.size, workers=self.workers, progress=self.signals.progress.emit)
+        except (OSError, RuntimeError) as error:
+            self.signals.failed.emit(str(error))
+            return
+        self.signals.finished.emit(self.path)
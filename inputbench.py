@@ -0,0 +1,83 @@
+# Benchmark of the mouse move handling of the canvas with made up input, without a display
+# strokes are fed to the window like a high rate tablet would send them: batches of small moves queued between two
+# turns of the event loop, as fast as they can be handled. It is done once with every move drawn on its own and every
+# point kept (like mouseMoveEvent used to), once with the moves of a frame drawn as one path and once with the path
+# also thinned out by the spacing per brush size, and the move events handled per second, the paint calls and the
+# points stored per stroke are reported
+#  python inputbench.py --strokes 200 --moves 500 --batch 8
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication
+from drawbench import mouseEvent
+from instrumentation import stats
+
+# settings of the window for each way of handling the moves
+MODES = (
+    ("per event", {"framePacing": False, "minPointSpacing": {}}),
+    ("coalesced", {"framePacing": True, "minPointSpacing": {}}),
+    ("coalesced, thinned", {"framePacing": True}),
+)
+
+
+# points of a wobbly line across the window, a pixel or two apart like a tablet sampling a quick stroke
+def strokePoints(rng, width, height, moves):
+    x, y = rng.uniform(100, width - 100), rng.uniform(100, height - 100)
+    angle = rng.uniform(0, 2 * math.pi)
+    points = []
+    for _ in range(moves):
+        angle += rng.uniform(-0.1, 0.1)
+        x = min(max(x + math.cos(angle) * rng.uniform(0.5, 2.5), 0), width - 1)
+        y = min(max(y + math.sin(angle) * rng.uniform(0.5, 2.5), 0), height - 1)
+        points.append((x, y))
+    return points
+
+
+def bench(app, name, settings, strokes, moves, batch, brushSize):
+    from PictionaryGame import PictionaryGame
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    for setting, value in settings.items():
+        setattr(window, setting, value)
+    window.brushSize = brushSize
+    window.show()
+    app.processEvents()
+    rng = random.Random(0)
+    paths = [strokePoints(rng, window.width(), window.height(), moves) for _ in range(strokes)]
+    stats.reset()
+    start = time.perf_counter()
+    for points in paths:
+        app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonPress, *points[0]))
+        for i in range(1, len(points), batch):
+            for x, y in points[i:i + batch]:
+                app.postEvent(window, mouseEvent(QEvent.Type.MouseMove, x, y))  # documentation: https://doc.qt.io/qt-6/qcoreapplication.html#postEvent
+            app.processEvents()
+        app.sendEvent(window, mouseEvent(QEvent.Type.MouseButtonRelease, *points[-1]))
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    flushes = stats.histograms.get("stroke_flush")
+    events = stats.counters.get("mouse_move_events", 0)
+    print(f"{name:>19}: {events / elapsed:8.0f} move events/s, {(flushes.count if flushes else 0) / strokes:6.1f} paint calls "
+          f"and {window.strokeLog.pointCount() / max(len(window.strokeLog), 1):6.1f} points stored per stroke, "
+          f"{stats.counters.get('paint_events', 0)} paint events")
+    window.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the handling of mouse moves with made up input")
+    parser.add_argument("--strokes", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=500, help="move events per stroke")
+    parser.add_argument("--batch", type=int, default=8, help="moves queued between two turns of the event loop")
+    parser.add_argument("--brush", type=int, default=5, choices=[3, 5, 7, 9], help="brush size")
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    print(f"{args.strokes} strokes of {args.moves} moves, {args.batch} moves queued at a time, brush {args.brush}")
+    for name, settings in MODES:
+        bench(app, name, settings, args.strokes, args.moves, args.batch, args.brush)
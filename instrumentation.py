@@ -0,0 +1,173 @@
+# Logging and statistics for finding slow spots while the game is played
+# log calls below the current level are bound to a function that does nothing, so leaving them in the hot
+# paths costs next to nothing. The level comes from the PICTIONARY_LOG environment variable (debug, info,
+# warning, error, off), warning by default
+#  PICTIONARY_LOG=debug python PictionaryGame.py
+
+import json
+import os
+import sys
+import time
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+
+
+def _noop(*args, **fields):
+    pass
+
+
+class Logger:
+    '''
+    Leveled logger writing one "time level event key=value ..." line per call
+    '''
+
+    def __init__(self, level="warning", stream=None):
+        self.stream = stream or sys.stderr
+        self.setLevel(level)
+
+    # rebind the methods so disabled levels go straight to a no-op
+    def setLevel(self, level):
+        self.level = LEVELS[level]
+        for name, value in LEVELS.items():
+            if name != "off":
+                setattr(self, name, self.writer(name) if value >= self.level else _noop)
+
+    def isEnabled(self, level):
+        return LEVELS[level] >= self.level
+
+    def writer(self, levelName):
+        def write(event, **fields):
+            values = " ".join(f"{key}={value!r}" for key, value in fields.items())
+            self.stream.write(f"{time.strftime('%H:%M:%S')} {levelName.upper()} {event} {values}\n")
+        return write
+
+
+class Histogram:
+    '''
+    Count of measurements in power of two buckets of microseconds, with the total and the largest
+    '''
+    __slots__ = ("buckets", "count", "total", "largest")
+
+    def __init__(self):
+        self.buckets = [0] * 32  # bucket i holds measurements under 2**i microseconds
+        self.count = 0
+        self.total = 0.0
+        self.largest = 0.0
+
+    def add(self, seconds):
+        micros = int(seconds * 1e6)
+        self.buckets[min(micros.bit_length(), 31)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.largest:
+            self.largest = seconds
+
+    # upper bound in milliseconds of the bucket holding the given fraction of the measurements
+    def percentile(self, fraction):
+        target = self.count * fraction
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return (1 << i) / 1000
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.largest * 1000,
+        }
+
+
+class Stats:
+    '''
+    Named counters and latency histograms, only recorded while enabled
+    '''
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # record how long something took, start is a time.perf_counter() value taken before it
+    def timeSince(self, name, start):
+        if self.enabled:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(time.perf_counter() - start)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        return {"counters": dict(self.counters), "latency": {name: h.summary() for name, h in self.histograms.items()}}
+
+    # one line per counter and histogram, used by the on screen overlay
+    def lines(self):
+        lines = [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        for name, histogram in sorted(self.histograms.items()):
+            s = histogram.summary()
+            lines.append(f"{name}: n={s['count']} mean={s['mean_ms']:.2f}ms p99<{s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms")
+        return lines
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+class StartupProfile:
+    '''
+    Time spent in each phase of starting the game, from the start of the script to the first paint of the window
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.start = 0.0
+        self.last = 0.0
+        self.phases = []  # (name, seconds) in the order they ended
+
+    # start timing from a time.perf_counter() value taken when the script started
+    def begin(self, start):
+        self.enabled = True
+        self.start = self.last = start
+        self.phases = []
+
+    # the phase with the given name has just ended
+    def mark(self, name):
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append((name, now - self.last))
+            self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self, stream=None):
+        stream = stream or sys.stdout
+        for name, seconds in self.phases:
+            stream.write(f"{name:>24}: {seconds * 1000:8.1f}ms\n")
+        stream.write(f"{'total':>24}: {self.total() * 1000:8.1f}ms\n")
+        stream.flush()
+
+
+# level named by PICTIONARY_LOG, an unknown name is reported once and warning is used so a typo does not stop the game
+def environmentLevel():
+    level = os.environ.get("PICTIONARY_LOG", "warning").lower()
+    if level not in LEVELS:
+        sys.stderr.write(f"PICTIONARY_LOG={level!r} is not one of {', '.join(LEVELS)}, logging warnings\n")
+        return "warning"
+    return level
+
+
+log = Logger(environmentLevel())
+stats = Stats()
+startup = StartupProfile()
@@ -0,0 +1,412 @@
+# Crash-safe journal of the game being played, so a game survives the process dying
+# every change to the game is appended to the journal as a record: the players, each new word, every guess with the
+# scores after it, the end of each turn and every stroke, undo and clear of the canvas. The window only queues the
+# records, a writer thread appends everything queued and syncs the file to disk at most once per sync interval (group
+# commit), so the GUI thread never waits for the disk and a burst of records costs one fsync. Every so often the
+# whole game and canvas are written as a checkpoint that starts a new file, so recovering only reads the last
+# checkpoint and the records after it. The journal is deleted when the game is closed normally
+#  https://docs.python.org/3/library/os.html#os.fsync
+#
+# a journal starts with b"PJNL" and a version byte, followed by records of one tag byte, the payload length as a
+# varint, the payload and the crc32 of the tag and payload (4 bytes, little endian). A record cut short or damaged
+# by a crash ends the journal there. Numbers and text are stored like in recording.py, stroke points as the float32
+# values of the stroke log in the byte order of the machine
+#  SETUP       player 1, player 2, difficulty, sketcher, guesser, starts a new file
+#  TURN        word of the turn that starts
+#  GUESS       player, guess, correct, player 1 score, player 2 score and tries left after it
+#  END_TURN    the players swap roles
+#  STROKE      canvas size the points are stored against, colour, width, points (a fill is a stroke of one point)
+#  UNDO, REDO
+#  CLEAR       canvas size the next strokes are stored against
+#  CHECKPOINT  the whole game and stroke log, starts a new file
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from gameengine import TRIES_PER_TURN, WORD_REVEAL, TURN_OVER
+from recording import writeVarint, readVarint, zigzag, unzigzag, writeText, readText
+from strokes import StrokeLog
+from instrumentation import log, stats
+
+MAGIC = b"PJNL"
+VERSION = 2  # 2 stores the canvas size as integers
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pictionary.journal")
+SYNC_INTERVAL = 0.05  # seconds of records that can be lost if the machine loses power, not just the process
+MAX_BATCH = 10000  # most records written between two looks at the clock
+
+# record tags
+SETUP = 1
+TURN = 2
+GUESS = 3
+END_TURN = 4
+STROKE = 5
+UNDO = 6
+REDO = 7
+CLEAR = 8
+CHECKPOINT = 9
+
+# kinds on the writer's queue that are not records
+FLUSH = 20  # wakes up whoever waits for everything queued before it to be synced
+STOP = 21
+
+SIZE = struct.Struct("<II")  # width and height in pixels of the canvas the stroke points are stored against
+WIDTH = struct.Struct("<f")
+
+
+def record(tag, payload):
+    data = bytearray([tag])
+    writeVarint(data, len(payload))
+    data += payload
+    data += (zlib.crc32(payload, zlib.crc32(bytes([tag]))) & 0xffffffff).to_bytes(4, "little")
+    return data
+
+
+def writeArray(out, values):
+    writeVarint(out, len(values))
+    out += values.tobytes()
+
+
+def readArray(data, pos, typecode):
+    count, pos = readVarint(data, pos)
+    values = array(typecode)
+    end = pos + count * values.itemsize
+    values.frombytes(data[pos:end])
+    return values, end
+
+
+def checkpointPayload(fields, strokeLog):
+    player1, player2, difficulty, score1, score2, tries, sketcher, guesser, word = fields
+    payload = bytearray()
+    for text in (player1, player2, difficulty, sketcher, guesser):
+        writeText(payload, text)
+    writeVarint(payload, zigzag(score1))
+    writeVarint(payload, zigzag(score2))
+    writeVarint(payload, tries)
+    payload.append(word is not None)
+    writeText(payload, word or "")
+    payload += SIZE.pack(strokeLog.width, strokeLog.height)
+    for values in (strokeLog.points, strokeLog.starts, strokeLog.colors, strokeLog.widths):
+        writeArray(payload, values)
+    return payload
+
+
+class JournalState:
+    '''
+    Game and canvas rebuilt from a journal
+    '''
+
+    def __init__(self):
+        self.player1 = ""
+        self.player2 = ""
+        self.difficulty = ""
+        self.score1 = 0
+        self.score2 = 0
+        self.tries = TRIES_PER_TURN
+        self.sketcher = ""
+        self.guesser = ""
+        self.word = None  # None until the first turn has started
+        self.strokeLog = StrokeLog()
+        self.undone = []  # strokes taken out by undo that a redo can put back
+        self.records = 0  # records replayed
+
+    def setupData(self):
+        return {"player1": self.player1, "player2": self.player2, "difficulty": self.difficulty}
+
+    # put the players, scores and turn on a gameengine.GameState that was given the same setup
+    def applyTo(self, game):
+        game.player1Name, game.player2Name, game.difficulty = self.player1, self.player2, self.difficulty
+        game.player1_score, game.player2_score = self.score1, self.score2
+        game.tries = self.tries
+        game.currentSketcher, game.currentGuesser = self.sketcher, self.guesser
+        game.currentWord = self.word
+        game.phase = WORD_REVEAL if self.word is not None else TURN_OVER
+
+    def apply(self, tag, payload):
+        if tag == SETUP or tag == CHECKPOINT:
+            pos = 0
+            texts = []
+            for _ in range(5):
+                text, pos = readText(payload, pos)
+                texts.append(text)
+            self.player1, self.player2, self.difficulty, self.sketcher, self.guesser = texts
+            self.score1 = self.score2 = 0
+            self.tries = TRIES_PER_TURN
+            self.word = None
+            self.strokeLog = StrokeLog()
+            self.undone = []
+            if tag == CHECKPOINT:
+                score1, pos = readVarint(payload, pos)
+                score2, pos = readVarint(payload, pos)
+                self.score1, self.score2 = unzigzag(score1), unzigzag(score2)
+                self.tries, pos = readVarint(payload, pos)
+                hasWord = payload[pos] == 1
+                word, pos = readText(payload, pos + 1)
+                self.word = word if hasWord else None
+                self.strokeLog.width, self.strokeLog.height = SIZE.unpack_from(payload, pos)
+                pos += SIZE.size
+                for name, typecode in (("points", "f"), ("starts", "I"), ("colors", "I"), ("widths", "f")):
+                    values, pos = readArray(payload, pos, typecode)
+                    setattr(self.strokeLog, name, values)
+        elif tag == TURN:
+            word, pos = readText(payload, 1)
+            self.word = word if payload[0] == 1 else None
+        elif tag == GUESS:
+            _, pos = readText(payload, 0)
+            _, pos = readText(payload, pos)
+            score1, pos = readVarint(payload, pos + 1)
+            score2, pos = readVarint(payload, pos)
+            self.score1, self.score2 = unzigzag(score1), unzigzag(score2)
+            self.tries, pos = readVarint(payload, pos)
+        elif tag == END_TURN:
+            self.tries = TRIES_PER_TURN
+            self.sketcher, self.guesser = self.guesser, self.sketcher
+        elif tag == STROKE:
+            width, height = SIZE.unpack_from(payload, 0)
+            if not len(self.strokeLog):
+                # an empty log takes the size of the canvas, see PictionaryGame.renderCanvas
+                self.strokeLog.width, self.strokeLog.height = width, height
+            color, pos = readVarint(payload, SIZE.size)
+            strokeWidth, = WIDTH.unpack_from(payload, pos)
+            points = array('f')
+            points.frombytes(payload[pos + WIDTH.size:])
+            self.strokeLog.pushStroke((color, strokeWidth, points))
+            self.undone = []
+        elif tag == UNDO:
+            if len(self.strokeLog):
+                self.undone.append(self.strokeLog.popStroke())
+        elif tag == REDO:
+            if self.undone:
+                self.strokeLog.pushStroke(self.undone.pop())
+        elif tag == CLEAR:
+            self.strokeLog.clear(*SIZE.unpack_from(payload, 0))
+            self.undone = []
+        self.records += 1
+
+
+# the game in a journal, None if there is no journal or no game in it. Reading stops at the first record that is
+# incomplete or does not match its checksum, everything before it is kept
+def recover(path=DEFAULT_PATH):
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as error:
+        log.error("journal_unreadable", path=path, error=str(error))
+        return None
+    if data[:len(MAGIC)] != MAGIC or len(data) < len(MAGIC) + 1 or data[len(MAGIC)] != VERSION:
+        log.error("journal_not_recognised", path=path)
+        return None
+    state = None
+    pos = len(MAGIC) + 1
+    view = memoryview(data)
+    while pos < len(data):
+        tag = data[pos]
+        try:
+            length, payloadStart = readVarint(data, pos + 1)
+        except IndexError:
+            break
+        end = payloadStart + length
+        if end + 4 > len(data):
+            break
+        payload = view[payloadStart:end]
+        if zlib.crc32(payload, zlib.crc32(bytes([tag]))) & 0xffffffff != int.from_bytes(data[end:end + 4], "little"):
+            log.warning("journal_damaged", path=path, offset=pos)
+            break
+        if state is None:
+            if tag not in (SETUP, CHECKPOINT):
+                log.error("journal_without_game", path=path)
+                return None
+            state = JournalState()
+        state.apply(tag, payload)
+        pos = end + 4
+    if state is not None:
+        stats.timeSince("journal_recovery", start)
+        log.info("journal_recovered", path=path, records=state.records, seconds=time.perf_counter() - start)
+    return state
+
+
+class Journal:
+    '''
+    Appends the changes to the game to a journal on a background thread, syncing it to disk in groups
+    '''
+
+    def __init__(self, path=DEFAULT_PATH, syncInterval=SYNC_INTERVAL):
+        self.path = path
+        self.syncInterval = syncInterval
+        self.sinceCheckpoint = 0  # records queued since the last checkpoint
+        self.events = queue.SimpleQueue()  # documentation: https://docs.python.org/3/library/queue.html#queue.SimpleQueue
+        self.written = 0
+        self.syncs = 0
+        self.bytesWritten = 0
+        self.writer = threading.Thread(target=self.writeLoop, name="journal", daemon=True)
+        self.writer.start()
+
+    # the records below are encoded on the calling thread, so they do not change if the game does after they are queued
+
+    def put(self, tag, payload):
+        self.sinceCheckpoint += 1
+        self.events.put((tag, payload))
+
+    # a new game of a gameengine.GameState, the journal starts again from it
+    def setup(self, game):
+        payload = bytearray()
+        for text in (game.player1Name, game.player2Name, game.difficulty, game.currentSketcher, game.currentGuesser):
+            writeText(payload, text)
+        self.put(SETUP, payload)
+
+    def turn(self, word):
+        payload = bytearray([word is not None])
+        writeText(payload, word or "")
+        self.put(TURN, payload)
+
+    # a guess and the scores and tries of the game after it was scored
+    def guess(self, player, answer, correct, game):
+        payload = bytearray()
+        writeText(payload, player)
+        writeText(payload, answer)
+        payload.append(1 if correct else 0)
+        writeVarint(payload, zigzag(game.player1_score))
+        writeVarint(payload, zigzag(game.player2_score))
+        writeVarint(payload, game.tries)
+        self.put(GUESS, payload)
+
+    def endTurn(self):
+        self.put(END_TURN, b"")
+
+    # stroke i of a strokes.StrokeLog
+    def stroke(self, strokeLog, i):
+        color, width, points = strokeLog.stroke(i)
+        payload = bytearray(SIZE.pack(strokeLog.width, strokeLog.height))
+        writeVarint(payload, color)
+        payload += WIDTH.pack(width)
+        payload += points.tobytes()
+        self.put(STROKE, payload)
+
+    def undo(self):
+        self.put(UNDO, b"")
+
+    def redo(self):
+        self.put(REDO, b"")
+
+    def clear(self, width, height):
+        self.put(CLEAR, SIZE.pack(width, height))
+
+    # the whole game and canvas, the stroke log is copied here and encoded on the writer thread
+    def checkpoint(self, game, strokeLog):
+        fields = (game.player1Name, game.player2Name, game.difficulty, game.player1_score, game.player2_score,
+                  game.tries, game.currentSketcher, game.currentGuesser, game.currentWord)
+        self.sinceCheckpoint = 0
+        self.events.put((CHECKPOINT, (fields, strokeLog.copy())))
+
+    # wait until everything queued so far is synced to disk, False if it took longer than timeout
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self.events.put((FLUSH, done))
+        return done.wait(timeout)
+
+    # stop the writer once everything queued is synced, discard deletes the journal as the game ended normally
+    def close(self, discard=False):
+        if self.writer.is_alive():
+            self.events.put((STOP, discard))
+            self.writer.join()
+
+    # writer thread: block until there is a record, or until the records written are due to be synced, then write
+    # everything else already queued. Records that cannot be written are logged and dropped, and so are records
+    # before the first SETUP or CHECKPOINT as the journal would not know which game they belong to
+    def writeLoop(self):
+        file = None
+        dirty = False  # records written to the file that are not synced yet
+        lastSync = time.perf_counter()
+        discard = False
+        running = True
+        while running:
+            timeout = max(0.0, lastSync + self.syncInterval - time.perf_counter()) if dirty else None
+            try:
+                batch = [self.events.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            waiting = []
+            for kind, data in batch:
+                if kind == FLUSH:
+                    waiting.append(data)
+                    continue
+                if kind == STOP:
+                    running = False
+                    discard = data
+                    continue
+                try:
+                    if kind == SETUP or kind == CHECKPOINT:
+                        if file is not None:
+                            file.close()
+                            file = None
+                        file = self.startFile(record(kind, checkpointPayload(*data) if kind == CHECKPOINT else data))
+                        dirty = False
+                        lastSync = time.perf_counter()
+                    elif file is not None:
+                        data = record(kind, data)
+                        file.write(data)
+                        self.bytesWritten += len(data)
+                        dirty = True
+                    else:
+                        continue
+                    self.written += 1
+                except OSError as error:
+                    log.error("journal_write_failed", path=self.path, error=str(error))
+            if dirty and (waiting or not running or time.perf_counter() - lastSync >= self.syncInterval):
+                try:
+                    self.sync(file)
+                except OSError as error:
+                    log.error("journal_sync_failed", path=self.path, error=str(error))
+                dirty = False
+                lastSync = time.perf_counter()
+            for done in waiting:
+                done.set()
+        if file is not None:
+            file.close()
+        if discard:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def sync(self, file):
+        start = time.perf_counter()
+        file.flush()
+        os.fsync(file.fileno())
+        self.syncs += 1
+        stats.timeSince("journal_sync", start)
+
+    # write a new journal beginning with the given record next to the old one and swap them, so a crash in between
+    # leaves one or the other. Returns the new file, open for the records that follow
+    def startFile(self, first):
+        temporary = self.path + ".new"
+        file = open(temporary, "wb")
+        file.write(MAGIC + bytes([VERSION]))
+        file.write(first)
+        self.sync(file)
+        os.replace(temporary, self.path)  # documentation: https://docs.python.org/3/library/os.html#os.replace
+        syncFolder(os.path.dirname(os.path.abspath(self.path)))
+        self.bytesWritten += len(MAGIC) + 1 + len(first)
+        return file
+
+
+# make a rename in the folder durable, folders cannot be opened for this on Windows
+def syncFolder(folder):
+    if os.name != "posix":
+        return
+    descriptor = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
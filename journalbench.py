@@ -0,0 +1,80 @@
+# Benchmark of the game journal: made up games (strokes, undos, guesses and turns) are journaled as fast as they can
+# be played for each sync interval, and the records per second, the syncs it took and the slowest call the window
+# would have made are reported, then how long recovering takes from a checkpoint of a canvas of growing size
+#  python journalbench.py --records 200000 --intervals 0 5 50
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from gameengine import GameState
+from strokes import StrokeLog
+import journal
+from journalkill import play
+
+
+def throughput(folder, records, syncInterval):
+    path = os.path.join(folder, "bench.journal")
+    gameJournal = journal.Journal(path, syncInterval)
+    slowest = 0.0
+    start = time.perf_counter()
+    last = start
+    for count, _ in enumerate(play(0, gameJournal), 1):
+        now = time.perf_counter()
+        slowest = max(slowest, now - last)  # includes playing the record, so it is an upper bound
+        last = now
+        if count >= records:
+            break
+    queuedTime = time.perf_counter() - start
+    gameJournal.flush()
+    syncedTime = time.perf_counter() - start
+    print(f"sync every {syncInterval * 1000:g}ms: {gameJournal.written} records queued in {queuedTime:.2f}s (slowest "
+          f"{slowest * 1e6:.0f}us), all synced after {syncedTime:.2f}s ({gameJournal.written / syncedTime:.0f} records/s, "
+          f"{gameJournal.bytesWritten / syncedTime / 2 ** 20:.1f} MiB/s, {gameJournal.syncs} syncs, "
+          f"{gameJournal.written / max(gameJournal.syncs, 1):.0f} records each)")
+    gameJournal.close(discard=True)
+
+
+# a checkpoint of a canvas with that many strokes followed by a tail of strokes drawn after it, then timed recoveries
+def recovery(folder, strokes, tail):
+    path = os.path.join(folder, "recover.journal")
+    gameJournal = journal.Journal(path)
+    rng = random.Random(strokes)
+    game = GameState(rng)
+    game.newGame("Alice", "Bob", "Easy", None)
+    strokeLog = StrokeLog(800, 600)
+    for i in range(strokes + tail):
+        if i == strokes:
+            gameJournal.checkpoint(game, strokeLog)
+        x, y = rng.uniform(0, 800), rng.uniform(0, 600)
+        strokeLog.beginStroke(x, y, 0xff000000, 5)
+        for _ in range(rng.randint(2, 80)):
+            x, y = x + rng.uniform(-10, 10), y + rng.uniform(-10, 10)
+            strokeLog.addPoint(x, y)
+        if i >= strokes:
+            gameJournal.stroke(strokeLog, i)
+    gameJournal.close()
+    times = []
+    for _ in range(10):
+        start = time.perf_counter()
+        state = journal.recover(path)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"recover a checkpoint of {strokes} strokes and {tail} strokes after it ({state.strokeLog.pointCount()} points, "
+          f"{os.path.getsize(path) / 1024:.0f} KiB): median {times[len(times) // 2] * 1000:.2f}ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game journal")
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0, 5, 50], help="milliseconds between two syncs")
+    parser.add_argument("--strokes", type=int, nargs="+", default=[100, 1000, 10000], help="strokes on the canvas of the checkpoint")
+    parser.add_argument("--tail", type=int, default=500, help="strokes journaled after the checkpoint")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        for interval in args.intervals:
+            throughput(folder, args.records, interval / 1000)
+        for strokes in args.strokes:
+            recovery(folder, strokes, args.tail)
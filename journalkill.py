@@ -0,0 +1,142 @@
+# Kill-and-recover check of the game journal: a child process plays a made up game into a journal as fast as it can
+# and reports every record it knows is synced to disk, it is killed at a random moment, the game is recovered from
+# what it left and compared with the same game played again here. The recovered game has to be the game after one
+# of the records written, and not before the last record reported as synced
+#  python journalkill.py --trials 20
+
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from gameengine import GameState
+from strokes import StrokeLog
+from wordpacks import loadPack, WordSampler
+import journal
+
+WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "easymode.txt")
+COLORS = (0xff000000, 0xffff0000, 0xff00ff00, 0xff0000ff)
+
+
+# play a game with the window's rules, journaling every change when a journal is given, and yield the game and canvas
+# after each record. The same seed always plays the same game
+def play(seed, gameJournal=None, checkpointEvery=500):
+    rng = random.Random(seed)
+    game = GameState(rng)
+    strokeLog = StrokeLog(800, 600)
+    game.newGame("Alice", "Bob", "Easy", WordSampler(list(loadPack(WORDS)), rng))
+    if gameJournal is not None:
+        gameJournal.setup(game)
+    yield game, strokeLog
+    records = 0
+    while True:
+        strokeLog.clear(800, 600)
+        if gameJournal is not None:
+            gameJournal.clear(800, 600)
+        yield game, strokeLog
+        word = game.startNewTurn()
+        if gameJournal is not None:
+            gameJournal.turn(word)
+        yield game, strokeLog
+        for _ in range(rng.randint(5, 40)):
+            choice = rng.random()
+            if choice < 0.1 and len(strokeLog):
+                strokeLog.popStroke()  # undo without a redo after it, like the window's history
+                if gameJournal is not None:
+                    gameJournal.undo()
+            else:
+                x, y = rng.uniform(0, 800), rng.uniform(0, 600)
+                strokeLog.beginStroke(x, y, COLORS[rng.randrange(len(COLORS))], rng.choice((3, 5, 7, 9)))
+                for _ in range(rng.randint(2, 80)):
+                    x, y = x + rng.uniform(-10, 10), y + rng.uniform(-10, 10)
+                    strokeLog.addPoint(x, y)
+                if gameJournal is not None:
+                    gameJournal.stroke(strokeLog, len(strokeLog) - 1)
+            yield game, strokeLog
+            records += 1
+            if gameJournal is not None and records % checkpointEvery == 0:
+                gameJournal.checkpoint(game, strokeLog)  # changes nothing, the game after it is the same
+        correct = False
+        while not game.isTurnOver(correct):
+            answer = word if rng.random() < 0.4 else rng.choice(game.words.words)
+            guesser = game.currentGuesser
+            correct = game.checkAnswer(answer, guesser)
+            if gameJournal is not None:
+                gameJournal.guess(guesser, answer, correct, game)
+            yield game, strokeLog
+        game.endTurn()
+        if gameJournal is not None:
+            gameJournal.endTurn()
+        yield game, strokeLog
+
+
+# what recovery has to give back after a record
+def snapshot(game, strokeLog):
+    return (game.player1Name, game.player2Name, game.difficulty, game.player1_score, game.player2_score, game.tries,
+            game.currentSketcher, game.currentGuesser, game.currentWord, strokeLog.width, strokeLog.height,
+            bytes(strokeLog.points), bytes(strokeLog.starts), bytes(strokeLog.colors), bytes(strokeLog.widths))
+
+
+def recoveredSnapshot(state):
+    game = GameState()
+    state.applyTo(game)
+    return snapshot(game, state.strokeLog)
+
+
+# child process: play into the journal until killed, printing how many records are synced every few records
+def child(path, seed, syncInterval):
+    gameJournal = journal.Journal(path, syncInterval)
+    for records, _ in enumerate(play(seed, gameJournal), 1):
+        if records % 50 == 0:
+            gameJournal.flush()
+            print(records, flush=True)
+
+
+def trial(path, seed, syncInterval, rng):
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", path, "--seed", str(seed),
+                                "--sync-interval", str(syncInterval * 1000)], stdout=subprocess.PIPE, text=True)
+    synced = 0
+    deadline = time.perf_counter() + rng.uniform(0.3, 1.5)
+    while time.perf_counter() < deadline:
+        line = process.stdout.readline()
+        if not line:
+            break
+        synced = int(line)
+    process.send_signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)  # no chance to clean up
+    process.wait()
+    start = time.perf_counter()
+    state = journal.recover(path)
+    recoveryTime = time.perf_counter() - start
+    if state is None:
+        raise SystemExit(f"seed {seed}: nothing recovered")
+    recovered = recoveredSnapshot(state)
+    # the game recovered has to be the game after some record at or after the last one reported as synced
+    for records, (game, strokeLog) in enumerate(play(seed), 1):
+        if records >= synced and snapshot(game, strokeLog) == recovered:
+            return synced, records, recoveryTime, os.path.getsize(path)
+        if records > synced + 1000000:
+            break
+    raise SystemExit(f"seed {seed}: the recovered game does not match the game played after {synced} synced records")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kill a process writing a journal and check the game recovered from it")
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--sync-interval", type=float, default=journal.SYNC_INTERVAL * 1000, help="milliseconds between two syncs")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.seed, args.sync_interval / 1000)
+        sys.exit()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as folder:
+        for seed in range(args.trials):
+            path = os.path.join(folder, f"kill{seed}.journal")
+            synced, records, recoveryTime, size = trial(path, seed, args.sync_interval / 1000, rng)
+            print(f"trial {seed}: killed after {synced} synced records, recovered the game after record {records} "
+                  f"from {size / 1024:.0f} KiB in {recoveryTime * 1000:.1f}ms")
+    print("every game recovered")
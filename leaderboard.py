@@ -0,0 +1,237 @@
+# History of every game played, kept in a local SQLite database for leaderboards
+# every guess, turn and game result is written as its own row. The window only puts events on a queue, a writer
+# thread takes everything queued and writes it in one transaction, so the GUI thread never waits for the disk and a
+# burst of events costs one commit. Totals per player and per word are kept up to date in the same transaction so
+# the leaderboards read a few rows instead of adding up millions of events
+#  https://docs.python.org/3/library/sqlite3.html
+#  https://www.sqlite.org/wal.html
+
+import os
+import queue
+import threading
+import time
+from instrumentation import log
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pictionary.db")
+MAX_BATCH = 10000  # most events written in one transaction
+
+# kinds of event on the writer's queue
+GUESS = 1
+TURN = 2
+GAME = 3
+FLUSH = 4  # wakes up whoever waits for everything queued before it to be written
+STOP = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY, started REAL, ended REAL, difficulty TEXT,
+    player1 TEXT, player2 TEXT, score1 INTEGER, score2 INTEGER, winner TEXT);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY, game INTEGER, time REAL, sketcher TEXT, guesser TEXT, word TEXT,
+    solved INTEGER, guesses INTEGER);
+CREATE TABLE IF NOT EXISTS guesses (
+    id INTEGER PRIMARY KEY, game INTEGER, time REAL, player TEXT, word TEXT, answer TEXT,
+    correct INTEGER, points INTEGER);
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY, games INTEGER DEFAULT 0, wins INTEGER DEFAULT 0, points INTEGER DEFAULT 0,
+    guesses INTEGER DEFAULT 0, correct INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS words (
+    word TEXT PRIMARY KEY, turns INTEGER DEFAULT 0, solved INTEGER DEFAULT 0, guesses INTEGER DEFAULT 0);
+CREATE INDEX IF NOT EXISTS games_player1 ON games (player1, ended);
+CREATE INDEX IF NOT EXISTS games_player2 ON games (player2, ended);
+CREATE INDEX IF NOT EXISTS turns_game ON turns (game);
+CREATE INDEX IF NOT EXISTS turns_word ON turns (word);
+CREATE INDEX IF NOT EXISTS guesses_game ON guesses (game);
+CREATE INDEX IF NOT EXISTS guesses_player ON guesses (player, time);
+CREATE INDEX IF NOT EXISTS players_points ON players (points);
+CREATE INDEX IF NOT EXISTS players_win_rate ON players (CAST(wins AS REAL) / games) WHERE games > 0;
+CREATE INDEX IF NOT EXISTS words_solve_rate ON words (CAST(solved AS REAL) / turns) WHERE turns > 0;
+"""
+
+
+class LeaderboardError(Exception):
+    '''
+    The database cannot be read, or is not made yet
+    '''
+
+
+# sqlite3 is imported by the writer thread when it first opens the database, so starting the game does not wait for it
+def connect(path):
+    import sqlite3
+    connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)  # transactions are begun by hand
+    # readers do not block the writer and a commit does not wait for the disk to sync every time
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class Leaderboard:
+    '''
+    Writes the events of the games to SQLite on a background thread and answers leaderboard queries
+    '''
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        # game ids are handed out here so the events of a game can be queued before its row is written, they are the
+        # time the game started in microseconds so they keep growing from one run of the game to the next
+        self.lastGame = 0
+        self.reader = None  # connection for queries, opened on the first one
+        self.game = None  # [id, start time, player1, player2, difficulty, events] of the game being played
+        self.events = queue.SimpleQueue()  # documentation: https://docs.python.org/3/library/queue.html#queue.SimpleQueue
+        self.written = 0
+        self.commits = 0
+        # the database is opened by the writer too, so starting the game does not wait for the disk
+        self.writer = threading.Thread(target=self.writeLoop, name="leaderboard", daemon=True)
+        self.writer.start()
+
+    # the game events below only queue a row, they never touch the database
+
+    def newGame(self, player1, player2, difficulty):
+        started = time.time()
+        self.lastGame = max(self.lastGame + 1, int(started * 1e6))
+        self.game = [self.lastGame, started, player1, player2, difficulty, 0]
+
+    def guess(self, player, word, answer, correct, points):
+        if self.game is not None:
+            self.game[5] += 1
+            self.events.put((GUESS, (self.game[0], time.time(), player, word, answer, int(correct), points)))
+
+    def turn(self, sketcher, guesser, word, solved, guesses):
+        if self.game is not None:
+            self.game[5] += 1
+            self.events.put((TURN, (self.game[0], time.time(), sketcher, guesser, word, int(solved), guesses)))
+
+    # the game is over with these scores, games where nothing happened are not kept
+    def endGame(self, score1, score2):
+        if self.game is None:
+            return
+        gameId, started, player1, player2, difficulty, events = self.game
+        self.game = None
+        if events == 0:
+            return
+        winner = player1 if score1 > score2 else player2 if score2 > score1 else None
+        self.events.put((GAME, (gameId, started, time.time(), difficulty, player1, player2, score1, score2, winner)))
+
+    # wait until everything queued so far is in the database, False if it took longer than timeout
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self.events.put((FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self.writer.is_alive():
+            self.events.put((STOP, None))
+            self.writer.join()
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    # writer thread: block for an event, then take everything else already queued and write it all together. If the
+    # database cannot be opened the events are still taken off the queue, and dropped
+    def writeLoop(self):
+        import sqlite3
+        try:
+            connection = connect(self.path)
+            connection.executescript(SCHEMA)
+        except sqlite3.Error as error:
+            log.error("leaderboard_unavailable", path=self.path, error=str(error))
+            connection = None
+        running = True
+        while running:
+            batch = [self.events.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            waiting = [event for kind, event in batch if kind == FLUSH]
+            running = not any(kind == STOP for kind, _ in batch)
+            if connection is not None:
+                try:
+                    self.writeBatch(connection, batch)
+                except sqlite3.Error as error:
+                    log.error("leaderboard_write_failed", events=len(batch), error=str(error))
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+            for done in waiting:
+                done.set()
+        if connection is not None:
+            connection.close()
+
+    def writeBatch(self, connection, batch):
+        guesses = [event for kind, event in batch if kind == GUESS]
+        turns = [event for kind, event in batch if kind == TURN]
+        games = [event for kind, event in batch if kind == GAME]
+        if not (guesses or turns or games):
+            return
+        # totals are added up here first so each player and word is updated once per batch
+        players = {}  # name -> [games, wins, points, guesses, correct]
+        words = {}  # word -> [turns, solved, guesses]
+        for _, _, player, word, _, correct, _ in guesses:
+            totals = players.setdefault(player, [0, 0, 0, 0, 0])
+            totals[3] += 1
+            totals[4] += correct
+        for _, _, _, _, word, solved, count in turns:
+            totals = words.setdefault(word, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += solved
+            totals[2] += count
+        for _, _, _, _, player1, player2, score1, score2, winner in games:
+            for player, score in ((player1, score1), (player2, score2)):
+                totals = players.setdefault(player, [0, 0, 0, 0, 0])
+                totals[0] += 1
+                totals[1] += player == winner
+                totals[2] += score
+        connection.execute("BEGIN")
+        connection.executemany("INSERT INTO guesses (game, time, player, word, answer, correct, points) VALUES (?, ?, ?, ?, ?, ?, ?)", guesses)
+        connection.executemany("INSERT INTO turns (game, time, sketcher, guesser, word, solved, guesses) VALUES (?, ?, ?, ?, ?, ?, ?)", turns)
+        connection.executemany("INSERT INTO games (id, started, ended, difficulty, player1, player2, score1, score2, winner) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", games)
+        # documentation: https://www.sqlite.org/lang_upsert.html
+        connection.executemany("""INSERT INTO players (name, games, wins, points, guesses, correct) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET games = games + excluded.games, wins = wins + excluded.wins,
+            points = points + excluded.points, guesses = guesses + excluded.guesses, correct = correct + excluded.correct""",
+                               [(name, *totals) for name, totals in players.items()])
+        connection.executemany("""INSERT INTO words (word, turns, solved, guesses) VALUES (?, ?, ?, ?)
+            ON CONFLICT (word) DO UPDATE SET turns = turns + excluded.turns, solved = solved + excluded.solved,
+            guesses = guesses + excluded.guesses""", [(word, *totals) for word, totals in words.items()])
+        connection.execute("COMMIT")
+        self.written += len(guesses) + len(turns) + len(games)
+        self.commits += 1
+
+    # queries read what has been committed so far, from the thread that asks. They raise LeaderboardError if the
+    # database cannot be read, or is not made yet
+
+    def query(self, sql, parameters=()):
+        import sqlite3
+        try:
+            if self.reader is None:
+                self.reader = connect(self.path)
+            return self.reader.execute(sql, parameters).fetchall()
+        except sqlite3.Error as error:
+            raise LeaderboardError(str(error)) from error
+
+    # (name, points, games, wins) of the players with the most points
+    def leaderboard(self, limit=10):
+        return self.query("SELECT name, points, games, wins FROM players ORDER BY points DESC LIMIT ?", (limit,))
+
+    # (name, win rate, games) of the players who win most often, out of those with at least minGames games
+    def winRates(self, limit=10, minGames=1):
+        return self.query("""SELECT name, CAST(wins AS REAL) / games, games FROM players WHERE games > 0 AND games >= ?
+            ORDER BY CAST(wins AS REAL) / games DESC LIMIT ?""", (minGames, limit))
+
+    # (word, solve rate, turns, guesses per turn) of the words solved least often, out of those drawn at least
+    # minTurns times
+    def wordDifficulty(self, limit=10, minTurns=1):
+        return self.query("""SELECT word, CAST(solved AS REAL) / turns, turns, CAST(guesses AS REAL) / turns FROM words
+            WHERE turns > 0 AND turns >= ? ORDER BY CAST(solved AS REAL) / turns LIMIT ?""", (minTurns, limit))
+
+    # (games, wins, points, guesses, correct) of one player, None if they never played
+    def playerStats(self, name):
+        rows = self.query("SELECT games, wins, points, guesses, correct FROM players WHERE name = ?", (name,))
+        return rows[0] if rows else None
+
+    # (ended, opponent, score, opponent's score) of a player's last games, newest first
+    def recentGames(self, name, limit=10):
+        return self.query("""SELECT ended, player2, score1, score2 FROM games WHERE player1 = ?
+            UNION ALL SELECT ended, player1, score2, score1 FROM games WHERE player2 = ?
+            ORDER BY ended DESC LIMIT ?""", (name, name, limit))
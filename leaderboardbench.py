@@ -0,0 +1,90 @@
+# Benchmark of the leaderboard database: games between made up players are fed to a Leaderboard as fast as the
+# rules allow until a million events (guesses, turns and game results) are queued, then the time the queue calls
+# took, how long the writer needed and how fast the leaderboard queries are with that many rows are reported
+#  python leaderboardbench.py --events 1000000 --players 1000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from gameengine import GameState, TRIES_PER_TURN
+from leaderboard import Leaderboard
+from wordpacks import loadPack, WordSampler
+
+
+def feed(board, words, events, players, rounds, rng):
+    names = [f"player{i}" for i in range(players)]
+    skills = {name: rng.uniform(0.2, 0.8) for name in names}
+    queued = 0
+    slowest = 0.0
+    while queued < events:
+        game = GameState(rng)
+        game.newGame(*rng.sample(names, 2), "Easy", WordSampler(words, rng))
+        board.newGame(game.player1Name, game.player2Name, game.difficulty)
+        for _ in range(rounds):
+            word = game.startNewTurn()
+            guesser = game.currentGuesser
+            correct = False
+            while not game.isTurnOver(correct):
+                guess = word if rng.random() < skills[guesser] else rng.choice(words)
+                scores = game.player1_score + game.player2_score
+                correct = game.checkAnswer(guess, guesser)
+                start = time.perf_counter()
+                board.guess(guesser, word, guess, correct, game.player1_score + game.player2_score - scores)
+                slowest = max(slowest, time.perf_counter() - start)
+                queued += 1
+            start = time.perf_counter()
+            board.turn(game.currentSketcher, guesser, word, correct, TRIES_PER_TURN - game.tries + correct)
+            slowest = max(slowest, time.perf_counter() - start)
+            queued += 1
+            game.endTurn()
+        board.endGame(game.player1_score, game.player2_score)
+        queued += 1
+    return queued, slowest
+
+
+def timeQuery(name, query, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"{name:>16}: median {times[len(times) // 2] * 1000:.2f}ms, {len(rows)} rows")
+
+
+def bench(words, events, players, rounds):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.db")
+        board = Leaderboard(path)
+        start = time.perf_counter()
+        queued, slowest = feed(board, words, events, players, rounds, rng)
+        queuedTime = time.perf_counter() - start
+        board.flush()
+        writtenTime = time.perf_counter() - start
+        print(f"{queued} events queued in {queuedTime:.1f}s (slowest queue call {slowest * 1e6:.0f}us), all written after "
+              f"{writtenTime:.1f}s ({board.written / writtenTime:.0f} events/s, {board.commits} transactions, "
+              f"{board.written / board.commits:.0f} events each), database {os.path.getsize(path) / 2 ** 20:.0f} MiB")
+        name = board.leaderboard(1)[0][0]
+        timeQuery("leaderboard", lambda: board.leaderboard(10))
+        timeQuery("win rates", lambda: board.winRates(10, minGames=10))
+        timeQuery("word difficulty", lambda: board.wordDifficulty(10, minTurns=5))
+        timeQuery("player stats", lambda: [board.playerStats(name)])
+        timeQuery("recent games", lambda: board.recentGames(name, 10))
+        for sql in ("SELECT name FROM players WHERE games > 0 ORDER BY CAST(wins AS REAL) / games DESC LIMIT 10",
+                    "SELECT word FROM words WHERE turns > 0 ORDER BY CAST(solved AS REAL) / turns LIMIT 10"):
+            plan = board.query("EXPLAIN QUERY PLAN " + sql)
+            print(f"plan: {'; '.join(row[3] for row in plan)}")
+        board.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the leaderboard database")
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10, help="turns per game")
+    parser.add_argument("--words", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "easymode.txt"))
+    args = parser.parse_args()
+    bench(list(loadPack(args.words)), args.events, args.players, args.rounds)
@@ -0,0 +1,160 @@
+# Load generator for server.py over loopback
+# every room gets one sketcher sending a batch of stroke points per tick and some guessers receiving them,
+# then the messages per second and the time from sending a stroke to receiving it are reported. Before that, clients
+# sending streams that are not messages are checked to be disconnected without taking the server down, and messages
+# that are well formed but hold values a window cannot draw are checked to be rejected when they are decoded
+#  python loadgen.py --rooms 200 --guessers 2 --seconds 10
+#  python loadgen.py --connect localhost:5050   (use an already running server)
+
+import argparse
+import asyncio
+import random
+import time
+from netprotocol import FrameReader, ProtocolError, STROKES, NET_SCALE, MAX_FRAME, helloFrame, strokesFrame, fillFrame, writeVarint, decode
+from server import RelayServer
+
+POINTS_PER_BATCH = 8
+
+
+def oversizedLength():
+    out = bytearray()
+    writeVarint(out, MAX_FRAME + 1)
+    return bytes(out)
+
+
+# streams a broken or hostile client could send, none of them may get past the server
+MALFORMED = (
+    ("zero length", b"\x00"),
+    ("oversized length", oversizedLength()),
+    ("endless length", b"\xff" * 16),
+    ("garbled hello", b"\x05\x01\x03\xff\xfe\xfd"),
+    ("hello cut short", b"\x05\x01\x01a\x09b"),
+)
+# messages the server passes on as they are but a window has to drop, drawing them would abort it from inside a slot
+UNDRAWABLE = (
+    ("stroke without points", strokesFrame([(0, 0xff000000, 3, [])])),
+    ("stroke colour too big", strokesFrame([(0, 1 << 32, 3, [1, 2, 3, 4])])),
+    ("stroke of width 0", strokesFrame([(0, 0xff000000, 0, [1, 2, 3, 4])])),
+    ("stroke too wide", strokesFrame([(0, 0xff000000, 1 << 40, [1, 2, 3, 4])])),
+    ("stroke point too far", strokesFrame([(0, 0xff000000, 3, [1, 2, 1 << 70, 4])])),
+    ("good stroke then one without points", strokesFrame([(0, 0xff000000, 3, [1, 2]), (1, 0xff000000, 3, [])])),
+    ("fill colour too big", fillFrame(1 << 32, 0, 1, 1)),
+    ("fill tolerance too big", fillFrame(0xff000000, 1 << 70, 1, 1)),
+)
+
+
+async def sketcher(host, port, room, rate, stopAt, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(helloFrame(room, "sketcher"))
+    rng = random.Random(room)
+    x, y = rng.randrange(NET_SCALE), rng.randrange(NET_SCALE)
+    strokeId = 0
+    while time.perf_counter() < stopAt:
+        points = []
+        for _ in range(POINTS_PER_BATCH):
+            x = min(max(x + rng.randint(-50, 50), 0), NET_SCALE)
+            y = min(max(y + rng.randint(-50, 50), 0), NET_SCALE)
+            points += (x, y)
+        writer.write(strokesFrame([(strokeId, 0xff000000, 3, points)]))
+        stats["sent"] += 1
+        if rng.random() < 0.05:
+            strokeId += 1
+        await asyncio.sleep(1 / rate)
+    writer.close()
+
+
+async def guesser(host, port, room, stopAt, stats):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(helloFrame(room, "guesser"))
+    frames = FrameReader()
+    while time.perf_counter() < stopAt:
+        try:
+            data = await asyncio.wait_for(reader.read(65536), timeout=max(stopAt - time.perf_counter(), 0.01))
+        except asyncio.TimeoutError:
+            break
+        if not data:
+            break
+        now = time.time_ns() // 1000
+        for kind, payload, _ in frames.feed(data):
+            if kind == STROKES:  # the HELLO of a sketcher joining the room is passed on too
+                stats["received"] += 1
+                sentAt, _ = decode(kind, payload)
+                stats["latencies"].append((now - sentAt) / 1000)
+    writer.close()
+
+
+# send each malformed stream on a connection of its own and wait for the server to close it
+async def checkMalformed(host, port):
+    for name, data in MALFORMED:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(data)
+        try:
+            closed = await asyncio.wait_for(reader.read(65536), timeout=2) == b""
+        except asyncio.TimeoutError:
+            closed = False
+        writer.close()
+        if not closed:
+            raise SystemExit(f"the server kept a client that sent a {name}")
+    print(f"{len(MALFORMED)} clients sending malformed streams were disconnected")
+
+
+def checkUndrawable():
+    for name, data in UNDRAWABLE:
+        (kind, payload, _), = FrameReader().feed(data)
+        try:
+            decode(kind, payload)
+        except ProtocolError:
+            continue
+        raise SystemExit(f"a {name} was decoded instead of being rejected")
+    # the largest colour and the thinnest width still go through
+    (kind, payload, _), = FrameReader().feed(strokesFrame([(0, 0xffffffff, 0.0625, [0, 0, NET_SCALE, NET_SCALE])]))
+    decode(kind, payload)
+    print(f"{len(UNDRAWABLE)} messages a window cannot draw were rejected")
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+async def run(host, port, rooms, guessers, seconds, rate):
+    relay = None
+    if host is None:
+        # no server given, run one in this process
+        relay = RelayServer()
+        server = await relay.start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+    checkUndrawable()
+    await checkMalformed(host, port)
+    if relay is not None and relay.dropped != len(MALFORMED):
+        raise SystemExit(f"the server dropped {relay.dropped} of the {len(MALFORMED)} malformed clients as malformed")
+    stats = {"sent": 0, "received": 0, "latencies": []}
+    # guessers join first so they do not miss the first strokes
+    stopAt = time.perf_counter() + seconds + 1
+    receiving = [asyncio.ensure_future(guesser(host, port, f"room{r}", stopAt, stats)) for r in range(rooms) for _ in range(guessers)]
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    await asyncio.gather(*(sketcher(host, port, f"room{r}", rate, start + seconds, stats) for r in range(rooms)))
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*receiving)
+    if relay is not None:
+        server.close()
+        relay.flushTask.cancel()
+    latencies = sorted(stats["latencies"])
+    print(f"rooms: {rooms}, guessers per room: {guessers}, connections: {rooms * (guessers + 1)}")
+    print(f"sent: {stats['sent'] / elapsed:.0f} messages/s, delivered: {stats['received'] / elapsed:.0f} messages/s")
+    print(f"stroke latency ms: p50 {percentile(latencies, 0.5):.1f}, p95 {percentile(latencies, 0.95):.1f}, p99 {percentile(latencies, 0.99):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Pictionary relay server")
+    parser.add_argument("--connect", default=None, help="host:port of a running server, a server is started in this process if not given")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--guessers", type=int, default=1, help="receiving clients per room")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rate", type=float, default=30, help="stroke batches sent per second by each sketcher")
+    args = parser.parse_args()
+    host, port = None, None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    asyncio.run(run(host, port, args.rooms, args.guessers, args.seconds, args.rate))
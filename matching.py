@@ -0,0 +1,72 @@
+# Lenient answer checking for the guesser
+# answers and words are compared in a normalized form (no case, spaces, punctuation or simple plurals) so
+# "hotdog", "aeroplanes" and "mobile-phone" are right, and small typos are accepted as long as the guess
+# is not another word of the same pack
+
+import hashlib
+from array import array
+from bisect import bisect_left
+
+
+# lower case, keep only letters and digits and fold simple English plurals
+def normalize(text):
+    text = "".join(c for c in text.lower() if c.isalnum())
+    if len(text) > 4 and text.endswith("ies"):
+        return text[:-3] + "y"  # butterflies -> butterfly
+    if len(text) > 3 and text.endswith("es") and text[:-2].endswith(("s", "x", "z", "ch", "sh")):
+        return text[:-2]  # glasses -> glass, boxes -> box
+    if len(text) > 3 and text.endswith("s") and not text.endswith("ss"):
+        return text[:-1]  # aeroplanes -> aeroplane
+    return text
+
+
+# Levenshtein distance between a and b, stops early and returns limit + 1 once it is known to be over limit
+#  https://en.wikipedia.org/wiki/Levenshtein_distance
+def editDistance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# 8 byte hash of a normalized word, the pack index stores these instead of strings
+def wordKey(normalized):
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class AnswerMatcher:
+    '''
+    Checks guesses against the current word, built once per word pack
+    '''
+
+    def __init__(self, words, maxDistance=1, minTypoLength=5):
+        self.maxDistance = maxDistance  # the most typos accepted, 0 only accepts the normalized word
+        self.minTypoLength = minTypoLength  # shorter words must be spelled right, one typo turns "cat" into "car"
+        # sorted hashes of the normalized form of every word in the pack, looked up with a binary search
+        self.index = array('Q', sorted({wordKey(normalize(word)) for word in words}))
+
+    # True if the normalized text is a word of the pack
+    def isPackWord(self, normalized):
+        key = wordKey(normalized)
+        i = bisect_left(self.index, key)
+        return i < len(self.index) and self.index[i] == key
+
+    # True if answer should count as the word
+    def isCorrect(self, answer, word):
+        guess = normalize(answer)
+        target = normalize(word)
+        if guess == target:
+            return True
+        if not guess or self.maxDistance <= 0 or len(target) < self.minTypoLength:
+            return False
+        # a guess that is another word of the pack is a wrong guess, not a typo
+        if self.isPackWord(guess):
+            return False
+        return editDistance(guess, target, self.maxDistance) <= self.maxDistance
@@ -0,0 +1,120 @@
+# Checks and micro-benchmark of the answer matching
+# a table of guesses that must be accepted or rejected is run against the matchers of the word packs of the game,
+# then a matcher is built over a made up pack of up to millions of words and the time to check a guess is measured
+# for right answers, typos, wrong answers and other words of the pack
+#  python matchingbench.py --sizes 1000 100000 1000000
+
+import argparse
+import random
+import string
+import time
+from matching import AnswerMatcher
+from wordpacks import loadPack
+
+# (answer, word, typos accepted, accepted), against the easy pack unless the word is only in the hard one
+CASES = (
+    # spacing, punctuation, case and plurals
+    ("hotdog", "Hot dog", 1, True),
+    ("Hot-Dog!", "Hot dog", 1, True),
+    ("aeroplanes", "Aeroplane", 1, True),
+    ("mobile-phone", "Mobile Phone", 1, True),
+    ("MOBILE PHONES", "Mobile Phone", 1, True),
+    ("  sunglasses ", "Sunglasses", 1, True),
+    ("sunglass", "Sunglasses", 1, True),
+    ("t shirt", "T-shirt", 1, True),
+    ("tshirts", "T-shirt", 1, True),
+    ("butterflies", "Butterfly", 1, True),
+    ("squirrel", "Squirrels", 1, True),
+    ("waterbottle", "Water Bottle", 1, True),
+    ("painting", "Paintings", 1, True),
+    ("graphical-user-interface", "Graphical User Interface", 1, True),
+    ("pancake", "Pancakes", 1, True),
+    # typos in longer words
+    ("umbrela", "Umbrella", 1, True),
+    ("umbrellla", "Umbrella", 1, True),
+    ("jelyfish", "Jellyfish", 1, True),
+    ("basketbal", "Basketball", 1, True),
+    ("watermleon", "Watermelon", 1, False),  # a swap is two edits
+    ("watermleon", "Watermelon", 2, True),
+    ("umbrelaaa", "Umbrella", 1, False),
+    ("umbrella", "Umbrella", 0, True),
+    ("umbrela", "Umbrella", 0, False),
+    # short words have to be spelled right
+    ("cot", "Cow", 1, False),
+    ("dig", "Dog", 1, False),
+    ("bad", "Bed", 1, False),
+    ("cap", "Cup", 1, False),
+    ("tre", "Tree", 1, False),
+    ("cars", "Car", 1, True),
+    # other words of the pack are wrong even one typo away
+    ("plane", "Plate", 1, False),
+    ("plate", "Plane", 1, False),
+    ("jelly", "Jellyfish", 1, False),
+    ("spider", "Spiderweb", 2, False),
+    ("cowboy", "Cow", 1, False),
+    # nothing like the word
+    ("", "Dog", 1, False),
+    ("!!!", "Dog", 1, False),
+    ("banana", "Surfboard", 2, False),
+)
+
+
+def checkCases():
+    easy, hard = loadPack("easymode.txt"), loadPack("hardmode.txt")
+    easyWords = set(easy)
+    matchers = {}
+    failed = []
+    for answer, word, typos, accepted in CASES:
+        pack = easy if word in easyWords else hard
+        key = (pack.path, typos)
+        if key not in matchers:
+            matchers[key] = AnswerMatcher(pack, typos)
+        if matchers[key].isCorrect(answer, word) != accepted:
+            failed.append(f"{answer!r} for {word!r} with {typos} typos should be {'accepted' if accepted else 'rejected'}")
+    if failed:
+        raise SystemExit("\n".join(failed))
+    print(f"{len(CASES)} guesses accepted and rejected as expected")
+
+
+def madeUpWord(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+
+
+# a word with one letter changed
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def bench(count, checks, rng):
+    words = [madeUpWord(rng) for _ in range(count)]
+    start = time.perf_counter()
+    matcher = AnswerMatcher(words)
+    built = time.perf_counter() - start
+    targets = [rng.choice(words) for _ in range(checks)]
+    guesses = {
+        "right": [word.upper() + "s" for word in targets],
+        "typo": [typo(word, rng) for word in targets],
+        "wrong": [madeUpWord(rng) for _ in targets],
+        "pack word": [rng.choice(words) for _ in targets],
+    }
+    results = []
+    for name, answers in guesses.items():
+        start = time.perf_counter()
+        for answer, word in zip(answers, targets):
+            matcher.isCorrect(answer, word)
+        elapsed = time.perf_counter() - start
+        results.append(f"{name} {elapsed / checks * 1e6:.1f}us")
+    print(f"{count:>8} words: matcher built in {built:.2f}s ({len(matcher.index) * 8 / 2 ** 20:.1f} MiB index), "
+          f"per guess: {', '.join(results)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the answer matching")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000], help="words in the made up packs")
+    parser.add_argument("--checks", type=int, default=20000, help="guesses timed of each kind")
+    args = parser.parse_args()
+    checkCases()
+    rng = random.Random(0)
+    for size in args.sizes:
+        bench(size, args.checks, rng)
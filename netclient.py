@@ -0,0 +1,113 @@
+# Connection of a game window to server.py
+# outgoing stroke points are collected and sent together once per network tick, incoming messages are
+# decoded and handed to the window through signals
+#  documentation: https://doc.qt.io/qt-6/qtcpsocket.html
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QAbstractSocket, QTcpSocket
+from netprotocol import (FrameReader, ProtocolError, HELLO, STROKES, GUESS, TURN, CLEAR, UNDO, REDO, FILL, frame, helloFrame,
+                         strokesFrame, guessFrame, turnFrame, fillFrame, decode)
+from instrumentation import log
+
+NETWORK_TICK = 33  # milliseconds between two sends
+
+
+class NetworkClient(QObject):
+    '''
+    Sends this window's drawing and game events to the room and receives the others'
+    '''
+    strokesReceived = pyqtSignal(object)  # list of (stroke id, colour, width, [(x, y), ...])
+    guessReceived = pyqtSignal(str, str, bool, int, int)  # player, answer, correct, player 1 score, player 2 score
+    turnReceived = pyqtSignal(str, str, str)  # sketcher, guesser, word
+    joinReceived = pyqtSignal(str)  # name of a window that joined the room
+    clearReceived = pyqtSignal()
+    undoReceived = pyqtSignal()
+    redoReceived = pyqtSignal()
+    fillReceived = pyqtSignal(object, int, int, int)  # colour, tolerance, x, y
+
+    def __init__(self, host, port, room, name, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.frames = FrameReader()
+        self.chunks = []  # stroke chunks waiting for the next tick
+        self.outgoing = bytearray(helloFrame(room, name))  # the room is joined as soon as the connection is up
+        self.socket = QTcpSocket(self)
+        self.socket.connected.connect(self.flush)
+        self.socket.readyRead.connect(self.receive)
+        self.socket.connectToHost(host, port)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(NETWORK_TICK)
+
+    # queue stroke points (flat x, y values on the NET_SCALE grid) of the stroke with the given id
+    def sendStroke(self, strokeId, color, width, points):
+        self.chunks.append((strokeId, color, width, points))
+
+    # queue any other message, after the stroke points queued before it so the room sees them in the same order
+    def queue(self, data):
+        self.queueStrokes()
+        self.outgoing += data
+
+    def queueStrokes(self):
+        if self.chunks:
+            self.outgoing += strokesFrame(self.chunks)
+            self.chunks = []
+
+    def sendGuess(self, player, answer, correct, score1, score2):
+        self.queue(guessFrame(player, answer, correct, score1, score2))
+
+    def sendTurn(self, sketcher, guesser, word):
+        self.queue(turnFrame(sketcher, guesser, word))
+
+    def sendClear(self):
+        self.queue(frame(CLEAR))
+
+    def sendUndo(self):
+        self.queue(frame(UNDO))
+
+    def sendRedo(self):
+        self.queue(frame(REDO))
+
+    # bucket fill around (x, y) on the NET_SCALE grid
+    def sendFill(self, color, tolerance, x, y):
+        self.queue(fillFrame(color, tolerance, x, y))
+
+    # send everything queued since the last tick in one write
+    def flush(self):
+        self.queueStrokes()
+        if self.outgoing and self.socket.state() == QAbstractSocket.SocketState.ConnectedState:
+            self.socket.write(bytes(self.outgoing))
+            self.outgoing.clear()
+
+    def receive(self):
+        try:
+            frames = self.frames.feed(self.socket.readAll().data())
+        except ProtocolError as error:
+            # the rest of the stream cannot be split into messages, so the connection is given up
+            log.error("network_stream_broken", error=str(error))
+            self.socket.abort()  # documentation: https://doc.qt.io/qt-6/qabstractsocket.html#abort
+            return
+        for kind, payload, _ in frames:
+            try:
+                self.handle(kind, payload)
+            except ProtocolError as error:
+                log.warning("network_message_dropped", kind=kind, error=str(error))  # one bad message is skipped
+
+    # hand a received message to the window
+    def handle(self, kind, payload):
+        if kind == STROKES:
+            self.strokesReceived.emit(decode(kind, payload)[1])
+        elif kind == GUESS:
+            self.guessReceived.emit(*decode(kind, payload))
+        elif kind == TURN:
+            self.turnReceived.emit(*decode(kind, payload))
+        elif kind == HELLO:
+            self.joinReceived.emit(decode(kind, payload)[1])
+        elif kind == CLEAR:
+            self.clearReceived.emit()
+        elif kind == UNDO:
+            self.undoReceived.emit()
+        elif kind == REDO:
+            self.redoReceived.emit()
+        elif kind == FILL:
+            self.fillReceived.emit(*decode(kind, payload))
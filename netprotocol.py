@@ -0,0 +1,185 @@
+# Binary messages sent between the game windows and server.py
+# a frame is the varint length of the rest, one message type byte and the payload. The payloads use the same
+# varint, text and delta encoded point helpers as the .pict recordings in recording.py
+# stroke points are sent on a NET_SCALE x NET_SCALE grid so windows of different sizes draw in the same place
+
+import time
+from recording import writeVarint, readVarint, writeText, readText, writePoints, readPoints, zigzag, unzigzag, WIDTH_SCALE
+
+# message types
+HELLO = 1  # room, player name, sent once by a client to join a room and passed on to the room
+STROKES = 2  # time sent in microseconds, then stroke chunks: stroke id, colour, width, points
+GUESS = 3  # player, answer, correct, player 1 score, player 2 score
+TURN = 4  # sketcher, guesser, word, sent by the window that picks the words
+CLEAR = 5
+UNDO = 6
+REDO = 7
+FILL = 8  # colour, tolerance, point clicked on the NET_SCALE grid
+
+NET_SCALE = 10000
+MAX_FRAME = 1 << 20  # longest frame accepted, a peer sending a longer one is broken or hostile
+MAX_LENGTH_BYTES = 3  # bytes of the varint length of a MAX_FRAME frame
+# received values are checked against these before they reach Qt, a value that does not fit its C++ type would abort
+# the window from inside a slot
+MAX_COLOR = 0xffffffff  # argb
+MAX_WIDTH = NET_SCALE  # a stroke as wide as the canvas
+MAX_TOLERANCE = 255  # a fill tolerance of a whole colour channel matches every pixel already
+MAX_COORD = 1 << 24  # far outside the canvas, strokes dragged out of the window still go a little past its edges
+
+
+class ProtocolError(ValueError):
+    '''
+    Bytes received that are not a well formed message
+    '''
+
+
+def frame(kind, payload=b""):
+    out = bytearray()
+    writeVarint(out, len(payload) + 1)
+    out.append(kind)
+    out += payload
+    return bytes(out)
+
+
+def helloFrame(room, name):
+    payload = bytearray()
+    writeText(payload, room)
+    writeText(payload, name)
+    return frame(HELLO, payload)
+
+
+# chunks is a list of (stroke id, argb colour, width, flat x, y points) already on the NET_SCALE grid
+def strokesFrame(chunks, sentAt=None):
+    payload = bytearray()
+    writeVarint(payload, sentAt if sentAt is not None else time.time_ns() // 1000)
+    writeVarint(payload, len(chunks))
+    for strokeId, color, width, points in chunks:
+        writeVarint(payload, strokeId)
+        writeVarint(payload, color)
+        writeVarint(payload, round(width * WIDTH_SCALE))
+        writePoints(payload, points)
+    return frame(STROKES, payload)
+
+
+def guessFrame(player, answer, correct, score1, score2):
+    payload = bytearray()
+    writeText(payload, player)
+    writeText(payload, answer)
+    payload.append(1 if correct else 0)
+    writeVarint(payload, zigzag(score1))
+    writeVarint(payload, zigzag(score2))
+    return frame(GUESS, payload)
+
+
+# an empty word when the word list ran out
+def turnFrame(sketcher, guesser, word):
+    payload = bytearray()
+    writeText(payload, sketcher)
+    writeText(payload, guesser)
+    writeText(payload, word or "")
+    return frame(TURN, payload)
+
+
+def fillFrame(color, tolerance, x, y):
+    payload = bytearray()
+    writeVarint(payload, color)
+    writeVarint(payload, tolerance)
+    writePoints(payload, (x, y))
+    return frame(FILL, payload)
+
+
+# decode the payload of a message into a tuple of its values, raises ProtocolError if it is cut short or garbled
+def decode(kind, payload):
+    try:
+        return decodePayload(kind, payload)
+    except (IndexError, UnicodeDecodeError, ValueError) as error:
+        raise ProtocolError(f"malformed message of type {kind}: {error}") from error
+
+
+def decodePayload(kind, payload):
+    if kind == HELLO:
+        room, pos = readText(payload, 0)
+        name, pos = readText(payload, pos)
+        return room, name
+    if kind == TURN:
+        sketcher, pos = readText(payload, 0)
+        guesser, pos = readText(payload, pos)
+        word, pos = readText(payload, pos)
+        return sketcher, guesser, word
+    if kind == STROKES:
+        sentAt, pos = readVarint(payload, 0)
+        count, pos = readVarint(payload, pos)
+        chunks = []
+        for _ in range(count):
+            strokeId, pos = readVarint(payload, pos)
+            color, pos = readVarint(payload, pos)
+            width, pos = readVarint(payload, pos)
+            points, pos = readPoints(payload, pos)
+            checkColor(color)
+            if not 0 < width <= MAX_WIDTH * WIDTH_SCALE:
+                raise ValueError(f"stroke width {width / WIDTH_SCALE} out of range")
+            if not points:
+                raise ValueError("stroke chunk without points")
+            checkPoints(points)
+            chunks.append((strokeId, color, width / WIDTH_SCALE, points))
+        return sentAt, chunks
+    if kind == GUESS:
+        player, pos = readText(payload, 0)
+        answer, pos = readText(payload, pos)
+        correct = payload[pos] == 1
+        score1, pos = readVarint(payload, pos + 1)
+        score2, pos = readVarint(payload, pos)
+        return player, answer, correct, unzigzag(score1), unzigzag(score2)
+    if kind == FILL:
+        color, pos = readVarint(payload, 0)
+        tolerance, pos = readVarint(payload, pos)
+        (x, y), = readPoints(payload, pos)[0]
+        checkColor(color)
+        if tolerance > MAX_TOLERANCE:
+            raise ValueError(f"fill tolerance {tolerance} out of range")
+        checkPoints([(x, y)])
+        return color, tolerance, x, y
+    return ()
+
+
+def checkColor(color):
+    if color > MAX_COLOR:
+        raise ValueError(f"colour {color:#x} out of range")
+
+
+def checkPoints(points):
+    for x, y in points:
+        if abs(x) > MAX_COORD or abs(y) > MAX_COORD:
+            raise ValueError(f"point ({x}, {y}) out of range")
+
+
+class FrameReader:
+    '''
+    Splits a stream of bytes into frames, keeping any incomplete frame until the rest arrives
+    '''
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    # add received bytes and return the complete frames as (type, payload, raw frame bytes), raises ProtocolError on
+    # a length that cannot be right, the stream cannot be split any further after that so the peer has to be dropped
+    def feed(self, data):
+        self.buffer += data
+        frames = []
+        pos = 0
+        while pos < len(self.buffer):
+            try:
+                length, start = readVarint(self.buffer, pos)
+            except IndexError:
+                if len(self.buffer) - pos > MAX_LENGTH_BYTES:
+                    raise ProtocolError("frame length too long")
+                break  # the length itself is not complete yet
+            if length == 0 or length > MAX_FRAME:
+                raise ProtocolError(f"frame length {length} out of range")
+            end = start + length
+            if end > len(self.buffer):
+                break
+            frames.append((self.buffer[start], bytes(self.buffer[start + 1:end]), bytes(self.buffer[pos:end])))
+            pos = end
+        del self.buffer[:pos]
+        return frames
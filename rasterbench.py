@@ -0,0 +1,101 @@
+# Benchmark of the tiled rasterizer: a made up drawing of about 100k segments is drawn the way the canvas was always
+# re-rendered (StrokeLog.render on the calling thread) and then on tiles by pools of a growing number of processes,
+# and the time of each, the speed up and the pixels that differ from StrokeLog.render are reported. Each pool draws
+# the drawing once before it is timed so starting its processes is not counted
+#  python rasterbench.py --segments 100000 --size 3840x2160 --workers 1 2 4 8
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QGuiApplication, QImage
+from strokes import StrokeLog
+import rasterizer
+
+
+# scribbles of random colours and widths, then a bucket fill and more strokes over it if fill is set
+def drawing(segments, width, height, fill, rng):
+    strokeLog = StrokeLog(width, height)
+    while strokeLog.pointCount() - len(strokeLog) < segments:
+        if fill and strokeLog.pointCount() - len(strokeLog) > segments // 2 and not any(strokeLog.isFill(i) for i in range(len(strokeLog))):
+            strokeLog.addFill(rng.uniform(0, width), rng.uniform(0, height), 0xff3366cc, 0)
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        strokeLog.beginStroke(x, y, 0xff000000 | rng.randrange(1 << 24), rng.choice((2, 5, 10, 20)))
+        for _ in range(rng.randint(10, 90)):
+            x = min(max(x + rng.uniform(-15, 15), 0), width)
+            y = min(max(y + rng.uniform(-15, 15), 0), height)
+            strokeLog.addPoint(x, y)
+        strokeLog.endStroke()
+    return strokeLog
+
+
+def blank(width, height):
+    image = QImage(width, height, rasterizer.TILE_FORMAT)
+    image.fill(Qt.GlobalColor.white)
+    return image
+
+
+def timed(draw, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        image = draw()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2], image
+
+
+# pixels of two images of the same size that are not the same
+def differing(a, b):
+    bitsA, bitsB = a.constBits(), b.constBits()
+    bitsA.setsize(a.sizeInBytes())
+    bitsB.setsize(b.sizeInBytes())
+    if bytes(bitsA) == bytes(bitsB):
+        return 0
+    pixelsA, pixelsB = memoryview(bitsA).cast('I'), memoryview(bitsB).cast('I')
+    return sum(pixelsA[i] != pixelsB[i] for i in range(len(pixelsA)))
+
+
+def render(strokeLog, width, height):
+    image = blank(width, height)
+    strokeLog.render(image, width, height)
+    return image
+
+
+def tiled(strokeLog, width, height, workers, tileSize):
+    image = blank(width, height)
+    rasterizer.rasterize(image, strokeLog, width, height, workers, tileSize, minPoints=0)
+    return image
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tiled rasterizer")
+    parser.add_argument("--segments", type=int, default=100000, help="segments in the drawing")
+    parser.add_argument("--size", default="3840x2160", help="width x height of the image drawn")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="processes of the pools timed, 1 to the cores by default")
+    parser.add_argument("--tile", type=int, default=None, help="pixels on each side of a tile, a few tiles per process by default")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--fill", action="store_true", help="put a bucket fill in the middle of the drawing, needs numpy")
+    args = parser.parse_args()
+    app = QGuiApplication(sys.argv[:1])
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))) or [1]
+    strokeLog = drawing(args.segments, 1280, 720, args.fill, random.Random(0))
+    print(f"{len(strokeLog)} strokes, {strokeLog.pointCount() - len(strokeLog)} segments drawn at {width}x{height} "
+          f"on {cores} cores")
+    baseline, expected = timed(lambda: render(strokeLog, width, height), args.repeats)
+    print(f"{'StrokeLog.render':>18}: {baseline * 1000:7.0f}ms")
+    for count in workers:
+        # a pool of one process still draws in tiles, it shows what the tiles and sending the pixels back cost
+        tiled(strokeLog, width, height, count, args.tile)
+        elapsed, image = timed(lambda: tiled(strokeLog, width, height, count, args.tile), args.repeats)
+        tileSize = args.tile or rasterizer.tileSizeFor(width, height, count)
+        print(f"{count:>8} processes: {elapsed * 1000:7.0f}ms, {baseline / elapsed:.2f}x StrokeLog.render with tiles of {tileSize} pixels, "
+              f"{differing(expected, image)} pixels differ")
+    rasterizer.shutdown()
@@ -0,0 +1,192 @@
+# Tiled rasterizer of stroke logs for drawing big drawings again: resizing the window, replays, exports and thumbnails
+# the image is cut into tiles and each tile is drawn with only the strokes whose bounds touch it, on a pool of
+# processes: PyQt keeps the GIL while it paints, so threads would only take turns. Tiles are drawn transparent and
+# sent back as raw pixels, then composited over the image in order, so whatever the image already shows (a background
+# picture, earlier fills) stays under the strokes. A bucket fill depends on everything drawn before it, so the strokes
+# are drawn in runs between fills and each fill is done on the whole image in between. Small drawings, and every
+# drawing on a single core, are drawn on the calling thread with StrokeLog.render, the tiles would only add work
+#  python rasterizer.py game.pict thumbnail.png --turn 2 --size 320x240
+#  https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+
+import math
+import os
+from array import array
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPolygonF
+from instrumentation import stats
+from tiledcanvas import TILE_FORMAT
+
+PARALLEL_POINTS = 50000  # drawings with fewer points are drawn on the calling thread
+PIECE_POINTS = 8  # points in the pieces long strokes are cut into to put them on tiles
+TILES_PER_WORKER = 4  # so a process that finishes early takes another tile instead of waiting
+MIN_TILE_SIZE = 128
+
+_pool = None
+_poolWorkers = 0
+
+
+# pool of processes started the first time it is needed and kept for the next drawings. The processes are spawned
+# and not forked, a fork of a process running Qt may copy locks held by its other threads
+def pool(workers):
+    global _pool, _poolWorkers
+    import multiprocessing  # imported the first time, the window starts without them
+    from concurrent.futures import ProcessPoolExecutor
+    if _pool is None or _poolWorkers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        _poolWorkers = workers
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+# polygon of flat float x, y values, written straight into its points (two doubles each) instead of point by point
+def polygon(points):
+    values = array('d', points)
+    polyline = QPolygonF()  # documentation: https://doc.qt.io/qt-6/qpolygonf.html
+    polyline.resize(len(values) // 2)
+    data = polyline.data()
+    data.setsize(len(values) * 8)
+    memoryview(data).cast('B')[:] = values.tobytes()
+    return polyline
+
+
+# job of one tile: draw the strokes (colour, width, float32 points as bytes) scaled by sx, sy on a transparent tile
+# whose top left is at x, y of the image, returns x, y, width, height and the pixels of the tile
+def renderTile(job):
+    x, y, width, height, sx, sy, strokes = job
+    tile = QImage(width, height, TILE_FORMAT)
+    tile.fill(0)
+    painter = QPainter(tile)
+    painter.translate(-x, -y)
+    painter.scale(sx, sy)
+    for color, penWidth, data in strokes:
+        points = array('f')
+        points.frombytes(data)
+        painter.setPen(QPen(QColor.fromRgba(color), penWidth, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+        painter.drawPolyline(polygon(points))
+    painter.end()
+    bits = tile.constBits()
+    bits.setsize(tile.sizeInBytes())
+    return x, y, width, height, bytes(bits)
+
+
+# tile jobs of strokes first to last - 1 of the log on an image of the given size in pixels. A long stroke would be
+# drawn whole on every tile under its bounds, so it is cut into pieces of PIECE_POINTS points that are only put on the
+# tiles under their own bounds, and pieces that follow each other on a tile are joined back into one polyline. With
+# round caps and joins the pieces cover the same pixels as the stroke, but translucent strokes would be darker where
+# they meet, so those are kept whole
+def tileJobs(strokeLog, first, last, imageWidth, imageHeight, sx, sy, tileSize):
+    columns = (imageWidth + tileSize - 1) // tileSize
+    rows = (imageHeight + tileSize - 1) // tileSize
+    tiles = {}  # (column, row) -> [stroke, first point, last point + 1] on the tile in the order they are drawn
+    for i in range(first, last):
+        color, width, points = strokeLog.stroke(i)
+        count = len(points) // 2
+        pad = width / 2 * max(sx, sy) + 2  # half the pen and a pixel of rounding on each side
+        step = PIECE_POINTS if color >> 24 == 0xff else count
+        for start in range(0, max(count - 1, 1), step):
+            end = min(start + step + 1, count)  # pieces share their end points so no segment is lost
+            xs, ys = points[start * 2:end * 2:2], points[start * 2 + 1:end * 2:2]
+            left = max(int((min(xs) * sx - pad) // tileSize), 0)
+            right = min(int((max(xs) * sx + pad) // tileSize), columns - 1)
+            top = max(int((min(ys) * sy - pad) // tileSize), 0)
+            bottom = min(int((max(ys) * sy + pad) // tileSize), rows - 1)
+            for row in range(top, bottom + 1):
+                for column in range(left, right + 1):
+                    runs = tiles.setdefault((column, row), [])
+                    if runs and runs[-1][0] == i and runs[-1][2] == start + 1:
+                        runs[-1][2] = end
+                    else:
+                        runs.append([i, start, end])
+    for (column, row), runs in tiles.items():
+        x, y = column * tileSize, row * tileSize
+        strokes = []
+        for i, start, end in runs:
+            color, width, points = strokeLog.stroke(i)
+            strokes.append((color, width, points[start * 2:end * 2].tobytes()))
+        yield x, y, min(tileSize, imageWidth - x), min(tileSize, imageHeight - y), sx, sy, strokes
+
+
+# pixels on each side of the tiles of an image, a few tiles for each process: every tile a stroke crosses draws it
+# again, so smaller tiles would only add work
+def tileSizeFor(width, height, workers):
+    side = math.sqrt(width * height / (workers * TILES_PER_WORKER))
+    return max(MIN_TILE_SIZE, int(side) // 64 * 64)
+
+
+# draw the strokes of a log onto an image of the given size in logical pixels, like StrokeLog.render. workers is the
+# number of processes drawing tiles, 0 draws on the calling thread and None takes one per core if there are more than
+# one. Drawings of fewer than minPoints points are always drawn on the calling thread
+def rasterize(image, strokeLog, width, height, workers=None, tileSize=None, minPoints=PARALLEL_POINTS):
+    if workers is None:
+        workers = os.cpu_count() or 1
+        if workers < 2:
+            workers = 0  # one core draws faster without the tiles
+    if not workers or strokeLog.pointCount() < minPoints:
+        strokeLog.render(image, width, height)
+        return
+    if not len(strokeLog) or not strokeLog.width or not strokeLog.height:
+        return
+    tileSize = tileSize or tileSizeFor(image.width(), image.height(), workers)
+    ratio = image.devicePixelRatio()
+    sx = width / strokeLog.width * ratio  # from the points of the log to the pixels of the image
+    sy = height / strokeLog.height * ratio
+    executor = pool(workers)
+    first = 0
+    while first < len(strokeLog):
+        last = first
+        while last < len(strokeLog) and not strokeLog.isFill(last):
+            last += 1
+        if last > first:
+            jobs = list(tileJobs(strokeLog, first, last, image.width(), image.height(), sx, sy, tileSize))
+            stats.count("raster_tiles", len(jobs))
+            painter = QPainter(image)
+            painter.scale(1 / ratio, 1 / ratio)  # the tiles are in the pixels of the image
+            # the tiles do not overlap, so each one is composited as it comes back while the others are drawn
+            for x, y, tileWidth, tileHeight, pixels in executor.map(renderTile, jobs):
+                painter.drawImage(QPointF(x, y), QImage(pixels, tileWidth, tileHeight, tileWidth * 4, TILE_FORMAT))
+            painter.end()
+        if last < len(strokeLog):
+            strokeLog.renderFill(image, width, height, last)  # the fill needs every pixel drawn before it
+            last += 1
+        first = last
+
+
+# a new white image with the strokes of a log drawn on it, pixels on each side, for exports and thumbnails
+def renderLog(strokeLog, width, height, workers=None):
+    image = QImage(width, height, TILE_FORMAT)
+    image.fill(Qt.GlobalColor.white)
+    rasterize(image, strokeLog, width, height, workers)
+    return image
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from PyQt6.QtGui import QGuiApplication
+    from timelapse import turnLog
+    parser = argparse.ArgumentParser(description="Draw a turn of a .pict recording to an image")
+    parser.add_argument("recording")
+    parser.add_argument("output", help="image file, its format is taken from the extension")
+    parser.add_argument("--turn", type=int, default=1, help="number of the turn, from 1")
+    parser.add_argument("--size", help="width x height of the image, the size it was drawn at by default")
+    parser.add_argument("--workers", type=int, default=None, help="processes drawing tiles, one per core by default")
+    args = parser.parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+    app = QGuiApplication(sys.argv[:1])
+    found = turnLog(args.recording, args.turn)
+    if found is None:
+        raise SystemExit(f"{args.recording} has no turn {args.turn}")
+    word, strokeLog = found
+    width, height = (int(n) for n in args.size.lower().split("x")) if args.size else (round(strokeLog.width), round(strokeLog.height))
+    if not renderLog(strokeLog, width, height, args.workers).save(args.output):
+        raise SystemExit(f"could not write {args.output}")
+    print(f"{word}: {len(strokeLog)} strokes drawn to {args.output}")
+    shutdown()
@@ -0,0 +1,176 @@
+# Drawing recognizer for the bot guesser
+# a drawing is described by which cells of a coarse grid its lines pass through and by how much of it runs in each
+# direction. The strokes are sampled once when they are added, so describing the live canvas again after a new
+# stroke only looks at that stroke. The bot compares the canvas against drawings taken from .pict recordings and
+# guesses the words whose drawings are the most alike
+#  https://en.wikipedia.org/wiki/Cosine_similarity
+
+import numpy as np
+from recording import Recording, STROKE
+
+GRID = 16  # cells on each side of the occupancy grid
+DIRECTIONS = 8  # bins of the direction histogram, directions are taken without their sign so they cover 180 degrees
+DIRECTION_WEIGHT = 0.5  # share of the direction histogram in the comparison
+SAMPLE_SPACING = 0.005  # distance between the points a stroke is sampled at, as a part of the canvas diagonal
+FEATURES = GRID * GRID + DIRECTIONS
+ERASER = 0xffffffff  # white strokes rub out lines, they are not part of the drawing
+
+
+# points along the segments of a stroke (flat x, y values) no further apart than spacing, with the direction
+# (0 to pi) and length of every segment
+def sampleStroke(points, spacing):
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    segments = np.diff(points, axis=0)
+    lengths = np.hypot(segments[:, 0], segments[:, 1])
+    counts = np.maximum(np.ceil(lengths / spacing).astype(np.int64), 1)
+    segment = np.repeat(np.arange(len(segments)), counts)
+    # position of each sample along its segment from 0 to just under 1
+    step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    samples = points[segment] + segments[segment] * (step / counts[segment])[:, None]
+    samples = np.concatenate((samples, points[-1:]))
+    angles = np.arctan2(segments[:, 1], segments[:, 0]) % np.pi
+    return samples, angles, lengths
+
+
+class DrawingFeatures:
+    '''
+    Grid and direction features of one drawing, built up one stroke at a time
+    '''
+
+    def __init__(self, width=1, height=1):
+        self.reset(width, height)
+
+    def reset(self, width, height):
+        self.size = (width, height)
+        self.spacing = max(np.hypot(width, height) * SAMPLE_SPACING, 1e-6)
+        self.samples = []
+        self.angles = []
+        self.lengths = []
+        self.synced = (None, 0, 0)  # stroke log, its removals and its strokes already added
+        self.cached = None
+
+    def addStroke(self, points):
+        if len(points) < 4:
+            return
+        samples, angles, lengths = sampleStroke(points, self.spacing)
+        self.samples.append(samples)
+        self.angles.append(angles)
+        self.lengths.append(lengths)
+        self.cached = None
+
+    # add the strokes of a strokes.StrokeLog drawn since the last call, starting again if strokes were taken out
+    def sync(self, log):
+        synced, removals, count = self.synced
+        if synced is not log or removals != log.removals or self.size != (log.width, log.height):
+            self.reset(log.width, log.height)
+            count = 0
+        for i in range(count, len(log)):
+            color, width, points = log.stroke(i)
+            if width > 0 and color != ERASER:  # bucket fills have a negative width
+                self.addStroke(np.frombuffer(points, dtype=np.float32))
+        self.synced = (log, log.removals, len(log))
+
+    def isEmpty(self):
+        return not self.samples
+
+    # feature vector of unit length, the drawing is centred and scaled to fit the grid so where and how big it
+    # was drawn does not matter
+    def vector(self):
+        if self.cached is not None:
+            return self.cached
+        vector = np.zeros(FEATURES, dtype=np.float32)
+        if self.samples:
+            samples = np.concatenate(self.samples)
+            low, high = samples.min(axis=0), samples.max(axis=0)
+            scale = GRID / max(float((high - low).max()), self.spacing)
+            cells = np.clip(((samples - (low + high) / 2) * scale + GRID / 2).astype(np.int64), 0, GRID - 1)
+            grid = np.bincount(cells[:, 1] * GRID + cells[:, 0], minlength=GRID * GRID).reshape(GRID, GRID) > 0
+            # spread every cell a little into its neighbours so lines one cell apart still look alike
+            padded = np.pad(grid.astype(np.float32), 1)
+            blurred = padded[1:-1, 1:-1] * 2 + padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+            blurred /= max(np.linalg.norm(blurred), 1e-6)
+            bins = (np.concatenate(self.angles) * (DIRECTIONS / np.pi)).astype(np.int64) % DIRECTIONS
+            directions = np.bincount(bins, weights=np.concatenate(self.lengths), minlength=DIRECTIONS)
+            directions /= max(np.linalg.norm(directions), 1e-6)
+            vector[:GRID * GRID] = blurred.ravel() * (1 - DIRECTION_WEIGHT)
+            vector[GRID * GRID:] = directions * DIRECTION_WEIGHT
+            vector /= max(np.linalg.norm(vector), 1e-6)
+        self.cached = vector
+        return vector
+
+
+class DrawingIndex:
+    '''
+    Feature vectors of known drawings and the word each was drawn for, searched for the most alike drawing per word
+    '''
+
+    def __init__(self):
+        self.words = []  # word of each label
+        self.wordIds = {}
+        self.pending = []  # (label, vector) added since the matrix was last built
+        self.vectors = np.zeros((0, FEATURES), dtype=np.float32)  # one row per drawing, grouped by label
+        self.labels = np.zeros(0, dtype=np.int64)
+        self.groupStarts = np.zeros(0, dtype=np.int64)  # first row of each label present, for np.maximum.reduceat
+        self.groupLabels = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.labels) + len(self.pending)
+
+    def add(self, word, features):
+        if features.isEmpty():
+            return
+        label = self.wordIds.get(word)
+        if label is None:
+            label = self.wordIds[word] = len(self.words)
+            self.words.append(word)
+        self.pending.append((label, features.vector()))
+
+    # put the drawings added since the last search into the matrix, sorted by label
+    def build(self):
+        if not self.pending:
+            return
+        labels = np.concatenate((self.labels, np.array([label for label, _ in self.pending], dtype=np.int64)))
+        vectors = np.concatenate((self.vectors, np.stack([vector for _, vector in self.pending])))
+        self.pending = []
+        order = np.argsort(labels, kind="stable")
+        self.labels, self.vectors = labels[order], vectors[order]
+        self.groupStarts = np.flatnonzero(np.diff(self.labels, prepend=-1))
+        self.groupLabels = self.labels[self.groupStarts]
+
+    # the candidate words ordered from the most to the least likely for the drawing, words without any known
+    # drawing come last in the order given
+    def rank(self, features, candidates):
+        self.build()
+        scores = {}
+        if len(self.labels) and not features.isEmpty():
+            similarity = self.vectors @ features.vector()
+            best = np.maximum.reduceat(similarity, self.groupStarts)  # documentation: https://numpy.org/doc/stable/reference/generated/numpy.ufunc.reduceat.html
+            scores = dict(zip((self.words[label] for label in self.groupLabels.tolist()), best.tolist()))
+        known = sorted((word for word in candidates if word in scores), key=scores.get, reverse=True)
+        return known + [word for word in candidates if word not in scores]
+
+    # index the drawing of every turn of some .pict recordings
+    @classmethod
+    def fromRecordings(cls, paths):
+        index = cls()
+        for path in paths:
+            index.addRecording(Recording(path))
+        index.build()
+        return index
+
+    # index the drawing of every turn of a recording, fills and eraser strokes are left out
+    def addRecording(self, recording):
+        for word, width, height, records in recording.turnDrawings():
+            strokes = [np.array(record[1].points(), dtype=np.float32).ravel() for record in records
+                       if record[0] == STROKE and record[1].color != ERASER]
+            self.addDrawing(word, (width, height), strokes)
+        records = None  # stroke records point into the mapped file, which cannot be closed while they are alive
+        recording.close()
+
+    def addDrawing(self, word, size, strokes):
+        if not word:
+            return
+        features = DrawingFeatures(*size)
+        for points in strokes:
+            features.addStroke(points)
+        self.add(word, features)
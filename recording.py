@@ -0,0 +1,282 @@
+# .pict recordings of whole games
+# a recording starts with b"PICT" and a version byte, followed by records of one tag byte, the payload length
+# as a varint and the payload. Numbers are varints (zigzag for values that can be negative), text is a varint
+# length followed by utf-8, and stroke points are stored as the difference from the previous point, so an
+# hour of drawing takes far less space than saving pictures of the canvas
+#  https://developers.google.com/protocol-buffers/docs/encoding#varints
+
+import mmap
+
+MAGIC = b"PICT"
+VERSION = 1
+
+# record tags
+SETUP = 1  # player 1, player 2, difficulty
+CANVAS = 2  # width and height the following stroke points are stored against
+TURN = 3  # sketcher, guesser, word
+GUESS = 4  # player, guess, correct, change of player 1 score, change of player 2 score
+STROKE = 5  # colour, width in 1/16 px, number of points, points
+UNDO = 6
+REDO = 7
+CLEAR = 8
+FILL = 9  # colour, tolerance, point clicked
+
+WIDTH_SCALE = 16  # stroke widths are stored in 1/16 of a pixel
+
+
+# append n as a varint: 7 bits per byte, the high bit is set on every byte but the last
+def writeVarint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+# read a varint from data at pos, returns the value and the position after it
+def readVarint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+# map signed numbers to unsigned so small negative numbers stay small: 0, -1, 1, -2 -> 0, 1, 2, 3
+def zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+def writeText(out, text):
+    encoded = text.encode("utf-8")
+    writeVarint(out, len(encoded))
+    out += encoded
+
+
+def readText(data, pos):
+    length, pos = readVarint(data, pos)
+    if pos + length > len(data):
+        raise IndexError("text cut short")
+    return bytes(data[pos:pos + length]).decode("utf-8"), pos + length
+
+
+# append the points (flat x, y values) rounded to whole pixels and stored as the change from the previous point
+def writePoints(out, points):
+    writeVarint(out, len(points) // 2)
+    lastX = lastY = 0
+    for i in range(0, len(points), 2):
+        x = round(points[i])
+        y = round(points[i + 1])
+        writeVarint(out, zigzag(x - lastX))
+        writeVarint(out, zigzag(y - lastY))
+        lastX, lastY = x, y
+
+
+def readPoints(data, pos):
+    count, pos = readVarint(data, pos)
+    points = []
+    x = y = 0
+    for _ in range(count):
+        dx, pos = readVarint(data, pos)
+        dy, pos = readVarint(data, pos)
+        x += unzigzag(dx)
+        y += unzigzag(dy)
+        points.append((x, y))
+    return points, pos
+
+
+class RecordingWriter:
+    '''
+    Writes the records of a game to a .pict file as they happen
+    '''
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + bytes([VERSION]))
+        self.canvasSize = None
+
+    def writeRecord(self, tag, payload):
+        header = bytearray([tag])
+        writeVarint(header, len(payload))
+        self.file.write(header)
+        self.file.write(payload)
+
+    def setup(self, player1, player2, difficulty):
+        payload = bytearray()
+        for text in (player1, player2, difficulty):
+            writeText(payload, text)
+        self.writeRecord(SETUP, payload)
+
+    # only written when the size changes
+    def canvas(self, width, height):
+        if self.canvasSize == (width, height):
+            return
+        self.canvasSize = (width, height)
+        payload = bytearray()
+        writeVarint(payload, width)
+        writeVarint(payload, height)
+        self.writeRecord(CANVAS, payload)
+
+    def turn(self, sketcher, guesser, word):
+        payload = bytearray()
+        for text in (sketcher, guesser, word or ""):
+            writeText(payload, text)
+        self.writeRecord(TURN, payload)
+        self.file.flush()  # everything up to the previous turn is safely on disk
+
+    def guess(self, player, answer, correct, delta1, delta2):
+        payload = bytearray()
+        writeText(payload, player)
+        writeText(payload, answer)
+        payload.append(1 if correct else 0)
+        writeVarint(payload, zigzag(delta1))
+        writeVarint(payload, zigzag(delta2))
+        self.writeRecord(GUESS, payload)
+
+    # color is an argb int, points the flat x, y values of the stroke
+    def stroke(self, color, width, points):
+        payload = bytearray()
+        writeVarint(payload, color)
+        writeVarint(payload, round(width * WIDTH_SCALE))
+        writePoints(payload, points)
+        self.writeRecord(STROKE, payload)
+
+    # bucket fill around (x, y) in the coordinates of the last CANVAS record
+    def fill(self, color, tolerance, x, y):
+        payload = bytearray()
+        writeVarint(payload, color)
+        writeVarint(payload, tolerance)
+        writePoints(payload, (x, y))
+        self.writeRecord(FILL, payload)
+
+    def undo(self):
+        self.writeRecord(UNDO, b"")
+
+    def redo(self):
+        self.writeRecord(REDO, b"")
+
+    def clear(self):
+        self.writeRecord(CLEAR, b"")
+
+    def close(self):
+        self.file.close()
+
+
+class StrokeRecord:
+    '''
+    A stroke read from a recording, the points are only decoded when they are asked for
+    '''
+    __slots__ = ("color", "width", "data", "pointsStart")
+
+    def __init__(self, payload):
+        self.data = payload  # memoryview into the mapped file, nothing is copied
+        self.color, pos = readVarint(payload, 0)
+        width, self.pointsStart = readVarint(payload, pos)
+        self.width = width / WIDTH_SCALE
+
+    # list of (x, y) points
+    def points(self):
+        return readPoints(self.data, self.pointsStart)[0]
+
+
+class Recording:
+    '''
+    A .pict file mapped into memory for replay and analysis
+    '''
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # documentation: https://docs.python.org/3/library/mmap.html
+        self.data = memoryview(self.map)
+        if bytes(self.data[:4]) != MAGIC:
+            raise ValueError(f"{path} is not a .pict recording")
+        if self.data[4] != VERSION:
+            raise ValueError(f"unsupported .pict version {self.data[4]}")
+
+    # yield (tag, payload) for every record, the payload is a memoryview of the file
+    def rawRecords(self):
+        pos = len(MAGIC) + 1
+        end = len(self.data)
+        while pos < end:
+            tag = self.data[pos]
+            try:
+                length, pos = readVarint(self.data, pos + 1)
+            except IndexError:
+                return  # cut short before the end of the length
+            if pos + length > end:
+                return  # the last record was cut short, the game was still being written
+            yield tag, self.data[pos:pos + length]
+            pos += length
+
+    # yield the records decoded as (tag, values...) tuples, strokes as (STROKE, StrokeRecord)
+    def records(self):
+        for tag, payload in self.rawRecords():
+            if tag in (SETUP, TURN):
+                first, pos = readText(payload, 0)
+                second, pos = readText(payload, pos)
+                third, pos = readText(payload, pos)
+                yield tag, first, second, third
+            elif tag == CANVAS:
+                width, pos = readVarint(payload, 0)
+                height, pos = readVarint(payload, pos)
+                yield tag, width, height
+            elif tag == GUESS:
+                player, pos = readText(payload, 0)
+                answer, pos = readText(payload, pos)
+                correct = payload[pos] == 1
+                delta1, pos = readVarint(payload, pos + 1)
+                delta2, pos = readVarint(payload, pos)
+                yield tag, player, answer, correct, unzigzag(delta1), unzigzag(delta2)
+            elif tag == STROKE:
+                yield tag, StrokeRecord(payload)
+            elif tag == FILL:
+                color, pos = readVarint(payload, 0)
+                tolerance, pos = readVarint(payload, pos)
+                (x, y), = readPoints(payload, pos)[0]
+                yield tag, color, tolerance, x, y
+            else:
+                yield (tag,)
+
+    # yield (word, width, height, records) for every turn, records being the STROKE and FILL records that make up its
+    # drawing: what is on the canvas when the next turn starts, or what was on it before it was last cleared if it is
+    # empty by then (the canvas is cleared just before a new turn). Stroke records point into the mapped file so they
+    # have to be let go of before the recording is closed
+    def turnDrawings(self):
+        word = None
+        size = (1, 1)
+        drawn = []  # records on the canvas
+        cleared = []  # records on the canvas before it was last cleared
+        undone = []
+        for record in self.records():
+            tag = record[0]
+            if tag == TURN:
+                if word:
+                    yield word, size[0], size[1], drawn or cleared
+                word = record[3]
+                drawn, cleared, undone = [], [], []
+            elif tag == CANVAS:
+                size = (record[1], record[2])
+            elif tag in (STROKE, FILL):
+                drawn.append(record)
+                undone = []
+            elif tag == UNDO and drawn:
+                undone.append(drawn.pop())
+            elif tag == REDO and undone:
+                drawn.append(undone.pop())
+            elif tag == CLEAR:
+                if drawn:
+                    cleared = drawn
+                drawn, undone = [], []
+        if word:
+            yield word, size[0], size[1], drawn or cleared
+
+    def close(self):
+        self.data.release()
+        self.map.close()
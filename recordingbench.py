@@ -0,0 +1,183 @@
+# Checks and benchmark of .pict recordings
+# a game with every kind of record is written with RecordingWriter and read back with Recording, record for record,
+# then read back again cut short at every byte to make sure a recording still being written gives the records that
+# are complete and nothing else, and the drawings of its turns are checked to follow the undos, redos and clears.
+# Then a made up game of many turns is recorded and its size and the time to write and read it are compared with
+# saving a png of the canvas every few strokes
+#  python recordingbench.py --turns 50 --strokes 40 --png-every 10
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QColor, QGuiApplication, QImage, QPainter, QPainterPath, QPen
+from recording import Recording, RecordingWriter, SETUP, CANVAS, TURN, GUESS, STROKE, UNDO, REDO, CLEAR, FILL
+
+RED, BLUE, GREEN = 0xffff0000, 0xff0000ff, 0xff00ff00
+
+
+# write a short game touching every record, returns the records it should read back as
+def writeGame(path):
+    writer = RecordingWriter(path)
+    expected = []
+    writer.setup("Alice", "Bøb", "Easy")
+    expected.append((SETUP, "Alice", "Bøb", "Easy"))
+    writer.canvas(800, 600)
+    writer.canvas(800, 600)  # not written again
+    expected.append((CANVAS, 800, 600))
+    writer.turn("Alice", "Bøb", "Hot dog")
+    expected.append((TURN, "Alice", "Bøb", "Hot dog"))
+    writer.stroke(RED, 5, [10.4, 20.6, 9, 700.2, 800, 0])
+    expected.append((STROKE, RED, 5, [(10, 21), (9, 700), (800, 0)]))
+    writer.stroke(BLUE, 3.5, [400, 300] * 200)
+    expected.append((STROKE, BLUE, 3.5, [(400, 300)] * 200))
+    writer.undo()
+    expected.append((UNDO,))
+    writer.fill(GREEN, 32, 120.7, 45.2)
+    expected.append((FILL, GREEN, 32, 121, 45))
+    writer.redo()  # nothing to redo after the fill
+    expected.append((REDO,))
+    writer.guess("Bøb", "hotdogs", True, -1, 3)
+    expected.append((GUESS, "Bøb", "hotdogs", True, -1, 3))
+    writer.canvas(1600, 1200)
+    expected.append((CANVAS, 1600, 1200))
+    writer.stroke(BLUE, 9, [1000, 1100, 1001, 1099])
+    expected.append((STROKE, BLUE, 9, [(1000, 1100), (1001, 1099)]))
+    writer.clear()
+    expected.append((CLEAR,))
+    writer.turn("Bøb", "Alice", "Umbrella")
+    expected.append((TURN, "Bøb", "Alice", "Umbrella"))
+    writer.stroke(RED, 7, [5, 5, 6, 6])
+    expected.append((STROKE, RED, 7, [(5, 5), (6, 6)]))
+    writer.undo()
+    expected.append((UNDO,))
+    writer.redo()
+    expected.append((REDO,))
+    writer.stroke(GREEN, 3, [7, 7, 8, 8])
+    expected.append((STROKE, GREEN, 3, [(7, 7), (8, 8)]))
+    writer.undo()
+    expected.append((UNDO,))
+    writer.guess("Alice", "x" * 300, False, 0, -2)  # a payload long enough for a two byte length
+    expected.append((GUESS, "Alice", "x" * 300, False, 0, -2))
+    writer.close()
+    return expected
+
+
+# the records of a recording with the strokes decoded, so they can be compared
+def readRecords(path):
+    recording = Recording(path)
+    records = []
+    for record in recording.records():
+        if record[0] == STROKE:
+            stroke = record[1]
+            record = (STROKE, stroke.color, stroke.width, stroke.points())
+        records.append(record)
+    drawings = [(word, width, height, [record[0] for record in drawn]) for word, width, height, drawn in recording.turnDrawings()]
+    record = stroke = None  # the stroke records point into the mapped file
+    recording.close()
+    return records, drawings
+
+
+def checkRoundTrip(directory):
+    path = os.path.join(directory, "game.pict")
+    expected = writeGame(path)
+    records, drawings = readRecords(path)
+    if records != expected:
+        for i, (got, wanted) in enumerate(zip(records, expected)):
+            if got != wanted:
+                raise SystemExit(f"record {i} read back as {got}, written as {wanted}")
+        raise SystemExit(f"{len(records)} records read back, {len(expected)} written")
+    # the blue stroke of the first turn is undone and the fill is drawn, then the canvas is cleared before the next
+    # turn; in the second turn the red stroke comes back with redo and the green one is undone
+    if drawings != [("Hot dog", 1600, 1200, [STROKE, FILL, STROKE]), ("Umbrella", 1600, 1200, [STROKE])]:
+        raise SystemExit(f"turn drawings do not follow the undos and redos: {drawings}")
+    with open(path, "rb") as f:
+        data = f.read()
+    cut = os.path.join(directory, "cut.pict")
+    complete = 0
+    for length in range(6, len(data)):
+        with open(cut, "wb") as f:
+            f.write(data[:length])
+        try:
+            records, _ = readRecords(cut)
+        except Exception as error:
+            raise SystemExit(f"reading the recording cut at {length} of {len(data)} bytes failed: {error!r}")
+        if records != expected[:len(records)]:
+            raise SystemExit(f"the recording cut at {length} bytes gave records that were not written: {records[-1]}")
+        complete = max(complete, len(records))
+    if complete != len(expected) - 1:
+        raise SystemExit(f"a recording cut one byte short gave {complete} of {len(expected) - 1} complete records")
+    print(f"{len(expected)} records read back as written, and as far as they go when cut short at any of {len(data)} bytes")
+
+
+def madeUpStroke(rng, width, height):
+    x, y = rng.uniform(0, width), rng.uniform(0, height)
+    points = [x, y]
+    for _ in range(rng.randint(10, 80)):
+        x = min(max(x + rng.uniform(-6, 6), 0), width - 1)
+        y = min(max(y + rng.uniform(-6, 6), 0), height - 1)
+        points += [x, y]
+    return rng.choice((RED, BLUE, GREEN, 0xff000000)), rng.choice((3, 5, 7, 9)), points
+
+
+def bench(directory, turns, strokes, pngEvery):
+    rng = random.Random(0)
+    width, height = 800, 600
+    game = [[madeUpStroke(rng, width, height) for _ in range(strokes)] for _ in range(turns)]
+    path = os.path.join(directory, "bench.pict")
+    start = time.perf_counter()
+    writer = RecordingWriter(path)
+    writer.setup("Alice", "Bob", "Easy")
+    writer.canvas(width, height)
+    for turn, drawn in enumerate(game):
+        writer.turn("Alice", "Bob", f"word {turn}")
+        for color, brush, points in drawn:
+            writer.stroke(color, brush, points)
+    writer.close()
+    written = time.perf_counter() - start
+    start = time.perf_counter()
+    recording = Recording(path)
+    points = sum(len(record[1].points()) for record in recording.records() if record[0] == STROKE)
+    recording.close()
+    read = time.perf_counter() - start
+    # the same game kept as pictures of the canvas
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    pngBytes = pngs = 0
+    start = time.perf_counter()
+    for drawn in game:
+        image.fill(Qt.GlobalColor.white)
+        painter = QPainter(image)
+        for i, (color, brush, values) in enumerate(drawn):
+            path = QPainterPath(QPointF(values[0], values[1]))
+            for j in range(2, len(values), 2):
+                path.lineTo(values[j], values[j + 1])
+            painter.setPen(QPen(QColor.fromRgba(color), brush, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+            painter.drawPath(path)
+            if (i + 1) % pngEvery == 0 or i == len(drawn) - 1:
+                pngPath = os.path.join(directory, "canvas.png")
+                image.save(pngPath)
+                pngBytes += os.path.getsize(pngPath)
+                pngs += 1
+        painter.end()
+    saved = time.perf_counter() - start
+    size = os.path.getsize(os.path.join(directory, "bench.pict"))
+    print(f"{turns} turns of {strokes} strokes ({points} points): .pict {size / 1024:.0f} KiB written in {written * 1000:.0f}ms "
+          f"and read in {read * 1000:.0f}ms, {pngs} pngs of the canvas {pngBytes / 1024:.0f} KiB drawn and saved in {saved * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark .pict recordings")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--strokes", type=int, default=40, help="strokes drawn in every turn")
+    parser.add_argument("--png-every", type=int, default=10, help="strokes between two pngs of the canvas")
+    args = parser.parse_args()
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        checkRoundTrip(directory)
+        bench(directory, args.turns, args.strokes, args.png_every)
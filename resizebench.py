@@ -0,0 +1,104 @@
+# Benchmark of resizing the canvas: a drawing of 10k strokes goes through the sizes of a window dragged down to half
+# its size, up to twice its size and back, the way resizes used to work (the previous image rescaled to the new
+# size), re-rendered from the stroke log at every size, and the way the window does it now (stretched at every size
+# and re-rendered once when the size settles). The time per resize, the time of the final render, the memory the
+# canvas takes and how far the last image is from the drawing rendered straight at that size are reported. Each way
+# runs in its own process so the peak memory of one does not hide the others
+#  python resizebench.py --strokes 10000 --steps 20
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QGuiApplication, QImage
+from strokes import StrokeLog
+from benchtools import peakMemory
+
+WIDTH, HEIGHT = 800, 600  # size the drawing is drawn at
+MODES = ("rescale", "rerender", "stretch")
+
+
+def drawing(strokes, rng):
+    strokeLog = StrokeLog(WIDTH, HEIGHT)
+    for _ in range(strokes):
+        x, y = rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)
+        strokeLog.beginStroke(x, y, 0xff000000 | rng.randrange(1 << 24), rng.choice((3, 5, 7, 9)))
+        for _ in range(rng.randint(2, 12)):
+            x, y = x + rng.uniform(-10, 10), y + rng.uniform(-10, 10)
+            strokeLog.addPoint(x, y)
+    return strokeLog
+
+
+def render(strokeLog, width, height):
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    strokeLog.render(image, width, height)
+    return image
+
+
+# sizes of a window dragged from the size of the drawing down to half of it, up to twice and back, steps sizes each way
+def sizes(steps):
+    scales = [1 - i / (2 * steps) for i in range(1, steps + 1)]  # down to a half
+    scales += [0.5 + 1.5 * i / steps for i in range(1, steps + 1)]  # up to twice
+    scales += [2 - i / steps for i in range(1, steps + 1)]  # back to the size it was drawn at
+    return [(round(WIDTH * scale), round(HEIGHT * scale)) for scale in scales]
+
+
+def logBytes(strokeLog):
+    return sum(len(values) * values.itemsize for values in (strokeLog.points, strokeLog.starts, strokeLog.colors, strokeLog.widths))
+
+
+# pixels of two images of the same size that are not the same
+def differing(a, b):
+    bitsA, bitsB = a.constBits(), b.constBits()
+    bitsA.setsize(a.sizeInBytes())
+    bitsB.setsize(b.sizeInBytes())
+    pixelsA, pixelsB = memoryview(bitsA).cast('I'), memoryview(bitsB).cast('I')
+    return sum(pixelsA[i] != pixelsB[i] for i in range(len(pixelsA)))
+
+
+# one way of resizing, run in a process of its own by main
+def bench(mode, strokes, steps):
+    strokeLog = drawing(strokes, random.Random(0))
+    image = render(strokeLog, WIDTH, HEIGHT)
+    times = []
+    for width, height in sizes(steps):
+        start = time.perf_counter()
+        if mode == "rerender":
+            image = render(strokeLog, width, height)
+        else:
+            image = image.scaled(width, height)  # what resizeEvent did before the stroke log, and does while dragged now
+        times.append(time.perf_counter() - start)
+    times.sort()
+    settled = ""
+    if mode == "stretch":
+        start = time.perf_counter()
+        image = render(strokeLog, width, height)  # once the window kept its size for RENDER_DELAY
+        settled = f", then one render of {(time.perf_counter() - start) * 1000:.1f}ms"
+    kept = image.sizeInBytes() + (logBytes(strokeLog) if mode != "rescale" else 0)
+    peak = peakMemory()
+    print(f"{mode:>9}: median {times[len(times) // 2] * 1000:6.1f}ms, slowest {times[-1] * 1000:6.1f}ms per resize{settled}, "
+          f"canvas {kept / 2 ** 20:.2f} MiB, peak process {peak / 2 ** 20 if peak else 0:.0f} MiB, "
+          f"{differing(image, render(strokeLog, WIDTH, HEIGHT))} pixels off after {len(times)} resizes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resizing the canvas: rescaling the image, re-rendering the stroke log or both")
+    parser.add_argument("--strokes", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=20, help="resizes on each of the three ways the window is dragged")
+    parser.add_argument("--mode", choices=MODES, help="run only one way, in this process")
+    args = parser.parse_args()
+    if args.mode:
+        app = QGuiApplication(sys.argv[:1])
+        bench(args.mode, args.strokes, args.steps)
+    else:
+        print(f"{args.strokes} strokes drawn at {WIDTH}x{HEIGHT}, resized to {WIDTH // 2}x{HEIGHT // 2}, {WIDTH * 2}x{HEIGHT * 2} "
+              f"and back in {args.steps * 3} steps")
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, "--mode", mode, "--strokes", str(args.strokes), "--steps", str(args.steps)], check=True)
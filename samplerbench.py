@@ -0,0 +1,211 @@
+# Checks and benchmark of the word packs and samplers
+# the shuffled deck is checked to draw every word once before any repeats and to put every word in every place of the
+# deck as often (chi-square test), a word list with duplicates is built into a pack to check they are dropped and
+# that building it does not keep a Python object per word, the draws of the adaptive sampler are checked against the
+# weights with a chi-square test and to draw every word once a round like the deck, the turns it saves are checked to
+# be loaded back for the same words only, made up players are given words of known difficulty to see how close the
+# words coming first in a round get to the target success compared with the deck, and the draws and turn updates per
+# second are timed on lists of up to millions of words
+#  python samplerbench.py --sizes 1000 100000 2000000 --pack-words 1000000
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from wordpacks import AdaptiveSampler, WordSampler, WordPack, loadPack
+from benchtools import peakMemory
+
+EASY_WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "easymode.txt")  # found wherever the bench is run from
+
+
+class NumberedWords:
+    '''
+    A list of made up words that are only made when they are drawn
+    '''
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return f"word{i}"
+
+
+# chance of a chi-square value at least this big, Wilson-Hilferty approximation of the distribution
+# https://en.wikipedia.org/wiki/Chi-squared_distribution#Approximations
+def chiSquarePValue(value, freedom):
+    z = ((value / freedom) ** (1 / 3) - (1 - 2 / (9 * freedom))) / math.sqrt(2 / (9 * freedom))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# every pass through the deck draws each word once, and each word is as likely to be in each place of a pass
+def checkDeck(count, passes, rng):
+    sampler = WordSampler(NumberedWords(count), rng)
+    seen = [[0] * count for _ in range(count)]  # seen[place][word]
+    for _ in range(passes):
+        drawn = [int(sampler.draw()[4:]) for _ in range(count)]
+        if len(set(drawn)) != count:
+            raise SystemExit(f"a word came back before the other {count - 1} were drawn")
+        for place, i in enumerate(drawn):
+            seen[place][i] += 1
+    # every pass is a permutation so the totals of each place and word are fixed, leaving (count - 1)^2 degrees of freedom
+    expected = passes / count
+    chiSquare = sum((n - expected) ** 2 / expected for row in seen for n in row)
+    p = chiSquarePValue(chiSquare, (count - 1) ** 2)
+    print(f"deck of {count} words: no repeats within {passes} passes, places of the words chi-square {chiSquare:.0f} "
+          f"for {(count - 1) ** 2} degrees of freedom, p = {p:.3f}")
+    if p < 0.001:
+        raise SystemExit("the deck does not put the words in every place as often")
+
+
+# a word list with every tenth word repeated in another case is built into a pack, the repeats are dropped and the
+# memory the build takes stays a few bytes per word instead of a Python object per word
+def checkPack(count, rng):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "words.txt")
+        with open(path, "w") as f:
+            for i in range(count):
+                f.write(f"word{i}" + ("\n" if i % 7 else ","))
+                if i % 10 == 0:
+                    f.write(f"WORD{rng.randrange(i + 1)},")
+        before = peakMemory()
+        start = time.perf_counter()
+        pack = WordPack(path)
+        elapsed = time.perf_counter() - start
+        after = peakMemory()
+        for i in (0, 1, count // 2, count - 1):
+            if len(pack) != count or pack[i] != f"word{i}":
+                raise SystemExit(f"the pack has {len(pack)} words instead of {count}, or not in the order of the list")
+        memory = f", peak process memory grew {(after - before) / 2 ** 20:.0f} MiB ({(after - before) / count:.0f} bytes per word)" if before else ""
+        print(f"pack of {count} words and {count // 10} repeats built in {elapsed:.2f}s{memory}")
+        pack.offsets.release()  # the map can only be closed once nothing points into it
+        pack.data.close()
+
+
+# the words are drawn as often as their weights say
+def checkDistribution(count, draws, rng):
+    sampler = AdaptiveSampler(NumberedWords(count), rng)
+    sampler.withoutRepeats = False  # every draw is independent of the ones before
+    for i in range(count):
+        turns = rng.randint(0, 20)
+        sampler.addTurns(i, turns, rng.randint(0, turns * sampler.tries))
+    weights = [sampler.tree.weight(i) for i in range(count)]
+    total = sum(weights)
+    seen = [0] * count
+    for _ in range(draws):
+        sampler.draw()
+        seen[sampler.last] += 1
+    chiSquare = sum((seen[i] - draws * weights[i] / total) ** 2 / (draws * weights[i] / total) for i in range(count))
+    p = chiSquarePValue(chiSquare, count - 1)
+    print(f"distribution of {draws} draws over {count} words: chi-square {chiSquare:.0f} for {count - 1} degrees of "
+          f"freedom, p = {p:.3f}")
+    if p < 0.001:
+        raise SystemExit("the draws do not follow the weights")
+
+
+# every round draws each word once, on made up words and on the words of the easy pack
+def checkRounds(count, rounds, rng):
+    for words in (NumberedWords(count), loadPack(EASY_WORDS)):
+        sampler = AdaptiveSampler(words, rng)
+        for _ in range(rounds):
+            drawn = set()
+            for _ in range(len(words)):
+                drawn.add(sampler.draw())
+                sampler.recordTurn(words[sampler.last], rng.randint(0, sampler.tries))
+            if len(drawn) != len(words):
+                raise SystemExit(f"only {len(drawn)} different words in {len(words)} draws")
+        print(f"{len(words)} words: every word drawn once a round in {rounds} rounds")
+
+
+def writeWords(path, words):
+    with open(path, "w") as f:
+        f.write("\n".join(words))
+
+
+# the turns saved for a word list come back when the file was only touched, not when a word in it changed
+def checkStats(rng):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "words.txt")
+        words = [f"word{i}" for i in range(50)]
+        writeWords(path, words)
+        pack = WordPack(path)
+        sampler = AdaptiveSampler(pack, rng)
+        for _ in range(40):
+            sampler.recordTurn(sampler.draw(), rng.randint(0, sampler.tries))
+        sampler.save(pack.statsPath())
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        loaded = AdaptiveSampler(WordPack(path), rng)
+        if not loaded.load(pack.statsPath()) or loaded.turns != sampler.turns or loaded.triesLeft != sampler.triesLeft:
+            raise SystemExit("the turns saved were not loaded back after the word list was touched")
+        words[7] = "another word"
+        writeWords(path, words)
+        if AdaptiveSampler(WordPack(path), rng).load(pack.statsPath()):
+            raise SystemExit("the turns saved were loaded back for a word list with a word changed")
+    print("turns saved for a word list are loaded back for the same words only")
+
+
+# players that leave each word a set share of their tries, the words coming first in a round have to get closer to the
+# target with the adaptive sampler than with the deck
+def checkTarget(count, rounds, target, rng):
+    ease = [rng.random() for _ in range(count)]  # share of the tries left on average on each word
+    rates = {}
+    for name, sampler in (("uniform", WordSampler(NumberedWords(count), rng)),
+                          ("adaptive", AdaptiveSampler(NumberedWords(count), rng, target=target))):
+        success = []
+        for roundNumber in range(rounds):
+            for n in range(count):
+                word = sampler.draw()
+                i = int(word[4:])
+                triesLeft = sum(rng.random() < ease[i] for _ in range(3))
+                if roundNumber and n < count // 4:
+                    success.append(triesLeft / 3)
+                if isinstance(sampler, AdaptiveSampler):
+                    sampler.recordTurn(word, triesLeft)
+        rates[name] = sum(success) / len(success)
+        print(f"{name:>9}: success {rates[name]:.2f} over the first quarter of the rounds after the "
+              f"first, {rounds} rounds of {count} words (target {target})")
+    if abs(rates["adaptive"] - target) >= abs(rates["uniform"] - target):
+        raise SystemExit("the adaptive sampler got no closer to the target success than the deck")
+
+
+def throughput(count, draws, rng):
+    words = NumberedWords(count)
+    start = time.perf_counter()
+    sampler = AdaptiveSampler(words, rng)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(draws):
+        sampler.recordTurn(sampler.draw(), 2)
+    adaptive = draws / (time.perf_counter() - start)
+    start = time.perf_counter()
+    deck = WordSampler(words, rng)
+    deckBuilt = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(draws):
+        deck.draw()
+    uniform = draws / (time.perf_counter() - start)
+    print(f"{count:>9} words: adaptive made in {built * 1000:.1f}ms, {adaptive:.0f} draws and turn updates/s | "
+          f"shuffled deck made in {deckBuilt * 1000:.1f}ms, {uniform:.0f} draws/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the adaptive word sampler")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 2000000], help="words in the lists timed")
+    parser.add_argument("--draws", type=int, default=100000)
+    parser.add_argument("--target", type=float, default=0.6)
+    parser.add_argument("--pack-words", type=int, default=1000000, help="words in the word list built into a pack")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    checkDeck(10, 20000, rng)
+    checkPack(args.pack_words, rng)
+    checkDistribution(500, 200000, rng)
+    checkRounds(300, 50, rng)
+    checkStats(rng)
+    checkTarget(1000, 20, args.target, rng)
+    for size in args.sizes:
+        throughput(size, args.draws, rng)
@@ -0,0 +1,130 @@
+# Relay server for playing on separate machines
+# every window connects, joins a room and everything it sends is passed on to the other windows in that room.
+# Messages are not decoded (except the HELLO that joins a room, which is passed on so the room knows who joined),
+# they are queued per client and written out together once per tick, so one process can serve hundreds of rooms.
+# Player 1's window picks the sketcher and the word of every turn and the other window follows it
+#  python server.py --port 5050
+#  python PictionaryGame.py --connect localhost:5050 --room kitchen --players Alice Bob --name Alice
+#  python PictionaryGame.py --connect localhost:5050 --room kitchen --players Alice Bob --name Bob
+
+import argparse
+import asyncio
+from netprotocol import FrameReader, HELLO, ProtocolError, decode
+
+TICK = 0.02  # seconds between two flushes of the queued messages
+MAX_BACKLOG = 1 << 20  # a client that falls this many bytes behind is disconnected
+DEFAULT_PORT = 5050
+
+
+class Client:
+    '''
+    A connected window and the messages waiting to be sent to it
+    '''
+    __slots__ = ("writer", "room", "name", "pending")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.room = None
+        self.name = ""
+        self.pending = bytearray()
+
+
+class RelayServer:
+    '''
+    Rooms of clients, relaying each client's messages to the rest of its room once per tick
+    '''
+
+    def __init__(self, tick=TICK):
+        self.tick = tick
+        self.rooms = {}  # room name -> set of clients
+        self.dirty = set()  # clients with messages waiting
+        self.relayed = 0  # messages received and passed on, for statistics
+        self.dropped = 0  # clients disconnected for sending something that is not a message
+
+    async def handleClient(self, reader, writer):
+        client = Client(writer)
+        frames = FrameReader()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for kind, payload, raw in frames.feed(data):
+                    if kind == HELLO:
+                        room, client.name = decode(kind, payload)
+                        self.join(client, room)
+                        self.broadcast(client, raw)
+                    elif client.room is not None:
+                        self.broadcast(client, raw)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ProtocolError:
+            self.dropped += 1  # a garbled stream cannot be split into frames any more, so the client is let go
+        finally:
+            self.leave(client)
+            writer.close()
+
+    def join(self, client, room):
+        self.leave(client)
+        client.room = room
+        self.rooms.setdefault(room, set()).add(client)
+
+    def leave(self, client):
+        members = self.rooms.get(client.room)
+        if members is not None:
+            members.discard(client)
+            if not members:
+                del self.rooms[client.room]
+        client.room = None
+        self.dirty.discard(client)
+
+    # queue a message for everyone in the sender's room except the sender
+    def broadcast(self, sender, raw):
+        for other in self.rooms[sender.room]:
+            if other is not sender:
+                other.pending += raw
+                self.dirty.add(other)
+        self.relayed += 1
+
+    # write out everything queued, one write per client
+    def flush(self):
+        dirty, self.dirty = self.dirty, set()
+        for client in dirty:
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_BACKLOG:
+                client.writer.close()  # the client cannot keep up, its reader will clean it up
+                continue
+            client.writer.write(bytes(client.pending))
+            client.pending.clear()
+
+    async def flushLoop(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.flush()
+
+    # start listening, returns the asyncio server, documentation: https://docs.python.org/3/library/asyncio-stream.html
+    async def start(self, host, port):
+        server = await asyncio.start_server(self.handleClient, host, port)
+        self.flushTask = asyncio.ensure_future(self.flushLoop())
+        return server
+
+
+async def main(host, port):
+    relay = RelayServer()
+    server = await relay.start(host, port)
+    print(f"Pictionary server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pictionary relay server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,84 @@
+# Plays complete Pictionary games without a window using the rules in gameengine.py
+# used to check how balanced the scoring is and to catch regressions in the rules
+#  python simulate.py --games 100000 --workers 8 --skill1 0.6 --skill2 0.4
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from gameengine import GameState
+from wordpacks import loadPack, WordSampler
+
+
+# play one game of the given number of rounds, skill is the chance each guess of that player is right
+def playGame(words, rounds, skill1, skill2, rng):
+    game = GameState(rng)
+    game.newGame("Player 1", "Player 2", "Easy", WordSampler(words, rng))
+    for _ in range(rounds):
+        word = game.startNewTurn()
+        guesser = game.currentGuesser
+        skill = skill1 if guesser == game.player1Name else skill2
+        correct = False
+        while not game.isTurnOver(correct):
+            guess = word if rng.random() < skill else rng.choice(words)
+            correct = game.checkAnswer(guess, guesser)
+        game.endTurn()
+    return game.player1_score, game.player2_score
+
+
+# play a batch of games in one process and return the totals, so only one small result goes back per batch
+def playBatch(seed, games, words, rounds, skill1, skill2):
+    rng = random.Random(seed)
+    wins1 = wins2 = draws = total1 = total2 = 0
+    for _ in range(games):
+        score1, score2 = playGame(words, rounds, skill1, skill2, rng)
+        total1 += score1
+        total2 += score2
+        if score1 > score2:
+            wins1 += 1
+        elif score2 > score1:
+            wins2 += 1
+        else:
+            draws += 1
+    return wins1, wins2, draws, total1, total2
+
+
+# spread the games over a pool of processes, one per core by default
+def tournament(words, games, rounds=10, skill1=0.5, skill2=0.5, workers=None, batchSize=1000, seed=0):
+    workers = workers or os.cpu_count()
+    batches = [min(batchSize, games - start) for start in range(0, games, batchSize)]
+    totals = [0, 0, 0, 0, 0]
+    with ProcessPoolExecutor(max_workers=workers) as pool:  # documentation: https://docs.python.org/3/library/concurrent.futures.html
+        futures = [pool.submit(playBatch, seed + i, size, words, rounds, skill1, skill2) for i, size in enumerate(batches)]
+        for future in futures:
+            for i, value in enumerate(future.result()):
+                totals[i] += value
+    wins1, wins2, draws, total1, total2 = totals
+    return {
+        "games": games,
+        "player1_wins": wins1,
+        "player2_wins": wins2,
+        "draws": draws,
+        "player1_average": total1 / games if games else 0,
+        "player2_average": total2 / games if games else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless Pictionary games")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=10, help="turns played in each game")
+    parser.add_argument("--skill1", type=float, default=0.5, help="chance a guess of player 1 is right")
+    parser.add_argument("--skill2", type=float, default=0.5, help="chance a guess of player 2 is right")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use, defaults to the number of cores")
+    parser.add_argument("--words", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "easymode.txt"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = tournament(list(loadPack(args.words)), args.games, args.rounds, args.skill1, args.skill2, args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    print(f"{args.games / elapsed:.0f} games per second ({elapsed:.2f}s)")
@@ -0,0 +1,72 @@
+# Plays many rounds through the real game window without a display to check that the turn flow does not leak
+# memory or grow the call stack from one round to the next
+#  python soak.py --rounds 10000
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtWidgets import QApplication, QDialog
+from PictionaryGame import PictionaryGame
+
+
+def soak(rounds, report):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    # record how deep the call stack is every time a turn starts, only the last, smallest and biggest so the
+    # measurement itself does not grow
+    depths = {"last": 0, "min": sys.maxsize, "max": 0}
+    showWordPopup = window.showWordPopup
+
+    def measuredShowWordPopup(player):
+        depth = stackDepth()
+        depths["last"] = depth
+        depths["min"] = min(depths["min"], depth)
+        depths["max"] = max(depths["max"], depth)
+        showWordPopup(player)
+    window.showWordPopup = measuredShowWordPopup
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    baseline = None
+    for round in range(1, rounds + 1):
+        # the sketcher closes the word, finishes drawing, the guesser gets it wrong once and then right
+        window.wordDialog.accept()
+        window.answer()
+        window.answerInput.setText("not the word")
+        window.submitAnswer()
+        window.answerInput.setText(window.game.currentWord)
+        window.submitAnswer()
+        window.resultDialog.accept()  # starts the next turn
+        app.processEvents()
+        if round == min(100, rounds):
+            baseline = tracemalloc.get_traced_memory()[0]  # measured after the first rounds have warmed up the caches
+        if round % report == 0 or round == rounds:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"round {round}: traced memory {current / 1024:.0f} KiB (peak {peak / 1024:.0f} KiB), "
+                  f"stack depth {depths['last']}, dialogs {len(window.findChildren(QDialog))}, "
+                  f"{round / (time.perf_counter() - start):.0f} rounds/s")
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"stack depth min {depths['min']} max {depths['max']}, memory change since round 100: {(current - baseline) / 1024:.0f} KiB")
+
+
+def stackDepth():
+    depth = 0
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak test the turn flow of the game window")
+    parser.add_argument("--rounds", type=int, default=10000)
+    parser.add_argument("--report", type=int, default=1000, help="print the statistics every this many rounds")
+    args = parser.parse_args()
+    soak(args.rounds, args.report)
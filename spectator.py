@@ -0,0 +1,249 @@
+# Spectator stream of the canvas for projecting and recording games
+# the canvas is cut into tiles, the tiles under what the window repainted are hashed and only the ones whose hash
+# changed are compressed and sent, so the bytes and the time spent follow how much of the drawing changed and not the
+# size of the canvas. A subscriber that joins, or falls too far behind, is sent every tile that is not white once
+# (a key frame) and then the changes. Any number of sinks can subscribe: a file, or spectators connected to a port
+#  python PictionaryGame.py --spectator-port 7000 --spectator-file game.spec
+#
+# a stream is a sequence of frames in the netprotocol.py layout (varint length, type byte, payload):
+#  CANVAS  width, height and tile size in pixels, the canvas is white
+#  TILE    x, y, width, height of a tile in pixels, then its pixels zlib compressed (ARGB32 premultiplied rows)
+#  FRAME   time in microseconds, the tiles before it make up one picture
+
+import time
+import zlib
+from PyQt6.QtCore import QObject, QRect
+from PyQt6.QtGui import QImage
+from PyQt6.QtNetwork import QHostAddress, QTcpServer
+from netprotocol import frame
+from recording import writeVarint, readVarint
+from instrumentation import log, stats
+
+CANVAS = 1
+TILE = 2
+FRAME = 3
+
+TILE_SIZE = 64
+COMPRESSION = 1  # zlib level, the fastest still shrinks a mostly white tile about a hundred times
+MAX_BACKLOG = 8 * 1024 * 1024  # bytes a subscriber may have waiting before it is skipped until it catches up
+FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+def canvasFrame(width, height, tileSize):
+    payload = bytearray()
+    for value in (width, height, tileSize):
+        writeVarint(payload, value)
+    return frame(CANVAS, payload)
+
+
+def tileFrame(rect, pixels):
+    payload = bytearray()
+    for value in (rect.x(), rect.y(), rect.width(), rect.height()):
+        writeVarint(payload, value)
+    payload += zlib.compress(pixels, COMPRESSION)
+    return frame(TILE, payload)
+
+
+def endFrame():
+    payload = bytearray()
+    writeVarint(payload, time.time_ns() // 1000)
+    return frame(FRAME, payload)
+
+
+# raw pixels of a part of an image, the copy has no padding at the end of its rows
+def tilePixels(image, rect):
+    tile = image.copy(rect)  # documentation: https://doc.qt.io/qt-6/qimage.html#copy
+    bits = tile.constBits()
+    bits.setsize(tile.sizeInBytes())
+    return bytes(bits)
+
+
+class SpectatorStream:
+    '''
+    Hashes of the canvas tiles and the sinks the changed tiles are sent to
+    '''
+
+    def __init__(self, tileSize=TILE_SIZE):
+        self.tileSize = tileSize
+        self.size = None  # size of the canvas in pixels, a new size starts the stream again
+        self.hashes = {}  # (tx, ty) -> crc32 of the tile's pixels as last sent, tiles not in it are white
+        self.tiles = {}  # (tx, ty) -> TILE frame of every tile that is not white, sent again in key frames
+        self.whiteHashes = {}  # (width, height) -> crc32 of a white tile of that size
+        self.sinks = []
+        self.behind = set()  # sinks that need a key frame before any more changes
+        self.bytesSent = 0
+        self.tilesSent = 0
+
+    # a sink has write(data) and backlog() (bytes written but not yet delivered)
+    def subscribe(self, sink):
+        self.sinks.append(sink)
+        self.behind.add(sink)
+
+    def unsubscribe(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+        self.behind.discard(sink)
+
+    def whiteHash(self, width, height):
+        key = (width, height)
+        value = self.whiteHashes.get(key)
+        if value is None:
+            value = self.whiteHashes[key] = zlib.crc32(b"\xff" * (width * height * 4))
+        return value
+
+    # look at the tiles under rect (in the image's pixels) and send the ones that changed, returns the bytes of changes
+    def publish(self, image, rect):
+        start = time.perf_counter()
+        size = (image.width(), image.height())
+        if size != self.size:
+            # everyone starts again from a white canvas of the new size
+            self.size = size
+            self.hashes.clear()
+            self.tiles.clear()
+            self.behind.update(self.sinks)
+            rect = QRect(0, 0, *size)
+        rect = rect.intersected(QRect(0, 0, *size))
+        changes = bytearray()
+        if not rect.isEmpty():
+            t = self.tileSize
+            for ty in range(rect.top() // t, rect.bottom() // t + 1):
+                for tx in range(rect.left() // t, rect.right() // t + 1):
+                    tileRect = QRect(tx * t, ty * t, min(t, size[0] - tx * t), min(t, size[1] - ty * t))
+                    pixels = tilePixels(image, tileRect)
+                    hashed = zlib.crc32(pixels)
+                    key = (tx, ty)
+                    white = self.whiteHash(tileRect.width(), tileRect.height())
+                    if hashed == self.hashes.get(key, white):
+                        continue
+                    data = tileFrame(tileRect, pixels)
+                    changes += data
+                    self.tilesSent += 1
+                    if hashed == white:
+                        del self.hashes[key]
+                        self.tiles.pop(key, None)
+                    else:
+                        self.hashes[key] = hashed
+                        self.tiles[key] = data
+        if changes:
+            changes += endFrame()
+        for sink in self.sinks:
+            if sink.backlog() > MAX_BACKLOG:
+                self.behind.add(sink)  # too slow, it gets a key frame once it has caught up
+            elif sink in self.behind:
+                self.behind.discard(sink)
+                self.send(sink, self.keyFrame())
+            elif changes:
+                self.send(sink, changes)
+        stats.timeSince("spectator_publish", start)
+        return len(changes)
+
+    # the whole canvas: its size and every tile that is not white
+    def keyFrame(self):
+        data = bytearray(canvasFrame(self.size[0], self.size[1], self.tileSize))
+        for tile in self.tiles.values():
+            data += tile
+        data += endFrame()
+        return data
+
+    def send(self, sink, data):
+        sink.write(bytes(data))
+        self.bytesSent += len(data)
+        stats.count("spectator_bytes", len(data))
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        self.behind.clear()
+
+
+class FileSink:
+    '''
+    Writes the stream to a file, to be played back later
+    '''
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def write(self, data):
+        self.file.write(data)
+
+    def backlog(self):
+        return 0
+
+    def close(self):
+        self.file.close()
+
+
+class SocketSink:
+    '''
+    Writes the stream to one connected spectator
+    '''
+
+    def __init__(self, socket):
+        self.socket = socket
+
+    def write(self, data):
+        self.socket.write(data)
+
+    def backlog(self):
+        return self.socket.bytesToWrite()  # documentation: https://doc.qt.io/qt-6/qabstractsocket.html#bytesToWrite
+
+    def close(self):
+        self.socket.disconnectFromHost()
+
+
+class SpectatorServer(QObject):
+    '''
+    Listens on a port and subscribes every spectator that connects to the stream
+    '''
+
+    def __init__(self, stream, port, parent=None):
+        super().__init__(parent)
+        self.stream = stream
+        self.server = QTcpServer(self)  # documentation: https://doc.qt.io/qt-6/qtcpserver.html
+        self.server.newConnection.connect(self.accept)
+        if not self.server.listen(QHostAddress.SpecialAddress.Any, port):
+            raise OSError(self.server.errorString())
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            sink = SocketSink(socket)
+            self.stream.subscribe(sink)
+            socket.disconnected.connect(lambda sink=sink: self.stream.unsubscribe(sink))
+            log.info("spectator_joined", address=socket.peerAddress().toString())
+
+    def close(self):
+        self.server.close()
+
+
+# draw a stream (bytes of whole frames) on an image, starting again on a CANVAS frame, returns the image
+def applyStream(data, image=None):
+    position = 0
+    while position < len(data):
+        length, position = readVarint(data, position)
+        kind = data[position]
+        payload = memoryview(data)[position + 1:position + length]
+        position += length
+        if kind == CANVAS:
+            width, offset = readVarint(payload, 0)
+            height, offset = readVarint(payload, offset)
+            image = QImage(width, height, FORMAT)
+            image.fill(0xffffffff)
+        elif kind == TILE:
+            values = []
+            offset = 0
+            for _ in range(4):
+                value, offset = readVarint(payload, offset)
+                values.append(value)
+            x, y, width, height = values
+            bits = image.bits()
+            bits.setsize(image.sizeInBytes())
+            pixels = memoryview(bits)
+            tile = zlib.decompress(payload[offset:])
+            line = image.bytesPerLine()
+            for row in range(height):
+                start = (y + row) * line + x * 4
+                pixels[start:start + width * 4] = tile[row * width * 4:(row + 1) * width * 4]
+    return image
@@ -0,0 +1,95 @@
+# Benchmark of the spectator stream during continuous drawing: a pen keeps drawing a wandering line at a steady
+# speed, every frame the tiles under the new part of the line are published, and the bytes per second and the time
+# spent on each frame are compared with compressing the whole canvas every frame. The stream is decoded at the end
+# and checked against the canvas
+#  python spectatorbench.py --sizes 1280x720 1920x1080 3840x2160 --frames 600
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import zlib
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QGuiApplication, QImage, QPainter, QPen
+from spectator import SpectatorStream, COMPRESSION, applyStream
+
+
+class MemorySink:
+    '''
+    Keeps everything written to it
+    '''
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    def backlog(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+def bench(width, height, frames, fps, speed):
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.white)
+    stream = SpectatorStream()
+    sink = MemorySink()
+    stream.subscribe(sink)
+    stream.publish(image, image.rect())
+    keyBytes = len(sink.data)
+    pen = QPen(Qt.GlobalColor.black, 5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+    rng = random.Random(1)
+    point = QPointF(width / 2, height / 2)
+    angle = 0.0
+    step = speed / fps  # pixels the pen moves every frame
+    times = []
+    for i in range(frames):
+        angle += rng.uniform(-0.4, 0.4)
+        end = QPointF(min(max(point.x() + step * math.cos(angle), 0), width - 1), min(max(point.y() + step * math.sin(angle), 0), height - 1))
+        if end.x() in (0, width - 1) or end.y() in (0, height - 1):
+            angle += math.pi  # turn around at the edges
+        painter = QPainter(image)
+        painter.setPen(pen)
+        painter.drawLine(point, end)
+        painter.end()
+        damage = QRectF(point, end).normalized().adjusted(-5, -5, 5, 5).toAlignedRect()
+        point = end
+        start = time.perf_counter()
+        stream.publish(image, damage)
+        times.append(time.perf_counter() - start)
+    streamBytes = len(sink.data) - keyBytes
+    # the alternative: the whole canvas compressed every frame
+    start = time.perf_counter()
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    fullBytes = len(zlib.compress(bytes(bits), COMPRESSION))
+    fullTime = time.perf_counter() - start
+    seconds = frames / fps
+    times.sort()
+    print(f"{width}x{height}: {stream.tilesSent / frames:.1f} tiles/frame, {streamBytes / seconds / 1024:.1f} KiB/s, "
+          f"publish median {times[len(times) // 2] * 1000:.3f}ms p99 {times[int(len(times) * 0.99)] * 1000:.3f}ms | "
+          f"whole canvas every frame: {fullBytes * fps / 1024:.0f} KiB/s, {fullTime * 1000:.1f}ms per frame")
+    decoded = applyStream(bytes(sink.data))
+    if decoded != image:
+        raise SystemExit("the decoded stream does not match the canvas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the spectator stream")
+    parser.add_argument("--sizes", nargs="+", default=["1280x720", "1920x1080", "3840x2160"], help="canvas sizes")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--fps", type=int, default=30, help="pictures of the stream per second")
+    parser.add_argument("--speed", type=float, default=600, help="pixels per second the pen moves")
+    args = parser.parse_args()
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    for size in args.sizes:
+        width, height = (int(n) for n in size.lower().split("x"))
+        bench(width, height, args.frames, args.fps, args.speed)
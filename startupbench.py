@@ -0,0 +1,42 @@
+# Benchmark of a cold start of the game: the game is started several times with --profile-startup, which prints how
+# long each phase took up to the first paint of the window and quits, and the median of every phase is reported
+# along with the time the whole process took, interpreter start and exit included
+#  python startupbench.py --runs 10
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+GAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PictionaryGame.py")
+
+
+def run():
+    environment = dict(os.environ)
+    environment.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, GAME, "--profile-startup", "--players", "Alice", "Bob", "--difficulty", "Easy"],
+                            env=environment, capture_output=True, text=True, check=True).stdout
+    elapsed = time.perf_counter() - start
+    phases = []
+    for line in output.splitlines():
+        name, _, value = line.rpartition(":")
+        if value.strip().endswith("ms"):
+            phases.append((name.strip(), float(value.strip()[:-2])))
+    return phases, elapsed * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark starting the game up to its first paint")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run()  # the first start also fills the disk cache and writes the .pyc files, it is not counted
+    times = {}  # phase -> milliseconds of every run, in the order the phases ended
+    for _ in range(args.runs):
+        phases, process = run()
+        for name, milliseconds in phases + [("whole process", process)]:
+            times.setdefault(name, []).append(milliseconds)
+    for name, values in times.items():
+        print(f"{name:>24}: median {statistics.median(values):7.1f}ms  min {min(values):7.1f}ms  max {max(values):7.1f}ms")
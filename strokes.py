@@ -0,0 +1,147 @@
+# Vector record of everything drawn on the canvas, kept next to the raster image in PictionaryGame
+# the points live in flat arrays instead of lists of QPoint so thousands of strokes stay small in memory
+#  https://docs.python.org/3/library/array.html
+
+from array import array
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt6.QtCore import Qt, QPointF
+
+
+# a bucket fill is kept in the log as a stroke of one point whose negative width holds the fill tolerance
+def fillWidth(tolerance):
+    return -1.0 - tolerance
+
+
+def fillTolerance(width):
+    return round(-1 - width)
+
+
+class StrokeLog:
+    '''
+    Compact array-backed log of brush strokes (points, colour and width per stroke)
+    '''
+
+    def __init__(self, width=0, height=0):
+        # size of the canvas the points are stored against, everything is scaled from this size when rendering
+        self.width = width
+        self.height = height
+        self.points = array('f')  # flat x, y pairs of every stroke one after the other
+        self.starts = array('I')  # index of the first point of each stroke (in points, not floats)
+        self.colors = array('I')  # argb colour of each stroke
+        self.widths = array('f')  # pen width of each stroke
+        self.removals = 0  # counts strokes taken out, so readers that only look at new strokes know to start again
+
+    def __len__(self):
+        return len(self.starts)
+
+    def pointCount(self):
+        return len(self.points) // 2
+
+    # forget every stroke and store the following ones against a new canvas size
+    def clear(self, width, height):
+        self.width = width
+        self.height = height
+        self.points = array('f')
+        self.starts = array('I')
+        self.colors = array('I')
+        self.widths = array('f')
+        self.removals += 1
+
+    # a log with the same strokes that does not change with this one
+    def copy(self):
+        log = StrokeLog(self.width, self.height)
+        log.points = array('f', self.points)
+        log.starts = array('I', self.starts)
+        log.colors = array('I', self.colors)
+        log.widths = array('f', self.widths)
+        return log
+
+    # start a new stroke at the given point
+    def beginStroke(self, x, y, color, width):
+        self.starts.append(self.pointCount())
+        self.colors.append(QColor(color).rgba())  # documentation: https://doc.qt.io/qt-6/qcolor.html#rgba
+        self.widths.append(width)
+        self.points.extend((x, y))
+
+    # bucket fill of the area around the given point
+    def addFill(self, x, y, color, tolerance):
+        self.beginStroke(x, y, color, fillWidth(tolerance))
+
+    def isFill(self, i):
+        return self.widths[i] < 0
+
+    # add a point to the stroke currently being drawn
+    def addPoint(self, x, y):
+        self.points.extend((x, y))
+
+    # close the current stroke, a press without any movement draws nothing so it is dropped, returns False if it was dropped
+    def endStroke(self):
+        if len(self) and self.pointCount() - self.starts[-1] < 2:
+            self.popStroke()
+            return False
+        return True
+
+    # remove the last stroke and return it so it can be pushed back later
+    def popStroke(self):
+        start = self.starts.pop()
+        stroke = (self.colors.pop(), self.widths.pop(), self.points[start * 2:])
+        del self.points[start * 2:]
+        self.removals += 1
+        return stroke
+
+    # put back a stroke returned by popStroke
+    def pushStroke(self, stroke):
+        color, width, points = stroke
+        self.starts.append(self.pointCount())
+        self.colors.append(color)
+        self.widths.append(width)
+        self.points.extend(points)
+
+    # return the colour, width and flat x, y points of stroke i
+    def stroke(self, i):
+        start = self.starts[i] * 2
+        end = self.starts[i + 1] * 2 if i + 1 < len(self) else len(self.points)
+        return self.colors[i], self.widths[i], memoryview(self.points)[start:end]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.stroke(i)
+
+    # draw every stroke onto an image of the given size, used to re-render the canvas and to replay a drawing
+    def render(self, device, width, height):
+        if not len(self) or not self.width or not self.height:
+            return
+        painter = None
+        for i in range(len(self)):
+            if self.isFill(i):
+                # the fill works on the pixels drawn so far, so the painter has to finish first
+                if painter is not None:
+                    painter.end()
+                    painter = None
+                self.renderFill(device, width, height, i)
+                continue
+            if painter is None:
+                painter = QPainter(device)
+                painter.scale(width / self.width, height / self.height)  # documentation: https://doc.qt.io/qt-6/qpainter.html#scale
+            self.renderStroke(painter, i)
+        if painter is not None:
+            painter.end()
+
+    # redo bucket fill i on an image of the given size
+    def renderFill(self, image, width, height, i):
+        try:
+            from floodfill import floodFill  # imported on the first fill, numpy is slow to import
+        except ImportError:  # numpy is not installed, bucket fills in the log are not drawn
+            return
+        color, encodedWidth, points = self.stroke(i)
+        ratio = image.devicePixelRatio()
+        x = int(points[0] * width / self.width * ratio)
+        y = int(points[1] * height / self.height * ratio)
+        floodFill(image, x, y, QColor.fromRgba(color), fillTolerance(encodedWidth))
+
+    # draw stroke i with an already set up painter
+    def renderStroke(self, painter, i):
+        color, width, points = self.stroke(i)
+        painter.setPen(QPen(QColor.fromRgba(color), width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+        polyline = QPolygonF([QPointF(points[j], points[j + 1]) for j in range(0, len(points), 2)])  # documentation: https://doc.qt.io/qt-6/qpolygonf.html
+        painter.drawPolyline(polyline)
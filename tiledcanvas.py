@@ -0,0 +1,159 @@
+# Canvas much bigger than the window for workshop mode
+# the canvas is cut into square tiles that only exist once something is drawn on them. A limited number of tiles
+# are kept in memory as QImages, the least recently used ones are written to a memory mapped page file and read
+# back when they come into view again, so the memory used depends on the size of the window and not of the canvas
+#  https://docs.python.org/3/library/mmap.html
+
+import mmap
+import tempfile
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QRect, QRectF
+from PyQt6.QtGui import QImage, QPainter
+
+TILE_SIZE = 256
+TILE_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+class TiledCanvas:
+    '''
+    Lazily allocated tiles of a large canvas, paged out to a memory mapped file when they are not in use
+    '''
+
+    def __init__(self, width, height, tileSize=TILE_SIZE, maxResident=64, path=None):
+        self.width = width
+        self.height = height
+        self.tileSize = tileSize
+        self.tileBytes = tileSize * tileSize * 4
+        self.maxResident = maxResident  # the most tiles kept as images
+        self.resident = OrderedDict()  # (tx, ty) -> QImage, least recently used first
+        self.dirty = set()  # resident tiles changed since they were last written to the page file
+        self.slots = {}  # (tx, ty) -> place in the page file, a tile keeps its place once it has one
+        # the page file is deleted when it is closed unless a path is given
+        self.file = open(path, "w+b") if path else tempfile.TemporaryFile()
+        self.map = None
+        self.capacity = 0  # tiles the page file has room for
+        self.pagedIn = 0
+        self.pagedOut = 0
+
+    # keys of the tiles under a rect of the canvas
+    def tilesIn(self, rect):
+        rect = rect.intersected(QRect(0, 0, self.width, self.height))
+        if rect.isEmpty():
+            return
+        t = self.tileSize
+        for ty in range(rect.top() // t, rect.bottom() // t + 1):
+            for tx in range(rect.left() // t, rect.right() // t + 1):
+                yield tx, ty
+
+    # True if something was drawn on the tile
+    def hasTile(self, key):
+        return key in self.resident or key in self.slots
+
+    # the image of a tile, read back from the page file or made white if it never existed
+    def tile(self, key):
+        image = self.resident.get(key)
+        if image is not None:
+            self.resident.move_to_end(key)  # documentation: https://docs.python.org/3/library/collections.html#collections.OrderedDict.move_to_end
+            return image
+        image = QImage(self.tileSize, self.tileSize, TILE_FORMAT)
+        slot = self.slots.get(key)
+        if slot is None:
+            image.fill(Qt.GlobalColor.white)
+        else:
+            bits = image.bits()
+            bits.setsize(self.tileBytes)
+            offset = slot * self.tileBytes
+            with memoryview(self.map) as view:
+                memoryview(bits)[:] = view[offset:offset + self.tileBytes]
+            self.release(offset)
+            self.pagedIn += 1
+        self.resident[key] = image
+        self.evict()
+        return image
+
+    # write the least recently used tiles to the page file until few enough are left
+    def evict(self):
+        while len(self.resident) > self.maxResident:
+            key, image = self.resident.popitem(last=False)
+            if key in self.dirty:
+                self.dirty.discard(key)
+                self.writeTile(key, image)
+
+    def writeTile(self, key, image):
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.slots)
+            self.grow(slot + 1)
+        bits = image.constBits()
+        bits.setsize(self.tileBytes)
+        offset = slot * self.tileBytes
+        self.map[offset:offset + self.tileBytes] = memoryview(bits)
+        self.release(offset)
+        self.pagedOut += 1
+
+    # unmap the pages of a tile from this process, the tile stays in the file (and the system's file cache) so the
+    # mapped file does not add to the memory of the game, documentation: https://docs.python.org/3/library/mmap.html#mmap.mmap.madvise
+    def release(self, offset):
+        if hasattr(mmap, "MADV_DONTNEED") and offset % mmap.PAGESIZE == 0:
+            self.map.madvise(mmap.MADV_DONTNEED, offset, self.tileBytes)
+
+    # make the page file big enough for the given number of tiles, it doubles so it is not mapped again too often
+    def grow(self, tiles):
+        if tiles <= self.capacity:
+            return
+        self.capacity = max(tiles, self.capacity * 2, 16)
+        if self.map is not None:
+            self.map.close()
+        self.file.truncate(self.capacity * self.tileBytes)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity * self.tileBytes)
+
+    def setMaxResident(self, count):
+        self.maxResident = max(count, 1)
+        self.evict()
+
+    # draw a path in canvas coordinates on every tile it crosses, returns the rect of the canvas that changed
+    def drawPath(self, path, pen):
+        pad = pen.widthF()
+        rect = path.boundingRect().adjusted(-pad, -pad, pad, pad).toAlignedRect()
+        t = self.tileSize
+        for key in self.tilesIn(rect):
+            painter = QPainter(self.tile(key))
+            painter.translate(-key[0] * t, -key[1] * t)
+            painter.setPen(pen)
+            painter.drawPath(path)
+            painter.end()
+            self.dirty.add(key)
+        return rect
+
+    # draw the tiles under a rect of the canvas with a painter already mapping canvas coordinates to the window,
+    # tiles that were never drawn on are just white
+    def render(self, painter, rect):
+        t = self.tileSize
+        painter.save()
+        painter.setClipRect(QRect(0, 0, self.width, self.height), Qt.ClipOperation.IntersectClip)  # the edge tiles reach past the canvas
+        for key in self.tilesIn(rect):
+            tileRect = QRectF(key[0] * t, key[1] * t, t, t)
+            if self.hasTile(key):
+                painter.drawImage(tileRect, self.tile(key))
+            else:
+                painter.fillRect(tileRect, Qt.GlobalColor.white)
+        painter.restore()
+
+    # forget everything drawn, the page file keeps its size to be reused
+    def clear(self):
+        self.resident.clear()
+        self.dirty.clear()
+        self.slots.clear()
+
+    def residentBytes(self):
+        return len(self.resident) * self.tileBytes
+
+    def pageFileBytes(self):
+        return self.capacity * self.tileBytes
+
+    def close(self):
+        self.resident.clear()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
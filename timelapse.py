@@ -0,0 +1,279 @@
+# Timelapse of a drawing, exported as an animated GIF or a numbered PNG sequence
+# the strokes are replayed onto one image that is reused for every frame: a generator draws the next few points,
+# hands out the image and carries on when asked for the next frame, so frames are encoded and written as they come
+# and the memory used does not grow with the length of the round. Encoding can be spread over a pool of threads,
+# with only a few frames in flight at a time
+#  python timelapse.py game.pict --turn 1 --out turn1.gif --points 25 --scale 0.5
+#
+# Qt has no GIF writer so GIFs are written here. Every pixel is sent as its own LZW code, with a clear code often
+# enough that the codes stay 9 bits, which only takes a few numpy operations per frame. Only the part of a frame
+# that changed since the one before is stored, so a timelapse stays small even though the codes are not compressed
+#  https://www.w3.org/Graphics/GIF/spec-gif89a.txt
+
+import argparse
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QGuiApplication, QColor, QImage, QPainter, QPen, QPolygonF
+from strokes import StrokeLog, fillWidth
+from recording import Recording, STROKE
+try:
+    import numpy as np
+except ImportError:  # numpy is not installed, only PNG sequences can be written
+    np = None
+
+FRAME_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+POINTS_PER_FRAME = 25  # points of the strokes drawn between two frames, the speed of the timelapse
+FRAME_DELAY = 4  # hundredths of a second each frame of a GIF is shown
+LAST_FRAME_DELAY = 300  # the finished drawing stays a little longer before the GIF starts again
+CLEAR_EVERY = 254  # pixels between two LZW clear codes, so the code table never grows to 10 bit codes
+
+
+# yield the image after every pointsPerFrame points of the strokes of log, drawn at the given size. It is always the
+# same image, the caller has to be done with it before asking for the next frame
+def frames(log, width, height, pointsPerFrame=POINTS_PER_FRAME):
+    image = QImage(width, height, FRAME_FORMAT)
+    image.fill(Qt.GlobalColor.white)
+    yield image  # the empty canvas
+    if not len(log) or not log.width or not log.height:
+        return
+    budget = pointsPerFrame  # points left to draw before the next frame
+    for i in range(len(log)):
+        if log.isFill(i):
+            log.renderFill(image, width, height, i)
+            budget -= 1
+            if budget <= 0:
+                yield image
+                budget = pointsPerFrame
+            continue
+        color, penWidth, points = log.stroke(i)
+        pen = QPen(QColor.fromRgba(color), penWidth, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+        count = len(points) // 2
+        drawn = 0  # points of the stroke already drawn
+        while drawn < count:
+            end = min(count, drawn + budget)
+            # the new part starts at the last point drawn so the line stays joined
+            first = max(drawn - 1, 0)
+            painter = QPainter(image)
+            painter.scale(width / log.width, height / log.height)  # documentation: https://doc.qt.io/qt-6/qpainter.html#scale
+            painter.setPen(pen)
+            painter.drawPolyline(QPolygonF([QPointF(points[j * 2], points[j * 2 + 1]) for j in range(first, end)]))
+            painter.end()  # the image is handed out next, it cannot be read while a painter is active on it
+            budget -= end - drawn
+            drawn = end
+            if budget <= 0:
+                yield image
+                budget = pointsPerFrame
+    if budget < pointsPerFrame:
+        yield image  # the last few points
+
+
+# stroke log of the drawing of one turn of a recording (turns are counted from 1), returns (word, log) or None
+def turnLog(path, turn):
+    recording = Recording(path)
+    found = None
+    drawings = recording.turnDrawings()
+    for number, (word, width, height, records) in enumerate(drawings, 1):
+        if number == turn:
+            log = StrokeLog(width, height)
+            for record in records:
+                if record[0] == STROKE:
+                    log.pushStroke((record[1].color, record[1].width, [value for point in record[1].points() for value in point]))
+                else:
+                    _, color, tolerance, x, y = record
+                    log.pushStroke((color, fillWidth(tolerance), (x, y)))
+            found = (word, log)
+            break
+    # stroke records point into the mapped file, which cannot be closed while they are alive, and the generator still
+    # holds the ones of the turn it stopped at
+    drawings.close()
+    drawings = records = record = None
+    recording.close()
+    return found
+
+
+# run encode on every item and hand the results to write in order. With workers the encoding runs on a pool of
+# threads: each item is copied first as it may change once the next one is asked for, and at most twice as many
+# items as workers are in flight so the memory used stays the same however many items there are
+def encodeInOrder(items, copy, encode, write, workers=0):
+    if workers <= 1:
+        for item in items:
+            write(encode(item))
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:  # documentation: https://docs.python.org/3/library/concurrent.futures.html
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(encode, copy(item)))
+            if len(pending) >= workers * 2:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+
+
+def savePng(item):
+    path, image = item
+    if not image.save(path, "PNG"):  # documentation: https://doc.qt.io/qt-6/qimage.html#save
+        raise OSError(f"could not write {path}")
+    return path
+
+
+# write the frames to pattern % number for numbers from 1, e.g. "timelapse%04d.png", returns the number of frames
+def writePngSequence(images, pattern, workers=0):
+    written = []
+    numbered = ((pattern % number, image) for number, image in enumerate(images, 1))
+    encodeInOrder(numbered, lambda item: (item[0], item[1].copy()), savePng, lambda path: written.append(None), workers)
+    return len(written)
+
+
+# palette of the GIF: the 6x6x6 colour cube, which has black, white and every brush colour in it
+def gifPalette():
+    levels = [round(i * 255 / 5) for i in range(6)]
+    palette = bytes(value for r in levels for g in levels for b in levels for value in (r, g, b))
+    return palette + bytes(768 - len(palette))  # padded to 256 colours
+
+
+# colour cube index of every pixel of an image, as a (height, width) array
+def paletteIndices(image):
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    pixels = np.frombuffer(bits, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())[:, :image.width() * 4]
+    pixels = pixels.reshape(image.height(), image.width(), 4)  # b, g, r, a on little endian machines
+    level = ((np.arange(256) * 5 + 127) // 255).astype(np.uint8)  # nearest of the 6 levels of each channel value
+    return level[pixels[:, :, 2]] * 36 + level[pixels[:, :, 1]] * 6 + level[pixels[:, :, 0]]
+
+
+# the LZW data of a GIF image where every pixel is a literal code, in sub-blocks of up to 255 bytes after their length
+def lzwLiterals(indices):
+    indices = indices.ravel()
+    count = len(indices)
+    clears = (count + CLEAR_EVERY - 1) // CLEAR_EVERY
+    codes = np.full(count + clears + 1, 256, dtype=np.uint16)  # 256 clears the code table
+    position = np.arange(count)
+    codes[position + position // CLEAR_EVERY + 1] = indices
+    codes[-1] = 257  # end of the data
+    bits = ((codes[:, None] >> np.arange(9, dtype=np.uint16)) & 1).astype(np.uint8)  # 9 bits per code, lowest first
+    data = np.packbits(bits.ravel(), bitorder="little")
+    blocks = (len(data) + 254) // 255
+    last = len(data) - (blocks - 1) * 255
+    out = np.zeros((blocks, 256), dtype=np.uint8)
+    out[:, 0] = 255
+    out[-1, 0] = last
+    out[:, 1:].flat[:len(data)] = data
+    return out.ravel()[:blocks * 256 - (255 - last)].tobytes() + b"\x00"  # an empty sub-block ends the data
+
+
+class GifWriter:
+    '''
+    Animated GIF written one frame at a time, only the part that changed since the previous frame is stored
+    '''
+
+    def __init__(self, path, width, height):
+        self.file = open(path, "wb")
+        self.previous = None  # palette indices of the last frame
+        self.frames = 0
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xf7, 0, 0) + gifPalette())  # 256 colour global palette
+        self.file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+
+    # (left, top, palette indices) of the part of a frame that changed, None if nothing did. Frames go through here
+    # one at a time and in order
+    def diff(self, image):
+        indices = paletteIndices(image)
+        previous, self.previous = self.previous, indices
+        if previous is None:
+            return 0, 0, indices
+        changed = indices != previous
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not len(rows):
+            return None
+        columns = np.flatnonzero(changed.any(axis=0))
+        top, bottom, left, right = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+        return int(left), int(top), indices[top:bottom, left:right]
+
+    # the bytes of a changed part shown for delay hundredths of a second, this is the part that can run on other threads
+    @staticmethod
+    def encode(item):
+        (left, top, indices), delay = item
+        height, width = indices.shape
+        # graphic control extension: the frame is left in place under the next one
+        control = struct.pack("<4BHBB", 0x21, 0xf9, 4, 0x04, min(delay, 0xffff), 0, 0)
+        return control + struct.pack("<BHHHHB", 0x2c, left, top, width, height, 0) + b"\x08" + lzwLiterals(indices)
+
+    def write(self, data):
+        self.file.write(data)
+        self.frames += 1
+
+    def close(self):
+        self.file.write(b"\x3b")
+        self.file.close()
+
+
+# write the frames as an animated GIF the size of the frames, returns the number of frames in the GIF
+def writeGif(images, path, workers=0):
+    images = iter(images)
+    first = next(images, None)
+    if first is None:
+        return 0
+    writer = GifWriter(path, first.width(), first.height())
+
+    # every change is held back until the next one, so the frames that changed nothing add to how long it stays
+    def changes():
+        held, delay = writer.diff(first), FRAME_DELAY
+        for image in images:
+            change = writer.diff(image)
+            if change is None:
+                delay += FRAME_DELAY
+            else:
+                yield held, delay
+                held, delay = change, FRAME_DELAY
+        yield held, max(delay, LAST_FRAME_DELAY)
+
+    try:
+        # the indices of a change are a new array, nothing needs copying before it goes to the pool
+        encodeInOrder(changes(), lambda item: item, GifWriter.encode, writer.write, workers)
+    finally:
+        writer.close()
+    return writer.frames
+
+
+# export a stroke log as a timelapse: a GIF if the path ends in .gif, otherwise PNG files numbered after the path
+# ("drawing.png" becomes drawing0001.png, drawing0002.png...). progress is called with the percent done now and
+# then, returns the number of frames written
+def export(log, path, width, height, pointsPerFrame=POINTS_PER_FRAME, workers=0, progress=None):
+    images = frames(log, width, height, pointsPerFrame)
+    if progress is not None:
+        images = reportProgress(images, max(log.pointCount() // pointsPerFrame, 1), progress)
+    if path.lower().endswith(".gif"):
+        if np is None:
+            raise RuntimeError("numpy is needed to write GIFs")
+        return writeGif(images, path, workers)
+    base, extension = os.path.splitext(path)
+    return writePngSequence(images, base + "%04d" + (extension or ".png"), workers)
+
+
+def reportProgress(images, expected, progress):
+    for number, image in enumerate(images):
+        if number % 10 == 0:
+            progress(min(number * 100 // expected, 99))
+        yield image
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+    parser = argparse.ArgumentParser(description="Export the timelapse of a turn of a .pict recording")
+    parser.add_argument("recording")
+    parser.add_argument("--turn", type=int, default=1, help="turn to export, counted from 1")
+    parser.add_argument("--out", default="timelapse.gif", help=".gif for an animated GIF, anything else for numbered PNGs")
+    parser.add_argument("--points", type=int, default=POINTS_PER_FRAME, help="points drawn between two frames")
+    parser.add_argument("--scale", type=float, default=1.0, help="size of the frames compared to the recorded canvas")
+    parser.add_argument("--workers", type=int, default=0, help="threads encoding frames")
+    args = parser.parse_args()
+    app = QGuiApplication([])
+    found = turnLog(args.recording, args.turn)
+    if found is None:
+        raise SystemExit(f"there is no turn {args.turn} in {args.recording}")
+    word, log = found
+    width, height = max(round(log.width * args.scale), 1), max(round(log.height * args.scale), 1)
+    count = export(log, args.out, width, height, args.points, args.workers)
+    print(f"{word}: {count} frames written to {args.out}")
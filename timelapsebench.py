@@ -0,0 +1,67 @@
+# Benchmark of the timelapse exporter on rounds of growing length: made up rounds of scribbles are exported as a GIF
+# and as a PNG sequence, with and without a pool of encoding threads, and the frames per second and the growth of
+# the process's peak memory are reported. The peak should not move as the rounds get longer
+#  python timelapsebench.py --strokes 100 500 2000 --size 800x600 --workers 4
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtGui import QGuiApplication
+from strokes import StrokeLog
+from timelapse import export
+from benchtools import peakMemory
+
+COLORS = (0xff000000, 0xffff0000, 0xff00ff00, 0xffffff00)
+
+
+def scribbles(strokes, width, height, rng):
+    log = StrokeLog(width, height)
+    for i in range(strokes):
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        log.beginStroke(x, y, COLORS[i % len(COLORS)], rng.choice((3, 5, 7, 9)))
+        for _ in range(rng.randint(10, 60)):
+            x = min(max(x + rng.uniform(-12, 12), 0), width)
+            y = min(max(y + rng.uniform(-12, 12), 0), height)
+            log.addPoint(x, y)
+    return log
+
+
+def bench(sizes, width, height, pointsPerFrame, workers):
+    folder = tempfile.mkdtemp()
+    try:
+        for kind in ("gif", "png"):
+            for pool in (0, workers):
+                for strokes in sizes:
+                    log = scribbles(strokes, width, height, random.Random(strokes))
+                    before = peakMemory()
+                    start = time.perf_counter()
+                    count = export(log, os.path.join(folder, "timelapse." + kind), width, height, pointsPerFrame, pool)
+                    elapsed = time.perf_counter() - start
+                    after = peakMemory()
+                    written = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+                    growth = f", peak memory +{(after - before) / 2 ** 20:.1f} MiB" if before is not None else ""
+                    print(f"{kind} {pool} workers, {strokes:5} strokes ({log.pointCount()} points): {count} frames in "
+                          f"{elapsed:.1f}s ({count / elapsed:.0f} frames/s), {written / 2 ** 20:.1f} MiB written{growth}")
+                    for name in os.listdir(folder):
+                        os.remove(os.path.join(folder, name))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the timelapse exporter")
+    parser.add_argument("--strokes", type=int, nargs="+", default=[100, 500, 2000], help="strokes in each round")
+    parser.add_argument("--size", default="800x600", help="size of the frames")
+    parser.add_argument("--points", type=int, default=25, help="points drawn between two frames")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    bench(args.strokes, width, height, args.points, args.workers)
@@ -0,0 +1,69 @@
+# Check and benchmark of switching tools, without a display
+# the brush colours and the eraser are picked over and over through the window while every icon read from disk is
+# counted (QPixmap is swapped in the assets module for one that counts the files it is made from). Each icon has to
+# be read once at most however many times the tools are switched. Then the time of a switch is compared with loading
+# and scaling the cursor from disk every time, the way the tools did before the assets cache
+#  python toolbench.py --switches 1000
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtGui import QCursor, QPixmap
+from PyQt6.QtWidgets import QApplication
+import assets
+
+TOOLS = ("black", "red", "green", "yellow", "erase", "defaultBrush")
+CURSORS = {"black": "paint-brush", "red": "red-brush", "green": "green-brush", "yellow": "yellow-brush", "erase": "eraser", "defaultBrush": "paint-brush"}
+opened = []  # paths of the icons read from disk
+
+
+def countingPixmap(path):
+    opened.append(path)
+    return QPixmap(path)
+
+
+def checkOpens(window, switches):
+    assets.QPixmap = countingPixmap
+    try:
+        for i in range(switches):
+            getattr(window, TOOLS[i % len(TOOLS)])()
+    finally:
+        assets.QPixmap = QPixmap
+    read = sorted(os.path.basename(path) for path in opened)
+    if len(read) != len(set(read)):
+        raise SystemExit(f"icons read more than once in {switches} tool switches: {read}")
+    if window.cursor().pixmap().isNull():
+        raise SystemExit("the cursor of the last tool has no image")
+    print(f"{switches} tool switches read {len(read)} icons from disk ({', '.join(read) or 'all cached already'}), "
+          f"{len(assets._pixmaps)} pixmaps and {len(assets._cursors)} cursors cached")
+
+
+def bench(window, switches):
+    start = time.perf_counter()
+    for i in range(switches):
+        getattr(window, TOOLS[i % len(TOOLS)])()
+    cached = (time.perf_counter() - start) / switches
+    start = time.perf_counter()
+    for i in range(switches):
+        tool = TOOLS[i % len(TOOLS)]
+        window.setCursor(QCursor(QPixmap(assets.iconPath(CURSORS[tool])).scaled(assets.CURSOR_SIZE, assets.CURSOR_SIZE), 0, 23))
+    uncached = (time.perf_counter() - start) / switches
+    print(f"per switch: {cached * 1e6:.0f}us cached, {uncached * 1e6:.0f}us read from disk every time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark switching tools")
+    parser.add_argument("--switches", type=int, default=1000)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from PictionaryGame import PictionaryGame
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    window.show()
+    app.processEvents()
+    checkOpens(window, args.switches)
+    bench(window, args.switches)
+    window.close()
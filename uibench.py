@@ -0,0 +1,95 @@
+# Benchmark of the score labels of the window, without a display: the same scoring events are shown once the way the
+# labels used to be updated (a new inline style sheet and text set on every change, straight away) and once through
+# the view model (changes collected and applied together with the next turn of the event loop, looks picked by
+# dynamic properties), and the labels restyled, the style events they got and the time per scoring event are reported
+#  python uibench.py --events 5000
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtWidgets import QApplication, QLabel
+from PictionaryGame import PictionaryGame
+
+# events a label gets when its style is worked out again
+STYLE_EVENTS = (QEvent.Type.StyleChange, QEvent.Type.Polish, QEvent.Type.FontChange, QEvent.Type.PaletteChange)
+
+
+class StyleCounter(QObject):
+    '''
+    Counts the style events delivered to labels
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def eventFilter(self, watched, event):
+        if event.type() in STYLE_EVENTS and isinstance(watched, QLabel):
+            self.count += 1
+        return False
+
+
+# how the score labels were updated before the view model, on every change, returns the style sheets set
+def inlineScoreDisplay(window):
+    game = window.game
+    styled = 0
+    if game.player1_score > 0:
+        window.player1_label.setStyleSheet("font-size:13px; color: green; font-weight: bold;")
+        styled += 1
+    if game.player1_score < 0:
+        window.player1_label.setStyleSheet(" font-size:13px; color: red; font-weight: bold;")
+        styled += 1
+    if game.player2_score > 0:
+        window.player2_label.setStyleSheet("font-size:13px; color: green; font-weight: bold;")
+        styled += 1
+    if game.player2_score < 0:
+        window.player2_label.setStyleSheet("font-size:13px; color: red; font-weight: bold;")
+        styled += 1
+    window.player1_label.setText(f"{game.player1Name}: {game.player1_score}")
+    window.player2_label.setText(f"{game.player2Name}: {game.player2_score}")
+    return styled
+
+
+def bench(app, events, inline):
+    window = PictionaryGame(setupData={"player1": "Alice", "player2": "Bob", "difficulty": "Easy"}, leaderboard=None)
+    window.show()
+    app.processEvents()
+    window.view.polishes = 0
+    game = window.game
+    word = game.currentWord
+    rng = random.Random(0)
+    counter = StyleCounter()
+    app.installEventFilter(counter)
+    restyles = 0  # style sheets parsed for a label, or labels polished again
+    start = time.perf_counter()
+    for _ in range(events):
+        game.tries = 3  # every guess is scored like the first of a turn
+        answer = word if rng.random() < 0.3 else "not the word"
+        game.checkAnswer(answer, rng.choice((game.player1Name, game.player2Name)))
+        if inline:
+            restyles += inlineScoreDisplay(window)
+        else:
+            window.updateScoreDisplay()
+        app.processEvents()  # one turn of the event loop per scoring event, like a guess typed in the dialog
+    elapsed = time.perf_counter() - start
+    app.removeEventFilter(counter)
+    if not inline:
+        restyles = window.view.polishes
+    name = "inline style sheets" if inline else "view model"
+    print(f"{name:>20}: {restyles / events:.2f} restyles, {counter.count / events:.2f} style events and {elapsed / events * 1e6:.0f}us per scoring event")
+    window.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the score labels")
+    parser.add_argument("--events", type=int, default=5000, help="scoring events")
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    for inline in (True, False):
+        bench(app, args.events, inline)
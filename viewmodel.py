@@ -0,0 +1,71 @@
+# View model of the labels that show the game in PictionaryGame
+# changes to the text and look of the labels are collected here and applied together on the next turn of the event
+# loop, so a guess that changes both scores updates each label once, and a label set back to what it shows is not
+# touched at all. The look of a label is a dynamic property ("state") matched by the selectors of STYLE_SHEET, set
+# once on the window, so a change only re-polishes that label instead of parsing a new style sheet for it
+#  https://doc.qt.io/qt-6/stylesheet-syntax.html#selector-types
+#  https://wiki.qt.io/Dynamic_Properties_and_Stylesheets
+
+from PyQt6.QtCore import QObject, QTimer
+from instrumentation import stats
+
+# labels get a class once when they are made (label.setProperty("class", ...)) and a state from the view model
+STYLE_SHEET = """
+    QLabel.heading { font-size: 18px; font-weight: bold; }
+    QLabel.title { font-size: 15px; }
+    QLabel.turn { font-size: 13px; font-weight: bold; }
+    QLabel.difficulty[state="easy"] { color: green; font-weight: bold; font-size: 16px; }
+    QLabel.difficulty[state="hard"] { color: red; font-weight: bold; font-size: 16px; }
+    QLabel.score[state="positive"] { color: green; font-weight: bold; font-size: 13px; }
+    QLabel.score[state="negative"] { color: red; font-weight: bold; font-size: 13px; }
+    QLabel.result[state="positive"] { color: green; font-size: 15px; }
+    QLabel.result[state="negative"] { color: red; font-size: 15px; }
+"""
+
+
+# state of a label showing a score
+def scoreState(score):
+    return "positive" if score > 0 else "negative" if score < 0 else "zero"
+
+
+class ViewModel(QObject):
+    '''
+    Text and state of labels waiting to be shown, applied once per turn of the event loop
+    '''
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = {}  # label -> [text or None, state or None]
+        self.scheduled = False
+        self.textUpdates = 0
+        self.polishes = 0
+
+    def setText(self, label, text):
+        self.change(label)[0] = text
+
+    def setState(self, label, state):
+        self.change(label)[1] = state
+
+    def change(self, label):
+        if not self.scheduled:
+            self.scheduled = True
+            QTimer.singleShot(0, self.apply)  # documentation: https://doc.qt.io/qt-6/qtimer.html#singleShot
+        return self.pending.setdefault(label, [None, None])
+
+    # show everything that changed now, called by the event loop or before a dialog is opened so it opens up to date
+    def apply(self):
+        self.scheduled = False
+        pending, self.pending = self.pending, {}
+        for label, (text, state) in pending.items():
+            if text is not None and label.text() != text:
+                label.setText(text)
+                self.textUpdates += 1
+                stats.count("label_text_updates")
+            if state is not None and label.property("state") != state:
+                label.setProperty("state", state)  # documentation: https://doc.qt.io/qt-6/qobject.html#setProperty
+                # the style sheet is only matched against the new property once the label is polished again
+                style = label.style()
+                style.unpolish(label)
+                style.polish(label)
+                self.polishes += 1
+                stats.count("label_polishes")
@@ -0,0 +1,395 @@
+# Word packs for the game
+# a word list file (words separated by commas or new lines) is parsed once, deduplicated and written to a
+# compact binary cache next to it (<list>.pack), the cache is memory mapped so the words are only turned into
+# Python strings when they are drawn, and it is rebuilt whenever the word list file changes
+
+import hashlib
+import math
+import mmap
+import os
+import random
+import struct
+import tempfile
+from array import array
+
+MAGIC = b"PWPK"
+VERSION = 1
+# magic, version, size and modification time of the word list the cache was built from, number of words
+HEADER = struct.Struct("<4sHxxQqQ")
+CHUNK_SIZE = 1 << 20  # bytes of the word list read at a time while building
+
+# adaptive word choice, see AdaptiveSampler
+TARGET_SUCCESS = 0.6  # share of the tries of a turn the words should leave over on average
+PRIOR_TURNS = 2  # made up turns at the target success every word starts with
+WEIGHT_SPREAD = 0.2  # how far from the target the success of a word can be before its weight falls off
+WEIGHT_SCALE = 1 << 20  # weight of a word right on the target, weights are integers so the tree sums stay exact
+MIN_WEIGHT = WEIGHT_SCALE // 100  # even the easiest and hardest words still come up now and again
+# turns of the words played: magic, version, hash of the words of the list (see wordsDigest), number of words in the
+# list, number of words played, then the indexes of the words played, their turns and the tries left added up, as
+# arrays of 32 bit numbers
+STATS_MAGIC = b"PWST"
+STATS_VERSION = 2
+STATS_HEADER = struct.Struct("<4sHxxQQQ")
+
+_packs = {}  # packs already loaded, keyed by the absolute path of their word list
+
+
+class WordPack:
+    '''
+    Deduplicated words of a word list file, read from the memory mapped binary cache
+    '''
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        stat = os.stat(self.path)
+        self.sourceSize = stat.st_size
+        self.sourceMtime = stat.st_mtime_ns
+        self.cachePath = self.path + ".pack"
+        if not self.cacheIsFresh(self.cachePath):
+            try:
+                self.build(self.cachePath)
+            except OSError:
+                # the folder of the word list is read only, keep the cache in the temp folder instead
+                name = hashlib.blake2b(self.path.encode(), digest_size=8).hexdigest()
+                self.cachePath = os.path.join(tempfile.gettempdir(), f"wordpack-{name}.pack")
+                if not self.cacheIsFresh(self.cachePath):
+                    self.build(self.cachePath)
+        self.load()
+
+    def __len__(self):
+        return self.count
+
+    # decode word i from the cache
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError("word index out of range")
+        start = self.wordsStart + self.offsets[i]
+        return self.data[start:self.wordsStart + self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    # file the turns of an AdaptiveSampler over this pack are saved to, next to the cache
+    def statsPath(self):
+        return os.path.splitext(self.cachePath)[0] + ".stats"
+
+    # True if the word list file has not changed since the pack was loaded
+    def isFresh(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.sourceSize and stat.st_mtime_ns == self.sourceMtime
+
+    # check the cache header matches the current word list file
+    def cacheIsFresh(self, cachePath):
+        try:
+            with open(cachePath, "rb") as f:
+                header = f.read(HEADER.size)
+        except OSError:
+            return False
+        if len(header) != HEADER.size:
+            return False
+        magic, version, size, mtime, _ = HEADER.unpack(header)
+        return magic == MAGIC and version == VERSION and size == self.sourceSize and mtime == self.sourceMtime
+
+    # stream the word list into the cache: header, count + 1 offsets, then every word as utf-8 back to back
+    def build(self, cachePath):
+        offsets = array('Q', [0])
+        seen = KeySet()  # 64 bit hashes of the words already added, instead of the words themselves
+        folder = os.path.dirname(cachePath)
+        with tempfile.TemporaryFile() as words:
+            with open(self.path, "rb") as source:
+                rest = b""
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    parts = (rest + chunk).replace(b"\n", b",").split(b",")
+                    # the last part may be cut in the middle of a word, keep it for the next chunk
+                    rest = parts.pop() if chunk else b""
+                    for part in parts:
+                        word = part.strip()
+                        if not word:
+                            continue
+                        key = int.from_bytes(hashlib.blake2b(word.lower(), digest_size=8).digest(), "little") | 1
+                        if not seen.add(key):
+                            continue  # the same word in different case is a duplicate too
+                        words.write(word)
+                        offsets.append(offsets[-1] + len(word))
+                    if not chunk:
+                        break
+            # write to a temporary file first so a half written cache is never loaded
+            fd, tmpPath = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as cache:
+                    cache.write(HEADER.pack(MAGIC, VERSION, self.sourceSize, self.sourceMtime, len(offsets) - 1))
+                    offsets.tofile(cache)
+                    words.seek(0)
+                    while True:
+                        block = words.read(CHUNK_SIZE)
+                        if not block:
+                            break
+                        cache.write(block)
+                os.replace(tmpPath, cachePath)
+            except BaseException:
+                os.unlink(tmpPath)
+                raise
+
+    # map the cache and point the offsets straight at it
+    def load(self):
+        with open(self.cachePath, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # documentation: https://docs.python.org/3/library/mmap.html
+        self.count = HEADER.unpack_from(self.data)[4]
+        self.wordsStart = HEADER.size + (self.count + 1) * 8
+        self.offsets = memoryview(self.data)[HEADER.size:self.wordsStart].cast('Q')
+
+
+class KeySet:
+    '''
+    Set of 64 bit keys kept in one flat array, so millions of them do not take a Python object each
+    '''
+
+    def __init__(self, capacity=1 << 12):
+        self.table = array('Q', bytes(8 * capacity))  # 0 marks an empty slot, capacity is a power of two
+        self.mask = capacity - 1
+        self.count = 0
+
+    # add a key (never 0), returns False if it was already in the set. A key goes in the slot its low bits point at,
+    # or the next free one after it: https://en.wikipedia.org/wiki/Linear_probing
+    def add(self, key):
+        table = self.table
+        mask = self.mask
+        i = key & mask
+        while table[i]:
+            if table[i] == key:
+                return False
+            i = (i + 1) & mask
+        table[i] = key
+        self.count += 1
+        if self.count * 2 > mask:
+            self.grow()  # kept at most half full so the runs of taken slots stay short
+        return True
+
+    def grow(self):
+        old = self.table
+        self.table = array('Q', bytes(16 * len(old)))
+        self.mask = len(self.table) - 1
+        table = self.table
+        mask = self.mask
+        for key in old:
+            if key:
+                i = key & mask
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = key
+
+
+# return the pack of a word list, only parsing the file again if it changed
+def loadPack(path):
+    path = os.path.abspath(path)
+    pack = _packs.get(path)
+    if pack is None or not pack.isFresh():
+        pack = _packs[path] = WordPack(path)
+    return pack
+
+
+# 64 bit hash of the words of a list in order, the turns saved for a list are only loaded back for the same words
+def wordsDigest(words):
+    digest = hashlib.blake2b(digest_size=8)
+    if isinstance(words, WordPack):
+        with memoryview(words.data)[HEADER.size:] as body:
+            digest.update(body)  # the offsets and the words of the cache, the header changes when the file is only touched
+    else:
+        for word in words:
+            digest.update(word.encode("utf-8"))
+            digest.update(b"\n")
+    return int.from_bytes(digest.digest(), "little")
+
+
+class WordSampler:
+    '''
+    Shuffled deck over a list of words: every word comes up once before any word repeats
+    '''
+
+    def __init__(self, words, rng=None):
+        self.words = words  # a WordPack or any list of words
+        self.rng = rng or random.Random()
+        self.deck = array('I', range(len(words)))
+        self.position = 0  # the words before this position in the deck have been drawn
+
+    def __len__(self):
+        return len(self.deck)
+
+    # draw the next word, the deck is shuffled one step at a time as it is drawn
+    def draw(self):
+        deck = self.deck
+        if not deck:
+            return None
+        if self.position == len(deck):
+            self.position = 0  # every word has been drawn, start a new shuffle
+        # Fisher-Yates: swap a random word from the part not drawn yet into the current position
+        # https://en.wikipedia.org/wiki/Fisher%E2%80%93Yates_shuffle
+        j = self.rng.randrange(self.position, len(deck))
+        deck[self.position], deck[j] = deck[j], deck[self.position]
+        word = self.words[deck[self.position]]
+        self.position += 1
+        return word
+
+
+class WeightTree:
+    '''
+    Fenwick tree of integer weights, one per word, for weighted draws and weight changes in O(log n)
+    https://en.wikipedia.org/wiki/Fenwick_tree
+    '''
+
+    def __init__(self, count, base):
+        self.count = count
+        self.base = base  # weight every word starts with, the tree only keeps how far each word is from it
+        self.tree = array('q', bytes(8 * (count + 1)))  # 1-based, made in one go however many words there are
+        self.total = base * count
+        self.top = 1 << (count.bit_length() - 1) if count else 0  # biggest step of the search
+
+    # sum of the weights of words 0 to i - 1
+    def prefix(self, i):
+        tree = self.tree
+        total = self.base * i
+        while i > 0:
+            total += tree[i]
+            i &= i - 1
+        return total
+
+    def weight(self, i):
+        return self.prefix(i + 1) - self.prefix(i)
+
+    def add(self, i, delta):
+        tree = self.tree
+        self.total += delta
+        i += 1
+        while i <= self.count:
+            tree[i] += delta
+            i += i & -i
+
+    def setWeight(self, i, weight):
+        self.add(i, weight - self.weight(i))
+
+    # the word whose share of the total weight holds r, for 0 <= r < total: walk down the tree taking every step that
+    # stays below r, so words of weight 0 are never found
+    def find(self, r):
+        tree = self.tree
+        base = self.base
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.count:
+                below = base * step + tree[nxt]
+                if below <= r:
+                    pos = nxt
+                    r -= below
+            step >>= 1
+        return pos
+
+
+# after every turn the word gets a score of the tries the guesser had left over the tries of a turn: 1 when it is found
+# on the first try, less for every wrong guess and 0 when it is not found. The success of a word is its average score,
+# starting from the target so new words come up often until they are known, and the weight of a word falls off the
+# further its success is from the target. Like the shuffled deck no word comes back before every word has been drawn:
+# a word drawn is left out (weight 0) until the round is over, so the weights decide which words come up first
+class AdaptiveSampler:
+    '''
+    Weighted draws over a list of words without repeats, the words that are solved about as often as the target come first
+    '''
+
+    def __init__(self, words, rng=None, target=TARGET_SUCCESS, tries=3):
+        self.words = words  # a WordPack or any list of words
+        self.rng = rng or random.Random()
+        self.target = target
+        self.tries = tries
+        count = len(words)
+        self.turns = array('I', bytes(4 * count))  # turns each word was drawn in
+        self.triesLeft = array('I', bytes(4 * count))  # tries left at the end of those turns, added up
+        self.played = set()  # words with turns, the only ones saved
+        self.tree = WeightTree(count, self.weightOf(0, 0))
+        self.withoutRepeats = True  # False lets every draw be independent of the ones before
+        self.last = None  # index of the last word drawn
+
+    def __len__(self):
+        return len(self.words)
+
+    # success of a word from its turns, with PRIOR_TURNS made up turns at the target
+    def success(self, turns, triesLeft):
+        return (triesLeft + PRIOR_TURNS * self.target * self.tries) / ((turns + PRIOR_TURNS) * self.tries)
+
+    def weightOf(self, turns, triesLeft):
+        distance = (self.success(turns, triesLeft) - self.target) / WEIGHT_SPREAD
+        return max(MIN_WEIGHT, round(WEIGHT_SCALE * math.exp(-distance * distance / 2)))
+
+    def draw(self):
+        if not len(self.words):
+            return None
+        if not self.tree.total:
+            self.newRound()
+        tree = self.tree
+        i = tree.find(self.rng.randrange(tree.total))
+        if self.withoutRepeats:
+            tree.setWeight(i, 0)  # left out until every word has been drawn
+        self.last = i
+        return self.words[i]
+
+    # every word has been drawn, they all come back with the weights of their turns
+    def newRound(self):
+        self.tree = WeightTree(len(self.words), self.weightOf(0, 0))
+        for i in self.played:
+            self.tree.setWeight(i, self.weightOf(self.turns[i], self.triesLeft[i]))
+
+    # the turn of the last word drawn ended with that many tries left, word is checked against it so a turn of a
+    # word that did not come from this sampler is not counted
+    def recordTurn(self, word, triesLeft):
+        i = self.last
+        if i is None or self.words[i] != word:
+            return
+        self.last = None
+        self.addTurns(i, 1, triesLeft)
+
+    def addTurns(self, i, turns, triesLeft):
+        self.turns[i] += turns
+        self.triesLeft[i] += triesLeft
+        self.played.add(i)
+        if self.tree.weight(i):  # a word drawn in this round keeps its weight of 0 until the next one
+            self.tree.setWeight(i, self.weightOf(self.turns[i], self.triesLeft[i]))
+
+    # write the turns of the words played to a file, only as big as the number of words played
+    def save(self, path):
+        played = array('I', sorted(self.played))
+        fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(STATS_HEADER.pack(STATS_MAGIC, STATS_VERSION, wordsDigest(self.words), len(self.words), len(played)))
+                played.tofile(f)
+                array('I', (self.turns[i] for i in played)).tofile(f)
+                array('I', (self.triesLeft[i] for i in played)).tofile(f)
+            os.replace(tmpPath, path)
+        except BaseException:
+            os.unlink(tmpPath)
+            raise
+
+    # add the turns saved by save, returns False if the file is missing or was saved for different words
+    def load(self, path):
+        try:
+            with open(path, "rb") as f:
+                header = f.read(STATS_HEADER.size)
+                if len(header) != STATS_HEADER.size:
+                    return False
+                magic, version, digest, count, played = STATS_HEADER.unpack(header)
+                if magic != STATS_MAGIC or version != STATS_VERSION or count != len(self.words) or digest != wordsDigest(self.words):
+                    return False
+                columns = []
+                for _ in range(3):
+                    column = array('I')
+                    column.fromfile(f, played)
+                    columns.append(column)
+        except (OSError, EOFError):
+            return False
+        for i, turns, triesLeft in zip(*columns):
+            self.addTurns(i, turns, triesLeft)
+        return True
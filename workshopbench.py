@@ -0,0 +1,75 @@
+# Benchmark of the tiled workshop canvas: a window sized view sweeps across a 20000x20000 canvas in rows, drawing
+# scribbles and compositing the tiles in view every frame, then the frame times, the tiles kept in memory and the
+# size of the page file are reported
+#  python workshopbench.py --width 20000 --height 20000 --view 1280x800
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no display needed, documentation: https://doc.qt.io/qt-6/qguiapplication.html#platformName-prop
+
+from PyQt6.QtCore import Qt, QPointF, QRect
+from PyQt6.QtGui import QGuiApplication, QImage, QPainter, QPainterPath, QPen
+from tiledcanvas import TiledCanvas
+from benchtools import peakMemory
+
+
+def bench(width, height, viewWidth, viewHeight, step, strokes):
+    canvas = TiledCanvas(width, height)
+    t = canvas.tileSize
+    # the same budget the window uses: about twice the tiles that fit in the view
+    canvas.setMaxResident(2 * (viewWidth // t + 2) * (viewHeight // t + 2))
+    view = QImage(viewWidth, viewHeight, QImage.Format.Format_ARGB32_Premultiplied)
+    pen = QPen(Qt.GlobalColor.black, 5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+    rng = random.Random(1)
+    drawTimes = []
+    renderTimes = []
+    mostResident = 0
+    # sweep left to right along a row, then the next row down
+    positions = [(x, y) for y in range(0, height - viewHeight + 1, viewHeight) for x in range(0, width - viewWidth + 1, step)]
+    start = time.perf_counter()
+    for x, y in positions:
+        began = time.perf_counter()
+        for _ in range(strokes):
+            path = QPainterPath(QPointF(x + rng.uniform(0, viewWidth), y + rng.uniform(0, viewHeight)))
+            for _ in range(20):
+                path.lineTo(path.currentPosition() + QPointF(rng.uniform(-15, 15), rng.uniform(-15, 15)))
+            canvas.drawPath(path, pen)
+        drawTimes.append(time.perf_counter() - began)
+        began = time.perf_counter()
+        painter = QPainter(view)
+        painter.translate(-x, -y)
+        canvas.render(painter, QRect(x, y, viewWidth, viewHeight))
+        painter.end()
+        renderTimes.append(time.perf_counter() - began)
+        mostResident = max(mostResident, len(canvas.resident))
+    elapsed = time.perf_counter() - start
+    drawTimes.sort()
+    renderTimes.sort()
+    print(f"canvas {width}x{height} ({width * height * 4 / 2 ** 30:.1f} GiB as one image), view {viewWidth}x{viewHeight}, "
+          f"{len(positions)} frames in {elapsed:.1f}s")
+    print(f"draw {strokes} strokes: median {drawTimes[len(drawTimes) // 2] * 1000:.2f}ms, "
+          f"composite view: median {renderTimes[len(renderTimes) // 2] * 1000:.2f}ms, p99 {renderTimes[int(len(renderTimes) * 0.99)] * 1000:.2f}ms")
+    print(f"tiles drawn on: {len(canvas.slots.keys() | canvas.resident.keys())}, most in memory: {mostResident} "
+          f"({mostResident * canvas.tileBytes / 2 ** 20:.0f} MiB), paged out {canvas.pagedOut}, paged in {canvas.pagedIn}, "
+          f"page file {canvas.pageFileBytes() / 2 ** 20:.0f} MiB")
+    peak = peakMemory()
+    if peak is not None:
+        print(f"peak process memory: {peak / 2 ** 20:.0f} MiB")
+    canvas.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tiled workshop canvas")
+    parser.add_argument("--width", type=int, default=20000)
+    parser.add_argument("--height", type=int, default=20000)
+    parser.add_argument("--view", default="1280x800", help="size of the window looking at the canvas")
+    parser.add_argument("--step", type=int, default=160, help="pixels the view moves between two frames")
+    parser.add_argument("--strokes", type=int, default=4, help="strokes drawn every frame")
+    args = parser.parse_args()
+    viewWidth, viewHeight = (int(n) for n in args.view.lower().split("x"))
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    bench(args.width, args.height, viewWidth, viewHeight, args.step, args.strokes)